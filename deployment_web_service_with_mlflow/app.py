@@ -1,9 +1,21 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 import mlflow.pyfunc
 import pandas as pd
+import json
 import os
-from mlflow.artifacts import download_artifacts
+import time
+import atexit
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from contextlib import nullcontext
 from dotenv import load_dotenv
+from werkzeug.exceptions import HTTPException
+from artifact_cache import ArtifactCache
+from batching import MicroBatcher
+from booster import BoosterPredictor
+from feature_transformer import FeatureTransformer
+from instrumentation import Instrumentation
+from prediction_cache import PredictionCache, canonical_key
+from prediction_log import PredictionLogger
 
 # Set AWS credentials as environment variables
 load_dotenv()
@@ -14,35 +26,277 @@ MLFLOW_TRACKING_URI = f"http://{EC2_PUBLIC_DNS}:5000"
 RUN_ID = '9c4533e2d8c049fdae991d4ba055ff38'
 MODEL_PATH = 'xgboost_model'
 
-# Define the destination path (current directory)
-dst_path = './'
+# Maximum number of cars accepted by a single /predict/batch request
+MAX_BATCH_SIZE = int(os.getenv('MAX_BATCH_SIZE', '10000'))
 
-# Download the artifacts from S3 via MLflow
-model_path = download_artifacts(run_id=RUN_ID, artifact_path=MODEL_PATH, tracking_uri=MLFLOW_TRACKING_URI, dst_path=dst_path)
+# Optional micro-batching of concurrent /predict calls
+MICRO_BATCHING = os.getenv('MICRO_BATCHING', 'false').lower() == 'true'
+MICRO_BATCH_SIZE = int(os.getenv('MICRO_BATCH_SIZE', '32'))
+MICRO_BATCH_WAIT_MS = float(os.getenv('MICRO_BATCH_WAIT_MS', '5'))
+# Seconds a /predict call waits for its batch before answering 504
+MICRO_BATCH_TIMEOUT = float(os.getenv('MICRO_BATCH_TIMEOUT', '5'))
 
-print(f"Artifacts downloaded in: {model_path}")
+# 'pyfunc' (default) or 'booster' to score with the raw XGBoost booster
+INFERENCE_MODE = os.getenv('INFERENCE_MODE', 'pyfunc')
+
+# Optional cache of /predict results, keyed by the feature vector and RUN_ID
+PREDICTION_CACHE = os.getenv('PREDICTION_CACHE', 'false').lower() == 'true'
+PREDICTION_CACHE_SIZE = int(os.getenv('PREDICTION_CACHE_SIZE', '10000'))
+PREDICTION_CACHE_TTL = float(os.getenv('PREDICTION_CACHE_TTL', '0')) or None
+
+# Optional log of /predict requests for monitoring, written as Parquet segments to PREDICTION_LOG_DIR
+PREDICTION_LOG_DIR = os.getenv('PREDICTION_LOG_DIR')
+PREDICTION_LOG_QUEUE_SIZE = int(os.getenv('PREDICTION_LOG_QUEUE_SIZE', '10000'))
+PREDICTION_LOG_SEGMENT_ROWS = int(os.getenv('PREDICTION_LOG_SEGMENT_ROWS', '100000'))
+PREDICTION_LOG_SEGMENT_SECONDS = float(os.getenv('PREDICTION_LOG_SEGMENT_SECONDS', '3600'))
+
+# Per-stage latency histograms and request counters on GET /metrics; set INSTRUMENTATION=false to turn them off
+INSTRUMENTATION = os.getenv('INSTRUMENTATION', 'true').lower() == 'true'
+instrumentation = Instrumentation() if INSTRUMENTATION else None
+
+# Local model cache: restarts and scale-outs on the same host skip the download
+MODEL_CACHE_DIR = os.getenv('MODEL_CACHE_DIR', './model_cache')
+MODEL_CACHE_MAX_BYTES = int(os.getenv('MODEL_CACHE_MAX_BYTES', str(2 * 1024 ** 3)))
+# Start from the cache only, without contacting the tracking server
+MODEL_CACHE_OFFLINE = os.getenv('MODEL_CACHE_OFFLINE', 'false').lower() == 'true'
+
+# Download the artifacts from S3 via MLflow, unless they are already cached
+cache = ArtifactCache(MODEL_CACHE_DIR, max_size_bytes=MODEL_CACHE_MAX_BYTES, offline=MODEL_CACHE_OFFLINE)
+fetch_start = time.perf_counter()
+model_path = cache.fetch_run_artifact(RUN_ID, MODEL_PATH, tracking_uri=MLFLOW_TRACKING_URI)
+fetch_seconds = time.perf_counter() - fetch_start
+
+print(f"Artifacts available in: {model_path}")
 print(f"Content: {os.listdir(model_path)}")
 
 # Load the model
-logged_model = './xgboost_model'
+logged_model = model_path
+load_start = time.perf_counter()
 loaded_model = mlflow.pyfunc.load_model(logged_model)
+booster_model = BoosterPredictor.from_model_dir(logged_model) if INFERENCE_MODE == 'booster' else None
+if instrumentation is not None:
+    instrumentation.model_loaded(RUN_ID, fetch_seconds, phase='fetch')
+    instrumentation.model_loaded(RUN_ID, time.perf_counter() - load_start)
+    instrumentation.wrap_pyfunc(loaded_model)
+
+# Fitted preprocessing logged with the model, used by /predict/raw
+transformer_path = os.path.join(logged_model, 'feature_transformer.json')
+transformer = FeatureTransformer.load(transformer_path) if os.path.exists(transformer_path) else None
+
+
+def stage(endpoint, name):
+    # Time a block as one stage of the request, or do nothing with instrumentation off
+    return instrumentation.stage(endpoint, name) if instrumentation is not None else nullcontext()
+
+
+def count_request(endpoint, status=200, rows=1):
+    if instrumentation is not None:
+        instrumentation.count_request(endpoint, status, rows)
+
+
+def predict_pyfunc(features, endpoint):
+    if instrumentation is None:
+        return loaded_model.predict(features)
+    return instrumentation.predict_pyfunc(loaded_model, features, endpoint)
+
+
+def predict_records(records, endpoint='predict_batch'):
+    if booster_model is not None:
+        with stage(endpoint, 'model'):
+            predictions = booster_model.predict_records(records)
+        if instrumentation is not None:
+            instrumentation.batch_rows.observe(len(records))
+        return predictions
+    with stage(endpoint, 'features'):
+        features = pd.DataFrame.from_records(records)
+    return predict_pyfunc(features, endpoint)
+
+
+def predict_micro_batch(records):
+    return predict_records(records, endpoint='predict')
+
+
+batcher = MicroBatcher(predict_micro_batch, max_batch_size=MICRO_BATCH_SIZE, max_wait_ms=MICRO_BATCH_WAIT_MS) if MICRO_BATCHING else None
+
+prediction_cache = PredictionCache(max_entries=PREDICTION_CACHE_SIZE, ttl_seconds=PREDICTION_CACHE_TTL) if PREDICTION_CACHE else None
+
+prediction_logger = None
+if PREDICTION_LOG_DIR:
+    prediction_logger = PredictionLogger(PREDICTION_LOG_DIR, max_queue=PREDICTION_LOG_QUEUE_SIZE,
+                                         segment_rows=PREDICTION_LOG_SEGMENT_ROWS,
+                                         segment_seconds=PREDICTION_LOG_SEGMENT_SECONDS)
+    # Write the queued records and close the open segment on shutdown
+    atexit.register(prediction_logger.close)
 
 # Initialize the Flask app
 app = Flask(__name__)
 
 @app.route('/predict', methods=['POST'])
 def predict():
+    return timed_request('predict', predict_single)
+
+
+def predict_single():
     # Get JSON data from request
-    data = request.get_json(force=True)
+    with stage('predict', 'parse'):
+        data = request.get_json(force=True)
+    start = time.perf_counter()
+
+    try:
+        if prediction_cache is None:
+            prediction = predict_one(data)
+        else:
+            # Repeated cars are answered from the cache
+            cache_key = canonical_key(data, RUN_ID)
+            prediction = prediction_cache.get(cache_key)
+            if prediction is None:
+                prediction = predict_one(data)
+                prediction_cache.put(cache_key, prediction)
+    except FuturesTimeoutError:
+        return jsonify({'error': f'No prediction within {MICRO_BATCH_TIMEOUT}s'}), 504, 0
+
+    if prediction_logger is not None:
+        # Queued for the background writer; dropped and counted if the queue is full
+        prediction_logger.log(data, prediction, RUN_ID, time.perf_counter() - start)
+    return jsonify([prediction]), 200, 1
+
+
+def predict_one(data):
+    if batcher is not None:
+        # Score together with other concurrent requests
+        return batcher.predict(data, timeout=MICRO_BATCH_TIMEOUT)
+
+    if booster_model is not None:
+        # Fast path: fill a float32 row and call the booster directly
+        with stage('predict', 'model'):
+            prediction = booster_model.predict_record(data)
+        if instrumentation is not None:
+            instrumentation.batch_rows.observe(1)
+        return prediction
 
     # Convert data to DataFrame
-    df = pd.DataFrame([data])
+    with stage('predict', 'features'):
+        df = pd.DataFrame([data])
 
     # Predict using the model
-    predictions = loaded_model.predict(df)
+    predictions = predict_pyfunc(df, 'predict')
+    return float(predictions[0])
+
+
+def parse_batch(body):
+    # Accept a JSON array of records, a single record or JSON lines (one record per line)
+    text = body.decode('utf-8').strip()
+    if text.startswith('['):
+        return json.loads(text)
+    try:
+        return [json.loads(text)]
+    except ValueError:
+        return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+def stream_predictions(predictions):
+    # Stream the predictions back as a JSON array, in input order
+    yield '['
+    for i, prediction in enumerate(predictions):
+        yield (',' if i else '') + json.dumps(prediction)
+    yield ']'
+
+
+def timed_request(endpoint, handler):
+    # Run a handler that returns (response, status, rows), recording its latency and counts;
+    # a handler that raises is counted with the status of its error response
+    status, rows = 500, 0
+    try:
+        with stage(endpoint, 'total'):
+            response, status, rows = handler()
+        return response, status
+    except HTTPException as e:
+        status = e.code
+        raise
+    finally:
+        count_request(endpoint, status, rows)
+
+
+@app.route('/predict/batch', methods=['POST'])
+def predict_batch():
+    return timed_request('predict_batch', predict_batch_records)
+
+
+def predict_batch_records():
+    try:
+        with stage('predict_batch', 'parse'):
+            records = parse_batch(request.get_data())
+    except ValueError as e:
+        return jsonify({'error': f'Invalid JSON body: {e}'}), 400, 0
+
+    if not records:
+        return jsonify([]), 200, 0
+    if len(records) > MAX_BATCH_SIZE:
+        return jsonify({'error': f'Batch of {len(records)} cars exceeds the maximum of {MAX_BATCH_SIZE}'}), 413, 0
+
+    # Build the feature matrix once and score all cars in a single call
+    predictions = predict_records(records)
+
+    return Response(stream_predictions(predictions.tolist()), mimetype='application/json'), 200, len(records)
+
+
+@app.route('/predict/raw', methods=['POST'])
+def predict_raw():
+    return timed_request('predict_raw', predict_raw_listings)
+
+
+def predict_raw_listings():
+    if transformer is None:
+        return jsonify({'error': 'The loaded model has no feature_transformer.json artifact'}), 501, 0
+
+    # Accept one listing, a JSON array of listings or JSON lines
+    try:
+        with stage('predict_raw', 'parse'):
+            listings = parse_batch(request.get_data())
+    except ValueError as e:
+        return jsonify({'error': f'Invalid JSON body: {e}'}), 400, 0
+    if len(listings) > MAX_BATCH_SIZE:
+        return jsonify({'error': f'Batch of {len(listings)} cars exceeds the maximum of {MAX_BATCH_SIZE}'}), 413, 0
+
+    # Encode the raw listings with the fitted transformer and score them together
+    try:
+        records = [transformer.transform(listing) for listing in listings]
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400, 0
+    if not records:
+        return jsonify([]), 200, 0
+    predictions = predict_records(records, endpoint='predict_raw')
+    return jsonify([float(p) for p in predictions]), 200, len(records)
+
+
+@app.route('/batching/stats', methods=['GET'])
+def batching_stats():
+    if batcher is None:
+        return jsonify({'enabled': False})
+    return jsonify(dict(batcher.stats(), enabled=True))
+
+
+@app.route('/cache/stats', methods=['GET'])
+def cache_stats():
+    if prediction_cache is None:
+        return jsonify({'enabled': False})
+    return jsonify(dict(prediction_cache.stats(), enabled=True))
+
+
+@app.route('/prediction_log/stats', methods=['GET'])
+def prediction_log_stats():
+    if prediction_logger is None:
+        return jsonify({'enabled': False})
+    return jsonify(dict(prediction_logger.stats(), enabled=True))
+
 
-    # Return the predictions as JSON
-    return jsonify(predictions.tolist())
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    # Prometheus scrape endpoint
+    if instrumentation is None:
+        return jsonify({'error': 'Instrumentation is disabled (INSTRUMENTATION=false)'}), 404
+    body, content_type = instrumentation.exposition()
+    return Response(body, content_type=content_type)
 
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=5000)
@@ -0,0 +1,131 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+import tempfile
+from mlflow.artifacts import download_artifacts
+
+
+class ArtifactCacheMiss(LookupError):
+    pass
+
+
+def tree_checksum(path):
+    # SHA-256 over the relative paths and contents of every file under path
+    digest = hashlib.sha256()
+    for root, dirs, files in os.walk(path):
+        dirs.sort()
+        for name in sorted(files):
+            file_path = os.path.join(root, name)
+            digest.update(os.path.relpath(file_path, path).encode())
+            with open(file_path, 'rb') as f:
+                for block in iter(lambda: f.read(1 << 20), b''):
+                    digest.update(block)
+    return digest.hexdigest()
+
+
+def tree_size(path):
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, files in os.walk(path) for name in files)
+
+
+class ArtifactCache:
+    """Local, content-addressed cache for MLflow model artifacts.
+
+    Downloads are written to a temporary directory and atomically renamed to
+    `objects/<sha256>`; `index.json` maps a run ID and artifact path (or an
+    artifact URI) to that checksum. Least recently used objects are evicted
+    once the cache grows past `max_size_bytes`. In offline mode the tracking
+    server is never contacted and a cache miss raises `ArtifactCacheMiss`.
+    """
+
+    def __init__(self, cache_dir, max_size_bytes=2 * 1024 ** 3, offline=False, download_fn=download_artifacts):
+        self.cache_dir = cache_dir
+        self.max_size_bytes = max_size_bytes
+        self.offline = offline
+        self.download_fn = download_fn
+        self.objects_dir = os.path.join(cache_dir, 'objects')
+        self.index_path = os.path.join(cache_dir, 'index.json')
+        os.makedirs(self.objects_dir, exist_ok=True)
+
+    def fetch_run_artifact(self, run_id, artifact_path, tracking_uri=None):
+        return self._fetch(
+            f'runs:/{run_id}/{artifact_path}',
+            lambda dst_path: self.download_fn(run_id=run_id, artifact_path=artifact_path, tracking_uri=tracking_uri, dst_path=dst_path),
+        )
+
+    def fetch_uri(self, artifact_uri):
+        return self._fetch(artifact_uri, lambda dst_path: self.download_fn(artifact_uri=artifact_uri, dst_path=dst_path))
+
+    def _fetch(self, key, download):
+        index = self._read_index()
+        entry = index.get(key)
+        if entry is not None and os.path.isdir(self._object_path(entry['checksum'])):
+            # Warm start: no round trip to the tracking server
+            entry['last_used'] = time.time()
+            self._write_index(index)
+            return os.path.join(self._object_path(entry['checksum']), entry['name'])
+
+        if self.offline:
+            raise ArtifactCacheMiss(f"{key} is not in the artifact cache at {self.cache_dir} and offline mode is on")
+
+        with tempfile.TemporaryDirectory(dir=self.cache_dir, prefix='download-') as tmp_dir:
+            downloaded = download(tmp_dir)
+            name = ''
+            if os.path.isfile(downloaded):
+                # Single-file artifacts are stored inside their own object directory
+                name = os.path.basename(downloaded)
+                wrapper = os.path.join(tmp_dir, 'object')
+                os.makedirs(wrapper)
+                os.rename(downloaded, os.path.join(wrapper, name))
+                downloaded = wrapper
+            checksum = tree_checksum(downloaded)
+            object_path = self._object_path(checksum)
+            if not os.path.isdir(object_path):
+                try:
+                    os.rename(downloaded, object_path)
+                except OSError:
+                    # Another process stored the same content first
+                    if not os.path.isdir(object_path):
+                        raise
+
+        index = self._read_index()
+        index[key] = {'checksum': checksum, 'name': name, 'size': tree_size(object_path), 'last_used': time.time()}
+        self._evict(index, keep=checksum)
+        self._write_index(index)
+        return os.path.join(object_path, name)
+
+    def _object_path(self, checksum):
+        return os.path.join(self.objects_dir, checksum)
+
+    def _evict(self, index, keep):
+        # Drop least recently used objects until the cache fits in max_size_bytes
+        objects = {}
+        for key, entry in index.items():
+            last_used, _, keys = objects.get(entry['checksum'], (0, entry['size'], []))
+            objects[entry['checksum']] = (max(last_used, entry['last_used']), entry['size'], keys + [key])
+
+        total = sum(size for _, size, _ in objects.values())
+        for checksum, (_, size, keys) in sorted(objects.items(), key=lambda item: item[1][0]):
+            if total <= self.max_size_bytes:
+                break
+            if checksum == keep:
+                continue
+            shutil.rmtree(self._object_path(checksum), ignore_errors=True)
+            for key in keys:
+                del index[key]
+            total -= size
+
+    def _read_index(self):
+        try:
+            with open(self.index_path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def _write_index(self, index):
+        # Write to a temporary file and rename so readers never see a partial index
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, prefix='index-', suffix='.json')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(index, f)
+        os.replace(tmp_path, self.index_path)
@@ -0,0 +1,97 @@
+import queue
+import logging
+import threading
+import time
+from concurrent.futures import Future
+
+
+class MicroBatcher:
+    """Merge concurrent single-row predictions into one model call.
+
+    Requests are held for at most `max_wait_ms` milliseconds, or until
+    `max_batch_size` rows are waiting, and then scored together with
+    `predict_fn`, which takes a list of the submitted rows and returns one
+    prediction per row. When `predict_fn` raises or returns the wrong
+    number of predictions, the batch is split in halves and rescored, so
+    only the rows that fail get the exception.
+    """
+
+    def __init__(self, predict_fn, max_batch_size=32, max_wait_ms=5):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._batches = 0
+        self._rows = 0
+        self._max_batch_seen = 0
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+
+    def submit(self, car_data):
+        # Queue one row and return a future resolved with its prediction
+        future = Future()
+        self._queue.put((car_data, future))
+        return future
+
+    def predict(self, car_data, timeout=None):
+        return self.submit(car_data).result(timeout=timeout)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'queue_depth': self._queue.qsize(),
+                'batches': self._batches,
+                'rows': self._rows,
+                'mean_batch_size': self._rows / self._batches if self._batches else 0.0,
+                'max_batch_size': self._max_batch_seen,
+            }
+
+    def _collect(self):
+        # Block for the first row, then gather more until the batch is full or the wait expires
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            try:
+                with self._lock:
+                    self._batches += 1
+                    self._rows += len(batch)
+                    self._max_batch_seen = max(self._max_batch_seen, len(batch))
+                self._score(batch)
+            except Exception as e:  # pylint: disable=broad-except
+                # Keep the worker alive: every later request depends on it
+                logging.exception("Micro-batch scoring failed")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def _score(self, batch):
+        records = [car_data for car_data, _ in batch]
+        try:
+            predictions = [float(prediction) for prediction in self.predict_fn(records)]
+            if len(predictions) != len(batch):
+                raise ValueError(f"predict_fn returned {len(predictions)} predictions for {len(batch)} rows")
+        except Exception as e:  # pylint: disable=broad-except
+            if len(batch) == 1:
+                batch[0][1].set_exception(e)
+                return
+            # One bad row must not fail the requests merged with it
+            middle = len(batch) // 2
+            self._score(batch[:middle])
+            self._score(batch[middle:])
+            return
+
+        for (_, future), prediction in zip(batch, predictions):
+            future.set_result(prediction)
@@ -0,0 +1,61 @@
+import requests
+import json
+import time
+
+# URLs of the deployed web service
+url = "http://localhost:5000/predict"
+batch_url = "http://localhost:5000/predict/batch"
+
+# Number of cars to score in each run
+num_cars = 1000
+
+# Example payload with all features required by the model
+data = {
+    "year": 2020.0,
+    "mileage": 15944.0,
+    "enginesize": 1.0,
+    "tax": 150.0,
+    "mpg": 57.7,
+    "make_bmw": False,
+    "make_cclass": False,
+    "make_focus": False,
+    "make_ford": True,
+    "make_hyundi": False,
+    "make_merc": False,
+    "make_skoda": False,
+    "make_toyota": False,
+    "make_vauxhall": False,
+    "make_vw": False,
+    "transmission_Manual": False,
+    "transmission_Semi-Auto": True,
+    "fueltype_Hybrid": False,
+    "fueltype_Petrol": True
+}
+
+# Vary the mileage so that every car in the inventory is different
+cars = [dict(data, mileage=data["mileage"] + i) for i in range(num_cars)]
+
+session = requests.Session()
+
+# Score the inventory one car per request
+start = time.perf_counter()
+single_predictions = []
+for car in cars:
+    response = session.post(url, json=car)
+    response.raise_for_status()
+    single_predictions.append(response.json()[0])
+single_time = time.perf_counter() - start
+
+# Score the whole inventory as JSON lines in a single request
+body = "\n".join(json.dumps(car) for car in cars)
+start = time.perf_counter()
+response = session.post(batch_url, data=body, headers={"Content-Type": "application/x-ndjson"})
+response.raise_for_status()
+batch_predictions = response.json()
+batch_time = time.perf_counter() - start
+
+max_diff = max(abs(a - b) for a, b in zip(single_predictions, batch_predictions))
+
+print(f"Looping over /predict: {single_time:.3f}s ({num_cars / single_time:.1f} cars/s)")
+print(f"/predict/batch:        {batch_time:.3f}s ({num_cars / batch_time:.1f} cars/s)")
+print(f"Speedup: {single_time / batch_time:.1f}x, max prediction difference: {max_diff:.4f}")
@@ -0,0 +1,62 @@
+import sys
+import time
+import numpy as np
+import pandas as pd
+import mlflow.pyfunc
+from booster import BoosterPredictor
+
+# Model directory downloaded by app.py (or pass another one on the command line)
+logged_model = sys.argv[1] if len(sys.argv) > 1 else './xgboost_model'
+num_requests = 2000
+
+# Example payload with all features required by the model
+data = {
+    "year": 2020.0,
+    "mileage": 15944.0,
+    "enginesize": 1.0,
+    "tax": 150.0,
+    "mpg": 57.7,
+    "make_bmw": False,
+    "make_cclass": False,
+    "make_focus": False,
+    "make_ford": True,
+    "make_hyundi": False,
+    "make_merc": False,
+    "make_skoda": False,
+    "make_toyota": False,
+    "make_vauxhall": False,
+    "make_vw": False,
+    "transmission_Manual": False,
+    "transmission_Semi-Auto": True,
+    "fueltype_Hybrid": False,
+    "fueltype_Petrol": True
+}
+
+
+def measure(predict_one):
+    # Warm up, then time each single-row prediction
+    for _ in range(50):
+        predict_one(data)
+    latencies = []
+    for i in range(num_requests):
+        car_data = dict(data, mileage=data["mileage"] + i)
+        start = time.perf_counter()
+        predict_one(car_data)
+        latencies.append(time.perf_counter() - start)
+    return np.array(latencies) * 1000
+
+
+pyfunc_model = mlflow.pyfunc.load_model(logged_model)
+booster_model = BoosterPredictor.from_model_dir(logged_model)
+
+pyfunc_prediction = float(pyfunc_model.predict(pd.DataFrame([data]))[0])
+booster_prediction = booster_model.predict_record(data)
+print(f"pyfunc prediction: {pyfunc_prediction:.4f}, booster prediction: {booster_prediction:.4f}")
+
+results = {
+    'pyfunc': measure(lambda car_data: pyfunc_model.predict(pd.DataFrame([car_data]))),
+    'booster': measure(booster_model.predict_record),
+}
+
+for mode, latencies in results.items():
+    print(f"{mode:8s} p50: {np.percentile(latencies, 50):.3f} ms, p99: {np.percentile(latencies, 99):.3f} ms")
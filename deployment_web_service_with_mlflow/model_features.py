@@ -0,0 +1,8 @@
+# The model's 19 input features, in training order
+NUMERICAL_FEATURES = ['year', 'mileage', 'enginesize', 'tax', 'mpg']
+CATEGORICAL_FEATURES = [
+    'make_bmw', 'make_cclass', 'make_focus', 'make_ford', 'make_hyundi', 'make_merc', 'make_skoda',
+    'make_toyota', 'make_vauxhall', 'make_vw', 'transmission_Manual', 'transmission_Semi-Auto',
+    'fueltype_Hybrid', 'fueltype_Petrol',
+]
+FEATURE_NAMES = NUMERICAL_FEATURES + CATEGORICAL_FEATURES
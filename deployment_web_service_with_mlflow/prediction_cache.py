@@ -0,0 +1,76 @@
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from model_features import FEATURE_NAMES
+
+
+def canonical_key(car_data, model_version, feature_names=FEATURE_NAMES):
+    # Hash of the model's feature vector in a fixed order with booleans/ints normalised to floats, plus the
+    # model version; other fields in the request (a client request id, a timestamp) don't change the key
+    features = []
+    for name in feature_names:
+        value = car_data.get(name)
+        features.append(float(value) if isinstance(value, (bool, int, float)) else value)
+    payload = json.dumps([str(model_version), features], separators=(',', ':'))
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+
+class PredictionCache:
+    """In-process LRU cache of predictions with an optional TTL.
+
+    Keys come from `canonical_key`, so the same car quoted twice hits the
+    cache regardless of key order, bool/float encoding or fields that are not
+    model features, and entries for an old model version are never served
+    after a swap.
+    """
+
+    def __init__(self, max_entries=10000, ttl_seconds=None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+                self.expirations += 1
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+            }
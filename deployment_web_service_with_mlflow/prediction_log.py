@@ -0,0 +1,219 @@
+import os
+import time
+import queue
+import logging
+import threading
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+from model_features import CATEGORICAL_FEATURES, NUMERICAL_FEATURES
+
+
+def log_schema(numerical=NUMERICAL_FEATURES, categorical=CATEGORICAL_FEATURES):
+    # timestamp is the UTC time of the request, without a time zone
+    return pa.schema([
+        ('timestamp', pa.timestamp('us')),
+        *[(column, pa.float64()) for column in numerical],
+        *[(column, pa.bool_()) for column in categorical],
+        ('prediction', pa.float64()),
+        ('model_version', pa.string()),
+        ('latency_ms', pa.float64()),
+    ])
+
+
+class PredictionLogger:
+    """Log served predictions to Parquet segments without blocking the request.
+
+    `log` puts the request's features, prediction, model version and
+    latency on a queue of at most `max_queue` records and returns at once;
+    when the queue is full the record is dropped and counted. A background
+    thread drains the queue every `flush_seconds` and writes the records
+    `row_group_rows` at a time to the open segment, a zstd-compressed
+    Parquet file in `log_dir`. Segments rotate after
+    `segment_rows` rows or `segment_seconds` seconds. An open segment's name
+    starts with '.', which Parquet readers skip, and it is renamed to
+    `part-<first timestamp>-<n>.parquet` once closed, so `log_dir` can be
+    read as one dataset at any time. The open segment has no Parquet footer
+    until it is closed, so if the process crashes, its rows are lost: up to
+    `segment_rows` rows or `segment_seconds` seconds of requests. Lower
+    either limit to lose less, at the cost of more, smaller files. A write
+    error (a full disk, a removed `log_dir`) loses the open segment's rows,
+    which are logged and counted as failed, and the next record starts a new
+    segment.
+    """
+
+    def __init__(self, log_dir, max_queue=10000, segment_rows=100000, segment_seconds=3600, flush_seconds=1.0,
+                 row_group_rows=10000, batch_size=1000, numerical=NUMERICAL_FEATURES, categorical=CATEGORICAL_FEATURES):
+        self.log_dir = log_dir
+        self.flush_seconds = flush_seconds
+        self.segment_rows = segment_rows
+        self.segment_seconds = segment_seconds
+        self.row_group_rows = row_group_rows
+        self.batch_size = batch_size
+        self.schema = log_schema(numerical, categorical)
+        self.numerical = list(numerical)
+        self.categorical = list(categorical)
+        os.makedirs(log_dir, exist_ok=True)
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        self._logged = 0
+        self._dropped = 0
+        self._written = 0
+        self._failed = 0
+        self._segments = 0
+        self._buffer = []
+        self._buffered_rows = 0
+        self._writer = None
+        self._segment_path = None
+        self._segment_rows = 0
+        self._segment_written = 0
+        self._segment_opened = 0.0
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def log(self, car_data, prediction, model_version, latency_seconds):
+        # Called on the request path: one tuple and a non-blocking put
+        try:
+            self._queue.put_nowait((time.time(), car_data, prediction, model_version, latency_seconds))
+        except queue.Full:
+            with self._lock:
+                self._dropped += 1
+            return False
+        with self._lock:
+            self._logged += 1
+        return True
+
+    def stats(self):
+        with self._lock:
+            return {
+                'queue_depth': self._queue.qsize(),
+                'logged': self._logged,
+                'dropped': self._dropped,
+                'written': self._written,
+                'failed': self._failed,
+                'segments': self._segments,
+            }
+
+    def close(self, timeout=None):
+        # Write what is queued, close the open segment and stop the writer
+        self._closed.set()
+        self._thread.join(timeout)
+
+    def _run(self):
+        # Wake every flush_seconds and convert what has been queued since, so the
+        # writer takes the GIL from request threads once per interval, not per request
+        closed = False
+        while not closed:
+            closed = self._closed.wait(self.flush_seconds)
+            for batch in iter(self._collect, []):
+                self._write_step(self._buffer_batch, batch)
+                if self._segment_rows >= self.segment_rows:
+                    self._write_step(self._rotate)
+            if self._segment_rows and time.monotonic() - self._segment_opened >= self.segment_seconds:
+                self._write_step(self._rotate)
+        if self._segment_rows:
+            self._write_step(self._rotate)
+
+    def _write_step(self, step, *args):
+        # A write error must not stop the writer: the open segment is abandoned and its rows counted as failed
+        try:
+            step(*args)
+        except (OSError, pa.ArrowException) as e:
+            logging.error(f"Prediction log write failed, dropping {self._segment_rows} records: {e}")
+            with self._lock:
+                self._failed += self._segment_rows
+                self._written -= self._segment_written
+            self._abandon_segment()
+
+    def _abandon_segment(self):
+        if self._writer is not None:
+            try:
+                self._writer.close()
+                os.remove(self._in_progress_path())
+            except (OSError, pa.ArrowException):
+                pass
+        self._writer = None
+        self._buffer = []
+        self._buffered_rows = 0
+        self._segment_rows = 0
+        self._segment_written = 0
+
+    def _collect(self):
+        # Up to batch_size queued records, without waiting
+        batch = []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _table(self, batch):
+        timestamps, records, predictions, versions, latencies = zip(*batch)
+        columns = [pa.array((np.array(timestamps) * 1e6).astype(np.int64), pa.timestamp('us'))]
+        columns += [pa.array([record.get(column) for record in records], pa.float64()) for column in self.numerical]
+        columns += [pa.array([None if record.get(column) is None else bool(record[column]) for record in records],
+                             pa.bool_()) for column in self.categorical]
+        columns += [pa.array(predictions, pa.float64()),
+                    pa.array([None if version is None else str(version) for version in versions], pa.string()),
+                    pa.array(np.array(latencies) * 1000, pa.float64())]
+        return pa.Table.from_arrays(columns, schema=self.schema)
+
+    def _convert(self, batch):
+        try:
+            return self._table(batch)
+        except (pa.ArrowException, TypeError, ValueError):
+            pass
+        # A request with unexpected feature values: convert record by record and drop only the bad ones
+        tables = []
+        for record in batch:
+            try:
+                tables.append(self._table([record]))
+            except (pa.ArrowException, TypeError, ValueError) as e:
+                logging.warning(f"Dropping a prediction log record: {e}")
+                with self._lock:
+                    self._failed += 1
+        return pa.concat_tables(tables) if tables else None
+
+    def _buffer_batch(self, batch):
+        table = self._convert(batch)
+        if table is None:
+            return
+        if not self._segment_rows:
+            self._segment_opened = time.monotonic()
+        self._buffer.append(table)
+        self._buffered_rows += len(table)
+        self._segment_rows += len(table)
+        if self._buffered_rows >= self.row_group_rows:
+            self._write_row_group()
+
+    def _write_row_group(self):
+        # Each write_table call adds a row group, so converted batches are written together
+        table = pa.concat_tables(self._buffer)
+        if self._writer is None:
+            self._segment_path = os.path.join(
+                self.log_dir, f"part-{table['timestamp'][0].value}-{self._segments:05d}.parquet")
+            # Recreated if it was removed while the logger was running
+            os.makedirs(self.log_dir, exist_ok=True)
+            self._writer = pq.ParquetWriter(self._in_progress_path(), self.schema, compression='zstd')
+        self._writer.write_table(table)
+        self._buffer = []
+        self._buffered_rows = 0
+        self._segment_written += len(table)
+        with self._lock:
+            self._written += len(table)
+
+    def _in_progress_path(self):
+        return os.path.join(self.log_dir, '.' + os.path.basename(self._segment_path))
+
+    def _rotate(self):
+        if self._buffer:
+            self._write_row_group()
+        self._writer.close()
+        os.replace(self._in_progress_path(), self._segment_path)
+        self._writer = None
+        self._segment_rows = 0
+        self._segment_written = 0
+        with self._lock:
+            self._segments += 1
@@ -1,131 +1,138 @@
 import datetime
 import os
+import sys
+import json
 import time
 import logging
-import pandas as pd
-import psycopg
 import mlflow.pyfunc
-from mlflow.artifacts import download_artifacts
+from mlflow.exceptions import MlflowException
+from artifact_cache import ArtifactCache, ArtifactCacheMiss
+from data_store import iter_dataset, read_dataset
+from drift_statistics import ReferenceStatistics, drift_report
+from metrics_sink import MetricsSink, create_database, metrics_row
+from drift_backfill import backfill
 from prefect import task, flow
-from evidently.report import Report
-from evidently import ColumnMapping
-from evidently.metrics import ColumnDriftMetric, DatasetDriftMetric, DatasetMissingValuesMetric
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s]: %(message)s")
 
 SEND_TIMEOUT = 10  # Time to wait between sending metrics
 
-# SQL to create the necessary table for metrics
-create_table_statement = """
-DROP TABLE IF EXISTS car_metrics;
-CREATE TABLE car_metrics(
-    timestamp TIMESTAMP,
-    prediction_drift FLOAT,
-    num_drifted_columns integer,
-    share_missing_values FLOAT
-)
-"""
+EC2_PUBLIC_DNS = 'ec2-16-16-217-131.eu-north-1.compute.amazonaws.com'
+MLFLOW_TRACKING_URI = f"http://{EC2_PUBLIC_DNS}:5000"
+RUN_ID = '9c4533e2d8c049fdae991d4ba055ff38'
+MODEL_PATH = 'xgboost_model'
+REFERENCE_PATH = 'drift_reference'
 
-# Load the ML model from MLflow
-@task
-def load_model():
+
+def artifact_cache():
     from dotenv import load_dotenv
     # Set AWS credentials as environment variables
     load_dotenv()
 
-    EC2_PUBLIC_DNS = 'ec2-16-16-217-131.eu-north-1.compute.amazonaws.com'
-    MLFLOW_TRACKING_URI = f"http://{EC2_PUBLIC_DNS}:5000"
-    RUN_ID = '9c4533e2d8c049fdae991d4ba055ff38'
-    MODEL_PATH = 'xgboost_model'
+    # Artifacts are downloaded from S3 via MLflow, unless they are already cached
+    return ArtifactCache(
+        os.getenv('MODEL_CACHE_DIR', './model_cache'),
+        offline=os.getenv('MODEL_CACHE_OFFLINE', 'false').lower() == 'true'
+    )
 
-    dst_path = './'
 
-    # Download the artifacts from S3 via MLflow
-    model_path = download_artifacts(run_id=RUN_ID, artifact_path=MODEL_PATH, tracking_uri=MLFLOW_TRACKING_URI, dst_path=dst_path)
-
-    logged_model = './xgboost_model'
-    model = mlflow.pyfunc.load_model(logged_model)
-    return model
+def fetch_model():
+    # Local path of the model artifacts
+    return artifact_cache().fetch_run_artifact(RUN_ID, MODEL_PATH, tracking_uri=MLFLOW_TRACKING_URI)
 
 
+# Load the ML model from MLflow
+@task
+def load_model():
+    model = mlflow.pyfunc.load_model(fetch_model())
+    return model
 
-# Load reference data
-reference_data = pd.read_csv('../data/cleaned_car_data.csv')
 
 # Define features
 num_features = ['year', 'mileage', 'enginesize', 'tax', 'mpg']
 cat_features = ['make_bmw', 'make_cclass', 'make_focus', 'make_ford', 'make_hyundi', 'make_merc', 'make_skoda', 'make_toyota', 'make_vauxhall', 'make_vw', 'transmission_Manual', 'transmission_Semi-Auto', 'fueltype_Hybrid', 'fueltype_Petrol']
 
-column_mapping = ColumnMapping(
-    prediction='price',
-    numerical_features=num_features,
-    categorical_features=cat_features,
-    target=None
-)
+# The Parquet store written by the preprocessing flow; the CSV export is used if it is missing
+CLEANED_DATA_PATH = '../data/cleaned_car_data.parquet'
+if not os.path.exists(CLEANED_DATA_PATH):
+    CLEANED_DATA_PATH = '../data/cleaned_car_data.csv'
 
-report = Report(metrics=[
-    ColumnDriftMetric(column_name='price'),  # Monitor drift in the predicted price
-    DatasetDriftMetric(),
-    DatasetMissingValuesMetric()
-])
+BATCH_SIZE = 100000  # Rows scored and summarized at a time
 
-@task
-def prep_db():
-    with psycopg.connect("host=localhost port=5432 user=postgres password=example", autocommit=True) as conn:
-        res = conn.execute("SELECT 1 FROM pg_database WHERE datname='test'")
-        if len(res.fetchall()) == 0:
-            conn.execute("CREATE DATABASE test;")
-        with psycopg.connect("host=localhost port=5432 dbname=test user=postgres password=example") as conn:
-            conn.execute(create_table_statement)
 
 @task
-def calculate_metrics_postgresql(model):
-    current_data = pd.read_csv('../data/cleaned_car_data.csv')  # Use the single cleaned file
-    current_data['price'] = model.predict(current_data[num_features + cat_features].fillna(0))
+def load_reference_statistics(model):
+    # The reference distributions logged with the model run; runs trained before they were logged
+    # get them built once from the cleaned data and kept next to the model cache
+    cache = artifact_cache()
+    try:
+        reference_dir = cache.fetch_run_artifact(RUN_ID, REFERENCE_PATH, tracking_uri=MLFLOW_TRACKING_URI)
+        with open(os.path.join(reference_dir, 'reference_statistics.json')) as f:
+            return ReferenceStatistics.from_dict(json.load(f))
+    except (ArtifactCacheMiss, MlflowException, OSError) as e:
+        logging.info(f"No reference statistics logged with run {RUN_ID} ({e}); using the cleaned data")
+
+    local_path = os.path.join(cache.cache_dir, f'reference_statistics-{RUN_ID}.json')
+    if os.path.exists(local_path):
+        with open(local_path) as f:
+            return ReferenceStatistics.from_dict(json.load(f))
+    reference_data = read_dataset(CLEANED_DATA_PATH, columns=num_features + cat_features)
+    reference_data['price'] = model.predict(reference_data.fillna(0))
+    reference = ReferenceStatistics.build(reference_data, num_features + ['price'], cat_features)
+    with open(local_path, 'w') as f:
+        json.dump(reference.to_dict(), f)
+    return reference
 
-    report.run(reference_data=reference_data, current_data=current_data, column_mapping=column_mapping)
-    result = report.as_dict()
 
-    # Print the result to debug
-    logging.info(f"Report result: {result}")
+@task
+def prep_db(reference):
+    # The metrics database and table, created where missing; earlier metrics are kept
+    conninfo = create_database()
+    with MetricsSink(conninfo, reference.columns) as sink:
+        sink.ensure_schema()
+    return conninfo
 
-    # Check available keys
-    metrics = result.get('metrics', [])
-    for metric in metrics:
-        logging.info(f"Metric name: {metric.get('name')}, Metric result: {metric.get('result')}")
+@task
+def calculate_metrics_postgresql(model, reference, conninfo):
+    # Score and summarize the current data batch by batch, then compare the summary with the reference
+    start = time.perf_counter()
+    current = reference.window()
+    for batch in iter_dataset(CLEANED_DATA_PATH, columns=num_features + cat_features, batch_size=BATCH_SIZE):
+        batch['price'] = model.predict(batch.fillna(0))
+        current.update(batch)
+    result = drift_report(reference, current)
+    logging.info(f"Drift of {current.rows} rows computed in {time.perf_counter() - start:.2f}s: "
+                 f"{result['number_of_drifted_columns']} of {result['number_of_columns']} columns drifted")
+    for column, column_result in result['columns'].items():
+        logging.info(f"Column {column}: {column_result}")
+
+    with MetricsSink(conninfo, reference.columns) as sink:
+        sink.write(metrics_row(datetime.datetime.now(), result))
 
-    # Extract metrics based on available keys
-    try:
-        metrics = result.get('metrics', [])
-
-        # Iterate over metrics to find and extract values
-        for metric in metrics:
-            metric_name = metric.get('metric')
-            metric_result = metric.get('result', {})
-
-            if metric_name == 'ColumnDriftMetric':
-                prediction_drift = metric_result.get('drift_score')
-            elif metric_name == 'DatasetDriftMetric':
-                num_drifted_columns = metric_result.get('number_of_drifted_columns')
-            elif metric_name == 'DatasetMissingValuesMetric':
-                share_missing_values = metric_result.get('share_of_missing_values')
-    except KeyError as e:
-        logging.error(f"KeyError: {e}")
-        raise
-
-    with psycopg.connect("host=localhost port=5432 dbname=test user=postgres password=example", autocommit=True) as conn:
-        with conn.cursor() as curr:
-            curr.execute(
-                "INSERT INTO car_metrics(timestamp, prediction_drift, num_drifted_columns, share_missing_values) VALUES (%s, %s, %s, %s)",
-                (datetime.datetime.now(), prediction_drift, num_drifted_columns, share_missing_values)
-            )
+@task
+def backfill_windows(reference, conninfo, prediction_log_path, window, workers):
+    # One metrics row per window of the prediction log, skipping the windows already in the table
+    start = time.perf_counter()
+    with MetricsSink(conninfo, reference.columns) as sink:
+        counts = backfill(prediction_log_path, fetch_model(), reference, sink, window, workers,
+                          features=num_features + cat_features)
+    logging.info(f"Backfilled {counts['written']} of {counts['windows']} {window} windows "
+                 f"({counts['skipped']} already computed, {counts['open']} still open, {counts['failed']} failed, {counts['rows']} rows scored) in {time.perf_counter() - start:.2f}s")
+    return counts
 
 @flow
-def batch_monitoring_backfill():
+def batch_monitoring_backfill(prediction_log_path=None, window='1D', workers=None):
+    # Without a prediction log, one snapshot of the cleaned data is written at the current time
     model = load_model()
-    prep_db()
-    calculate_metrics_postgresql(model)
+    reference = load_reference_statistics(model)
+    conninfo = prep_db(reference)
+    if prediction_log_path is None:
+        calculate_metrics_postgresql(model, reference, conninfo)
+    else:
+        backfill_windows(reference, conninfo, prediction_log_path, window, workers)
 
 if __name__ == '__main__':
-    batch_monitoring_backfill()
+    # python data_quality_evidently_metrics_calculation.py [prediction_log_path [window [workers]]]
+    args = sys.argv[1:]
+    batch_monitoring_backfill(*args[:2], *[int(arg) for arg in args[2:3]])
@@ -0,0 +1,216 @@
+import numpy as np
+from scipy.spatial import distance
+from scipy.stats import wasserstein_distance
+
+# Bump when the persisted statistics change meaning
+DRIFT_STATISTICS_FORMAT = 1
+
+# Evidently's defaults: drift at a score of 0.1 per column, dataset drift once half the columns drift
+DRIFT_THRESHOLD = 0.1
+DRIFT_SHARE = 0.5
+# Evidently switches from p-value tests to these distances above 1000 reference rows
+MIN_REFERENCE_ROWS = 1000
+
+
+def _numeric(values):
+    # float64 values with infinities counted as missing, as Evidently does
+    values = np.asarray(values, dtype=np.float64)
+    return values[np.isfinite(values)]
+
+
+def bin_edges(values, max_bins):
+    """Bin edges for a numerical column from its reference values.
+
+    With at most `max_bins` distinct values the edges are the midpoints
+    between them, so every reference value has a bin of its own; otherwise
+    they are `max_bins` quantiles of the values.
+    """
+    unique = np.unique(values)
+    if len(unique) <= max_bins:
+        return (unique[1:] + unique[:-1]) / 2
+    return np.unique(np.quantile(values, np.linspace(0, 1, max_bins + 1)[1:-1]))
+
+
+class WindowSummary:
+    """Mergeable summary of a window of rows, laid out by `ReferenceStatistics`.
+
+    Numerical columns keep the count and the sum of the values in each bin,
+    plus the sum of squares; categorical columns keep the count of each
+    value. Summaries of consecutive batches merge by addition, so a window
+    is summarized batch by batch and never held in memory.
+    """
+
+    def __init__(self, edges, categorical):
+        self.edges = edges
+        self.rows = 0
+        self.missing = dict.fromkeys([*edges, *categorical], 0)
+        self.counts = {column: np.zeros(len(column_edges) + 1, dtype=np.int64) for column, column_edges in edges.items()}
+        self.sums = {column: np.zeros(len(column_edges) + 1) for column, column_edges in edges.items()}
+        self.squares = dict.fromkeys(edges, 0.0)
+        self.values = {column: {} for column in categorical}
+
+    def update(self, frame):
+        # Add a batch of rows; `frame` holds every summarized column
+        self.rows += len(frame)
+        for column, column_edges in self.edges.items():
+            values = _numeric(frame[column])
+            self.missing[column] += len(frame) - len(values)
+            bins = np.searchsorted(column_edges, values, side='right')
+            self.counts[column] += np.bincount(bins, minlength=len(column_edges) + 1)
+            self.sums[column] += np.bincount(bins, weights=values, minlength=len(column_edges) + 1)
+            self.squares[column] += float(np.dot(values, values))
+        for column, counts in self.values.items():
+            column_counts = frame[column].value_counts(dropna=True)
+            self.missing[column] += len(frame) - int(column_counts.sum())
+            for value, count in zip(column_counts.index.tolist(), column_counts.tolist()):
+                counts[value] = counts.get(value, 0) + count
+        return self
+
+    def merge(self, other):
+        self.rows += other.rows
+        for column in self.missing:
+            self.missing[column] += other.missing[column]
+        for column in self.edges:
+            self.counts[column] += other.counts[column]
+            self.sums[column] += other.sums[column]
+            self.squares[column] += other.squares[column]
+        for column, counts in self.values.items():
+            for value, count in other.values[column].items():
+                counts[value] = counts.get(value, 0) + count
+        return self
+
+    def share_of_missing_values(self):
+        # Missing cells over all cells, as in Evidently's DatasetMissingValuesMetric
+        cells = self.rows * len(self.missing)
+        return sum(self.missing.values()) / cells if cells else 0.0
+
+    def to_dict(self):
+        return {
+            'rows': self.rows,
+            'missing': dict(self.missing),
+            'counts': {column: counts.tolist() for column, counts in self.counts.items()},
+            'sums': {column: sums.tolist() for column, sums in self.sums.items()},
+            'squares': dict(self.squares),
+            'values': {column: [[value, count] for value, count in counts.items()] for column, counts in self.values.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data, edges):
+        summary = cls(edges, list(data['values']))
+        summary.rows = data['rows']
+        summary.missing = dict(data['missing'])
+        summary.counts = {column: np.asarray(counts, dtype=np.int64) for column, counts in data['counts'].items()}
+        summary.sums = {column: np.asarray(sums, dtype=np.float64) for column, sums in data['sums'].items()}
+        summary.squares = dict(data['squares'])
+        summary.values = {column: {value: count for value, count in pairs} for column, pairs in data['values'].items()}
+        return summary
+
+
+class ReferenceStatistics:
+    """Reference distributions of the monitored columns, precomputed once.
+
+    Holds the bin edges of every numerical column and the `WindowSummary` of
+    the reference rows. A current window summarized against the same edges
+    (`summarize`) is compared with `drift_report` without the reference rows.
+    """
+
+    def __init__(self, edges, categorical, summary):
+        self.edges = edges
+        self.categorical = list(categorical)
+        self.summary = summary
+
+    @classmethod
+    def build(cls, frame, numerical, categorical, max_bins=1024):
+        edges = {column: bin_edges(_numeric(frame[column]), max_bins) for column in numerical}
+        summary = WindowSummary(edges, categorical).update(frame)
+        short = [column for column, missing in summary.missing.items() if summary.rows - missing <= MIN_REFERENCE_ROWS]
+        if short:
+            raise ValueError(f"Reference statistics need more than {MIN_REFERENCE_ROWS} values in every column, "
+                             f"not in {short}")
+        return cls(edges, categorical, summary)
+
+    @property
+    def columns(self):
+        return [*self.edges, *self.categorical]
+
+    def window(self):
+        # An empty current window with the reference layout
+        return WindowSummary(self.edges, self.categorical)
+
+    def summarize(self, frame):
+        return self.window().update(frame)
+
+    def to_dict(self):
+        return {
+            'format': DRIFT_STATISTICS_FORMAT,
+            'edges': {column: edges.tolist() for column, edges in self.edges.items()},
+            'categorical': self.categorical,
+            'summary': self.summary.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        if data.get('format') != DRIFT_STATISTICS_FORMAT:
+            raise ValueError(f"Unsupported reference statistics format {data.get('format')!r}")
+        edges = {column: np.asarray(column_edges, dtype=np.float64) for column, column_edges in data['edges'].items()}
+        return cls(edges, data['categorical'], WindowSummary.from_dict(data['summary'], edges))
+
+
+def _value_percents(reference_counts, current_counts):
+    keys = list(reference_counts.keys() | current_counts.keys())
+    reference = np.array([reference_counts.get(key, 0) for key in keys], dtype=np.float64)
+    current = np.array([current_counts.get(key, 0) for key in keys], dtype=np.float64)
+    return reference / reference.sum(), current / current.sum()
+
+
+def column_drift(reference, current, column, threshold=DRIFT_THRESHOLD):
+    """Drift score of one column from the reference and current summaries.
+
+    Follows Evidently's default tests for more than 1000 reference values:
+    the Jensen-Shannon distance of the value shares for categorical columns
+    and numerical columns with at most 5 values, otherwise the Wasserstein
+    distance normed by the reference standard deviation. Numerical values in
+    a bin are taken at the mean of the bin, which is exact while the column
+    has no more distinct values than bins; quantile bins put the distance
+    within a bin width of Evidently's.
+    """
+    ref, cur = reference.summary, current
+    if cur.rows - cur.missing[column] == 0:
+        raise ValueError(f"Column {column!r} has no values in the current window")
+    if column in reference.categorical:
+        stattest = 'jensenshannon'
+        score = distance.jensenshannon(*_value_percents(ref.values[column], cur.values[column]))
+    else:
+        ref_counts, cur_counts = ref.counts[column], cur.counts[column]
+        # The number of distinct values is known exactly while every bin holds one value
+        if np.count_nonzero(ref_counts + cur_counts) <= 5:
+            stattest = 'jensenshannon'
+            score = distance.jensenshannon(ref_counts / ref_counts.sum(), cur_counts / cur_counts.sum())
+        else:
+            stattest = 'wasserstein'
+            ref_bins, cur_bins = ref_counts > 0, cur_counts > 0
+            count = ref_counts.sum()
+            mean = ref.sums[column].sum() / count
+            std = np.sqrt(max(ref.squares[column] / count - mean ** 2, 0.0))
+            score = wasserstein_distance(ref.sums[column][ref_bins] / ref_counts[ref_bins],
+                                         cur.sums[column][cur_bins] / cur_counts[cur_bins],
+                                         ref_counts[ref_bins], cur_counts[cur_bins]) / max(std, 0.001)
+    return {'stattest': stattest, 'drift_score': float(score), 'drift_detected': bool(score >= threshold)}
+
+
+def drift_report(reference, current, threshold=DRIFT_THRESHOLD, drift_share=DRIFT_SHARE):
+    """Column and dataset drift of a current `WindowSummary` against `reference`.
+
+    Returns the per-column results of `column_drift` and the fields of
+    Evidently's DatasetDriftMetric and DatasetMissingValuesMetric.
+    """
+    columns = {column: column_drift(reference, current, column, threshold) for column in reference.columns}
+    drifted = sum(result['drift_detected'] for result in columns.values())
+    return {
+        'columns': columns,
+        'number_of_columns': len(columns),
+        'number_of_drifted_columns': drifted,
+        'share_of_drifted_columns': drifted / len(columns),
+        'dataset_drift': drifted / len(columns) >= drift_share,
+        'share_of_missing_values': current.share_of_missing_values(),
+    }
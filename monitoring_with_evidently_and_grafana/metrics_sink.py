@@ -0,0 +1,133 @@
+import re
+import threading
+import psycopg
+from psycopg import sql
+from psycopg.conninfo import make_conninfo
+from psycopg_pool import ConnectionPool
+
+SERVER_CONNINFO = "host=localhost port=5432 user=postgres password=example"
+DATABASE = 'test'
+TABLE = 'car_metrics'
+
+# Columns of every metrics row; the drift score of each monitored column follows as <column>_drift
+SUMMARY_COLUMNS = [
+    ('timestamp', 'TIMESTAMP'),
+    ('prediction_drift', 'FLOAT'),
+    ('num_drifted_columns', 'integer'),
+    ('share_missing_values', 'FLOAT'),
+    ('share_drifted_columns', 'FLOAT'),
+    ('dataset_drift', 'boolean'),
+]
+
+
+def drift_column(column):
+    # SQL name of a monitored column's drift score, e.g. transmission_Semi-Auto -> transmission_semi_auto_drift
+    return re.sub(r'\W+', '_', column).lower() + '_drift'
+
+
+def create_database(conninfo=SERVER_CONNINFO, dbname=DATABASE):
+    # Create the metrics database on the server if it is missing; returns the conninfo of the database
+    with psycopg.connect(conninfo, autocommit=True) as conn:
+        if not conn.execute("SELECT 1 FROM pg_database WHERE datname = %s", (dbname,)).fetchall():
+            conn.execute(sql.SQL("CREATE DATABASE {}").format(sql.Identifier(dbname)))
+    return make_conninfo(conninfo, dbname=dbname)
+
+
+def metrics_row(timestamp, result, prediction_column='price'):
+    # One row of the metrics table from a drift_statistics.drift_report result
+    row = {
+        'timestamp': timestamp,
+        'prediction_drift': result['columns'][prediction_column]['drift_score'],
+        'num_drifted_columns': result['number_of_drifted_columns'],
+        'share_missing_values': result['share_of_missing_values'],
+        'share_drifted_columns': result['share_of_drifted_columns'],
+        'dataset_drift': result['dataset_drift'],
+    }
+    row.update({drift_column(column): column_result['drift_score'] for column, column_result in result['columns'].items()})
+    return row
+
+
+class MetricsSink:
+    """Batched writer of drift metrics rows to Postgres.
+
+    Connections come from a pool of at most `pool_size`, so writers on
+    several threads share a few long-lived connections. Rows are buffered
+    and written `batch_size` at a time with one `COPY` per batch; `close`
+    (or leaving the `with` block) writes the rest. `ensure_schema` creates
+    the table, its drift score columns and the `timestamp` index only where
+    they are missing, so it is safe to run on every start and upgrades a
+    table with the original four columns in place.
+    """
+
+    def __init__(self, conninfo, monitored_columns, table=TABLE, batch_size=1000, pool_size=4):
+        self.table = table
+        self.columns = [name for name, _ in SUMMARY_COLUMNS] + [drift_column(column) for column in monitored_columns]
+        self.batch_size = batch_size
+        self.pool = ConnectionPool(conninfo, min_size=1, max_size=pool_size, open=True)
+        self.pending = []
+        self.rows = 0
+        self.lock = threading.Lock()
+
+    def ensure_schema(self):
+        table = sql.Identifier(self.table)
+        column_types = dict(SUMMARY_COLUMNS)
+        with self.pool.connection() as conn:
+            conn.execute(sql.SQL("CREATE TABLE IF NOT EXISTS {} (timestamp TIMESTAMP)").format(table))
+            for column in self.columns:
+                conn.execute(sql.SQL("ALTER TABLE {} ADD COLUMN IF NOT EXISTS {} {}").format(
+                    table, sql.Identifier(column), sql.SQL(column_types.get(column, 'FLOAT'))))
+            conn.execute(sql.SQL("CREATE INDEX IF NOT EXISTS {} ON {} (timestamp)").format(
+                sql.Identifier(f'{self.table}_timestamp_idx'), table))
+        return self
+
+    def timestamps(self, start, end):
+        # Timestamps of the rows already in the table in [start, end), through the timestamp index
+        statement = sql.SQL("SELECT DISTINCT timestamp FROM {} WHERE timestamp >= %s AND timestamp < %s").format(
+            sql.Identifier(self.table))
+        with self.pool.connection() as conn:
+            return {timestamp for timestamp, in conn.execute(statement, (start, end))}
+
+    def write(self, row):
+        with self.lock:
+            self.pending.append(row)
+            batch = self._take(self.batch_size)
+        if batch:
+            self._copy(batch)
+
+    def write_many(self, rows):
+        for row in rows:
+            self.write(row)
+
+    def flush(self):
+        with self.lock:
+            batch = self._take(1)
+        if batch:
+            self._copy(batch)
+
+    def _take(self, min_rows):
+        # The buffered rows once there are at least min_rows of them; called with the lock held
+        if len(self.pending) < min_rows:
+            return None
+        batch, self.pending = self.pending, []
+        return batch
+
+    def _copy(self, batch):
+        statement = sql.SQL("COPY {} ({}) FROM STDIN").format(
+            sql.Identifier(self.table), sql.SQL(', ').join(map(sql.Identifier, self.columns)))
+        with self.pool.connection() as conn, conn.cursor() as cur, cur.copy(statement) as copy:
+            for row in batch:
+                copy.write_row([row.get(column) for column in self.columns])
+        with self.lock:
+            self.rows += len(batch)
+
+    def close(self):
+        try:
+            self.flush()
+        finally:
+            self.pool.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
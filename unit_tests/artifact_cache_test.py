@@ -0,0 +1,98 @@
+# unit_tests/artifact_cache_test.py
+
+import os
+import tempfile
+import unittest
+from unittest.mock import Mock, patch
+from mlflow.tracking import MlflowClient
+from mlflow.artifacts import download_artifacts
+from artifact_cache import ArtifactCache, ArtifactCacheMiss, tree_checksum
+from model import load_model
+
+# Newer MLflow releases only allow the file store as an explicit opt-in
+os.environ.setdefault('MLFLOW_ALLOW_FILE_STORE', 'true')
+
+
+class TestArtifactCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cache_dir = os.path.join(self.tmp_dir.name, 'cache')
+
+        # Local file-based MLflow store standing in for the tracking server
+        self.tracking_uri = f"file:{os.path.join(self.tmp_dir.name, 'mlruns')}"
+        client = MlflowClient(tracking_uri=self.tracking_uri)
+        experiment_id = client.create_experiment('cache-test')
+        run = client.create_run(experiment_id)
+        self.run_id = run.info.run_id
+        self.artifact_uri = run.info.artifact_uri
+
+        model_dir = os.path.join(self.tmp_dir.name, 'xgboost_model')
+        os.makedirs(model_dir)
+        with open(os.path.join(model_dir, 'model.xgb'), 'wb') as f:
+            f.write(b'x' * 1000)
+        client.log_artifacts(self.run_id, model_dir, artifact_path='xgboost_model')
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_warm_start_skips_download(self):
+        download_fn = Mock(side_effect=download_artifacts)
+        cache = ArtifactCache(self.cache_dir, download_fn=download_fn)
+
+        cold_path = cache.fetch_run_artifact(self.run_id, 'xgboost_model', self.tracking_uri)
+        warm_path = cache.fetch_run_artifact(self.run_id, 'xgboost_model', self.tracking_uri)
+
+        self.assertEqual(cold_path, warm_path)
+        self.assertEqual(download_fn.call_count, 1)
+        self.assertEqual(os.path.basename(os.path.normpath(cold_path)), tree_checksum(cold_path))
+        self.assertTrue(os.path.exists(os.path.join(cold_path, 'model.xgb')))
+        # No temporary download directories are left behind
+        self.assertEqual(sorted(os.listdir(self.cache_dir)), ['index.json', 'objects'])
+
+    def test_offline_mode(self):
+        ArtifactCache(self.cache_dir).fetch_run_artifact(self.run_id, 'xgboost_model', self.tracking_uri)
+
+        download_fn = Mock(side_effect=ConnectionError('tracking server unreachable'))
+        offline_cache = ArtifactCache(self.cache_dir, offline=True, download_fn=download_fn)
+        path = offline_cache.fetch_run_artifact(self.run_id, 'xgboost_model', self.tracking_uri)
+        self.assertTrue(os.path.exists(os.path.join(path, 'model.xgb')))
+        download_fn.assert_not_called()
+
+        with self.assertRaises(ArtifactCacheMiss):
+            offline_cache.fetch_run_artifact('unknown-run', 'xgboost_model', self.tracking_uri)
+
+    def test_single_file_artifact(self):
+        cache = ArtifactCache(self.cache_dir)
+        uri = f'{self.artifact_uri}/xgboost_model/model.xgb'
+        path = cache.fetch_uri(uri)
+        self.assertTrue(os.path.isfile(path))
+        self.assertEqual(cache.fetch_uri(uri), path)
+
+    def test_lru_eviction(self):
+        cache = ArtifactCache(self.cache_dir, max_size_bytes=1500)
+        first = cache.fetch_uri(f'{self.artifact_uri}/xgboost_model/model.xgb')
+
+        other_dir = os.path.join(self.tmp_dir.name, 'other_model')
+        os.makedirs(other_dir)
+        with open(os.path.join(other_dir, 'model.xgb'), 'wb') as f:
+            f.write(b'y' * 1000)
+        MlflowClient(tracking_uri=self.tracking_uri).log_artifacts(self.run_id, other_dir, artifact_path='other_model')
+        second = cache.fetch_uri(f'{self.artifact_uri}/other_model/model.xgb')
+
+        self.assertFalse(os.path.exists(first))
+        self.assertTrue(os.path.exists(second))
+
+    @patch('model.mlflow.pyfunc.load_model')
+    def test_load_model_uses_cache(self, mock_load_model):
+        env = {
+            'MODEL_LOCATION': f'{self.artifact_uri}/xgboost_model',
+            'MODEL_CACHE_DIR': self.cache_dir,
+        }
+        with patch.dict(os.environ, env):
+            load_model(self.run_id)
+        local_path = mock_load_model.call_args[0][0]
+        self.assertTrue(local_path.startswith(os.path.join(self.cache_dir, 'objects')))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,141 @@
+import os
+import json
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from model import init
+
+# Per-process ModelService, created by the pool initializer in every worker
+_model_service = None
+
+
+def _init_worker(model_service_factory, factory_args):
+    global _model_service  # pylint: disable=global-statement
+    _model_service = model_service_factory(*factory_args)
+
+
+def _predict(car_data):
+    return _model_service.predict_car_price(car_data)
+
+
+def _ready():
+    return _model_service is not None
+
+
+class PredictionServer:
+    """Minimal ASGI app that scores requests in a pool of worker processes.
+
+    Requests are accepted on the event loop and handed to one of `workers`
+    processes, each holding its own ModelService. At most `max_pending`
+    predictions may be queued or running; beyond that requests are shed with
+    503, and a prediction that takes longer than `timeout` seconds gets 504.
+    """
+
+    def __init__(self, model_service_factory=init, factory_args=(), workers=2, max_pending=64, timeout=5.0):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.pending = 0
+        self.counters = {'requests': 0, 'shed': 0, 'timeouts': 0, 'errors': 0}
+        # Spawned workers don't inherit the server's listening socket
+        self.pool = ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker, initargs=(model_service_factory, factory_args)
+        )
+
+    async def start_workers(self):
+        # Start every worker and load its model before the first request arrives
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self.pool, _ready) for _ in range(self.workers)))
+
+    def stats(self):
+        return dict(self.counters, pending=self.pending, workers=self.workers, max_pending=self.max_pending)
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+
+        method, path = scope['method'], scope['path']
+        if method == 'POST' and path == '/predict':
+            status, body = await self._predict(await self._read_body(receive))
+        elif method == 'GET' and path == '/health':
+            status, body = 200, {'status': 'ok'}
+        elif method == 'GET' and path == '/stats':
+            status, body = 200, self.stats()
+        else:
+            status, body = 404, {'error': 'Not found'}
+        await self._respond(send, status, body)
+
+    async def _predict(self, body):
+        self.counters['requests'] += 1
+        try:
+            car_data = json.loads(body)
+        except ValueError as e:
+            return 400, {'error': f'Invalid JSON body: {e}'}
+
+        if self.pending >= self.max_pending:
+            # Load shedding: fail fast instead of queueing without bound
+            self.counters['shed'] += 1
+            return 503, {'error': 'Server overloaded, retry later'}
+
+        self.pending += 1
+        future = asyncio.get_running_loop().run_in_executor(self.pool, _predict, car_data)
+        # The slot is released when the worker finishes, even if the caller timed out
+        future.add_done_callback(self._release)
+        try:
+            return 200, await asyncio.wait_for(asyncio.shield(future), self.timeout)
+        except asyncio.TimeoutError:
+            self.counters['timeouts'] += 1
+            return 504, {'error': f'Prediction timed out after {self.timeout}s'}
+        except Exception as e:  # pylint: disable=broad-except
+            self.counters['errors'] += 1
+            return 500, {'error': str(e)}
+
+    def _release(self, future):
+        self.pending -= 1
+        if not future.cancelled():
+            future.exception()  # mark the exception as retrieved
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await self.start_workers()
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.pool.shutdown(wait=True, cancel_futures=True)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    @staticmethod
+    async def _read_body(receive):
+        body = b''
+        more_body = True
+        while more_body:
+            message = await receive()
+            body += message.get('body', b'')
+            more_body = message.get('more_body', False)
+        return body
+
+    @staticmethod
+    async def _respond(send, status, body):
+        payload = json.dumps(body).encode()
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [(b'content-type', b'application/json'), (b'content-length', str(len(payload)).encode())],
+        })
+        await send({'type': 'http.response.body', 'body': payload})
+
+
+def create_app():
+    # Configured from the environment, like the Flask app; served by an ASGI server the deployment
+    # provides, e.g. `uvicorn --factory asgi_app:create_app`
+    return PredictionServer(
+        factory_args=(os.getenv('RUN_ID'), os.getenv('INFERENCE_MODE', 'pyfunc')),
+        workers=int(os.getenv('WORKERS', '2')),
+        max_pending=int(os.getenv('MAX_PENDING', '64')),
+        timeout=float(os.getenv('REQUEST_TIMEOUT', '5')),
+    )
+
@@ -0,0 +1,79 @@
+# unit_tests/asgi_app_test.py
+
+import json
+import time
+import asyncio
+import unittest
+from asgi_app import PredictionServer
+from model import ModelService
+
+
+class SlowModel:
+    def __init__(self, delay):
+        self.delay = delay
+
+    def predict(self, features):
+        time.sleep(self.delay)
+        return [14259.82] * len(features)
+
+
+def model_service_factory(delay=0.0):
+    return ModelService(SlowModel(delay), model_version='v1')
+
+
+async def call(app, method, path, body=None):
+    scope = {'type': 'http', 'method': method, 'path': path}
+    messages = [{'type': 'http.request', 'body': json.dumps(body).encode() if body is not None else b''}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    await app(scope, receive, send)
+    return sent[0]['status'], json.loads(sent[1]['body'])
+
+
+class TestPredictionServer(unittest.TestCase):
+    def run_app(self, app, *requests):
+        async def run():
+            # As on lifespan startup, so worker start-up doesn't count against the request timeout
+            await app.start_workers()
+            return await asyncio.gather(*(call(app, *request) for request in requests))
+        try:
+            return asyncio.run(run())
+        finally:
+            app.pool.shutdown()
+
+    def test_predict(self):
+        app = PredictionServer(model_service_factory, workers=1)
+        (status, body), = self.run_app(app, ('POST', '/predict', {'year': 2020.0}))
+        self.assertEqual(status, 200)
+        self.assertEqual(body, {
+            'model': 'car_price_prediction_model',
+            'version': 'v1',
+            'prediction': {'car_price': 14259.82}
+        })
+
+    def test_load_shedding(self):
+        app = PredictionServer(model_service_factory, factory_args=(0.5,), workers=1, max_pending=1)
+        results = self.run_app(app, ('POST', '/predict', {'year': 2020.0}), ('POST', '/predict', {'year': 2021.0}))
+        self.assertEqual(sorted(status for status, _ in results), [200, 503])
+        self.assertEqual(app.stats()['shed'], 1)
+
+    def test_timeout(self):
+        app = PredictionServer(model_service_factory, factory_args=(1.0,), workers=1, timeout=0.1)
+        (status, _), = self.run_app(app, ('POST', '/predict', {'year': 2020.0}))
+        self.assertEqual(status, 504)
+        self.assertEqual(app.stats()['timeouts'], 1)
+
+    def test_routes(self):
+        app = PredictionServer(model_service_factory, workers=1)
+        results = self.run_app(app, ('GET', '/health'), ('GET', '/missing'))
+        self.assertEqual([status for status, _ in results], [200, 404])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+# unit_tests/batching_test.py
+
+import unittest
+from unittest.mock import Mock
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from batching import MicroBatcher
+from model import ModelService
+
+
+class TestMicroBatcher(unittest.TestCase):
+    def test_concurrent_requests_are_merged(self):
+        calls = []
+
+        def predict_fn(records):
+            calls.append(len(records))
+            return [record['mileage'] * 2 for record in records]
+
+        batcher = MicroBatcher(predict_fn, max_batch_size=8, max_wait_ms=50)
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(lambda i: batcher.predict({'mileage': i}), range(8)))
+
+        # Each caller gets its own prediction back
+        self.assertEqual(results, [i * 2.0 for i in range(8)])
+        self.assertLess(len(calls), 8)
+
+        stats = batcher.stats()
+        self.assertEqual(stats['rows'], 8)
+        self.assertEqual(stats['batches'], len(calls))
+        self.assertEqual(stats['max_batch_size'], max(calls))
+        self.assertEqual(stats['queue_depth'], 0)
+
+    def test_errors_are_returned_to_the_caller(self):
+        batcher = MicroBatcher(Mock(side_effect=ValueError('bad input')), max_wait_ms=1)
+        with self.assertRaises(ValueError):
+            batcher.predict({'mileage': 1})
+
+    def test_bad_row_fails_only_its_own_request(self):
+        calls = []
+
+        def predict_fn(records):
+            calls.append(len(records))
+            return [float(record['mileage']) * 2 for record in records]
+
+        batcher = MicroBatcher(predict_fn, max_batch_size=2, max_wait_ms=1000)
+        good = batcher.submit({'mileage': 10})
+        bad = batcher.submit({'mileage': 'not a number'})
+
+        self.assertEqual(good.result(timeout=5), 20.0)
+        with self.assertRaises(ValueError):
+            bad.result(timeout=5)
+        # Merged into one call, then rescored one half at a time
+        self.assertEqual(calls, [2, 1, 1])
+        self.assertEqual(batcher.stats()['batches'], 1)
+
+    def test_bad_predictions_do_not_stop_the_worker(self):
+        def predict_fn(records):
+            if records[0]['mileage'] is None:
+                return None
+            # Never more than one prediction, whatever the number of rows
+            return [record['mileage'] * 2.0 for record in records][:1] if records[0]['mileage'] else []
+
+        batcher = MicroBatcher(predict_fn, max_batch_size=2, max_wait_ms=1000)
+        # Not a list of numbers: the row fails and the worker keeps running
+        with self.assertRaises(TypeError):
+            batcher.predict({'mileage': None}, timeout=5)
+        with self.assertRaises(ValueError):
+            batcher.predict({'mileage': 0}, timeout=5)
+        # Too few predictions for the batch: its rows are rescored on their own
+        futures = [batcher.submit({'mileage': 2}), batcher.submit({'mileage': 3})]
+        self.assertEqual([future.result(timeout=5) for future in futures], [4.0, 6.0])
+        self.assertTrue(batcher._worker.is_alive())
+
+    def test_model_service_with_micro_batching(self):
+        mock_model = Mock()
+        mock_model.predict.side_effect = lambda df: np.full(len(df), 14259.82)
+        model_service = ModelService(mock_model, model_version="v1")
+        # A long wait, so the batch is flushed when all four rows have arrived
+        model_service.enable_micro_batching(max_batch_size=4, max_wait_ms=5000)
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            results = list(pool.map(model_service.predict_car_price, [{'year': 2020.0}] * 4))
+
+        expected_output = {
+            'model': 'car_price_prediction_model',
+            'version': 'v1',
+            'prediction': {'car_price': 14259.82}
+        }
+        self.assertEqual(results, [expected_output] * 4)
+        self.assertEqual(mock_model.predict.call_count, 1)
+        self.assertEqual(model_service.batcher.stats()['max_batch_size'], 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
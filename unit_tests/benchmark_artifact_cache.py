@@ -0,0 +1,47 @@
+# unit_tests/benchmark_artifact_cache.py
+#
+# Startup time (fetch + load) with a cold and a warm local artifact cache.
+# A local file-based MLflow store stands in for the remote tracking server.
+#
+# Usage: python benchmark_artifact_cache.py
+
+import os
+import time
+import tempfile
+import mlflow.pyfunc
+from mlflow.tracking import MlflowClient
+from mlflow.artifacts import download_artifacts
+from artifact_cache import ArtifactCache
+from model_fixtures import save_test_model
+
+os.environ.setdefault('MLFLOW_ALLOW_FILE_STORE', 'true')
+
+
+def startup(fetch):
+    start = time.perf_counter()
+    mlflow.pyfunc.load_model(fetch())
+    return time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tracking_uri = f"file:{os.path.join(tmp_dir, 'mlruns')}"
+        client = MlflowClient(tracking_uri=tracking_uri)
+        run_id = client.create_run(client.create_experiment('cache-benchmark')).info.run_id
+
+        model_dir = os.path.join(tmp_dir, 'xgboost_model')
+        save_test_model(model_dir, n_estimators=500, max_depth=9)
+        client.log_artifacts(run_id, model_dir, artifact_path='xgboost_model')
+
+        def no_cache():
+            dst_path = tempfile.mkdtemp(dir=tmp_dir)
+            return download_artifacts(run_id=run_id, artifact_path='xgboost_model', tracking_uri=tracking_uri, dst_path=dst_path)
+
+        cache = ArtifactCache(os.path.join(tmp_dir, 'cache'))
+
+        def cached():
+            return cache.fetch_run_artifact(run_id, 'xgboost_model', tracking_uri=tracking_uri)
+
+        print(f"No cache:   {startup(no_cache):.3f}s")
+        print(f"Cold cache: {startup(cached):.3f}s")
+        print(f"Warm cache: {min(startup(cached) for _ in range(3)):.3f}s")
@@ -0,0 +1,49 @@
+# unit_tests/benchmark_cross_validation.py
+#
+# Wall time of 5-fold cross-validation on the cleaned source data for
+# different process pool sizes, each on an empty fold cache, and of a rerun
+# that finds every fold in the cache.
+#
+# Usage: python benchmark_cross_validation.py [--rounds N] [workers ...]
+# Worker counts default to 1 2 4; the optimized parameters are used with
+# N boosting rounds (default 100).
+
+import os
+import sys
+import time
+import tempfile
+from pipeline_fixtures import DATA_DIR, workflow_orchestration as wo  # isort: skip  (adds the workflow directory to sys.path)
+from cross_validation import cross_validate
+from data_store import TARGET_COLUMN
+from preprocessing_engine import preprocess
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    rounds = 100
+    if '--rounds' in args:
+        i = args.index('--rounds')
+        rounds = int(args[i + 1])
+        del args[i:i + 2]
+    worker_counts = [int(arg) for arg in args] or [1, 2, 4]
+
+    cleaned_df, _, _ = preprocess(DATA_DIR)
+    X = wo.compact_features(cleaned_df.drop(columns=[TARGET_COLUMN]))
+    y = cleaned_df[TARGET_COLUMN]
+    params = dict(wo.get_optimized_params.fn(), n_estimators=rounds)
+    print(f"{os.cpu_count()} CPUs, {len(y)} rows, {rounds} rounds")
+
+    baseline = None
+    for workers in worker_counts:
+        with tempfile.TemporaryDirectory() as cache_dir:
+            (_, summary), seconds = timed(lambda: cross_validate(X, y, params, 5, workers, cache_dir))
+            baseline = baseline or seconds
+            _, cached_seconds = timed(lambda: cross_validate(X, y, params, 5, workers, cache_dir))
+        print(f"{workers:3d} workers: {seconds:7.2f}s ({baseline / seconds:4.2f}x), cached rerun {cached_seconds:5.2f}s, "
+              f"CV RMSE {summary['cv_rmse_mean']:.2f} ± {summary['cv_rmse_std']:.2f}")
@@ -0,0 +1,60 @@
+# unit_tests/benchmark_data_store.py
+#
+# Write/read time and file size of the cleaned dataset as CSV and as the
+# Parquet store, including the 19-column read done by monitoring and the
+# memory-mapped feature matrix used for training.
+#
+# Usage: python benchmark_data_store.py [factor ...]
+# The cleaned source data is repeated `factor` times (default: 1 and 10).
+
+import os
+import sys
+import time
+import tempfile
+import numpy as np
+import pandas as pd
+from data_store import open_feature_matrix, read_dataset, write_dataset
+from model_fixtures import NUM_FEATURES, CAT_FEATURES
+from pipeline_fixtures import DATA_DIR
+from preprocessing_engine import preprocess
+
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def size_mb(*paths):
+    return sum(os.path.getsize(path) for path in paths) / 1024 ** 2
+
+
+def touch_matrix(path):
+    # Page the whole mapped matrix in
+    X, y, _, _ = open_feature_matrix(path)
+    return float(np.asarray(X).sum() + np.asarray(y).sum())
+
+
+if __name__ == '__main__':
+    factors = [int(arg) for arg in sys.argv[1:]] or [1, 10]
+    cleaned_df, _, _ = preprocess(DATA_DIR)
+    features = NUM_FEATURES + CAT_FEATURES
+
+    for factor in factors:
+        df = pd.concat([cleaned_df] * factor, ignore_index=True)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            csv_file = os.path.join(tmp_dir, 'cleaned_car_data.csv')
+            parquet_file = os.path.join(tmp_dir, 'cleaned_car_data.parquet')
+            stem = os.path.join(tmp_dir, 'cleaned_car_data')
+
+            print(f"{factor}x cleaned data: {len(df)} rows, {len(df.columns)} columns")
+            print(f"  write  csv {timed(lambda: df.to_csv(csv_file, index=False)):7.3f}s"
+                  f"   parquet {timed(lambda: write_dataset(df, parquet_file, feature_matrix=False)):7.3f}s"
+                  f"   parquet + matrix {timed(lambda: write_dataset(df, parquet_file)):7.3f}s")
+            print(f"  size   csv {size_mb(csv_file):7.1f}MB   parquet {size_mb(parquet_file):7.1f}MB"
+                  f"   matrix {size_mb(stem + '.features.npy', stem + '.target.npy'):7.1f}MB")
+            print(f"  read   csv {timed(lambda: read_dataset(csv_file)):7.3f}s"
+                  f"   parquet {timed(lambda: read_dataset(parquet_file)):7.3f}s"
+                  f"   mapped matrix {timed(lambda: touch_matrix(parquet_file)):7.3f}s")
+            print(f"  read 19 feature columns: csv {timed(lambda: read_dataset(csv_file, features)):7.3f}s"
+                  f"   parquet {timed(lambda: read_dataset(parquet_file, features)):7.3f}s")
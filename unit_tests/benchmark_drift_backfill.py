@@ -0,0 +1,89 @@
+# unit_tests/benchmark_drift_backfill.py
+#
+# Wall time of a drift backfill over a synthetic prediction log for different
+# process pool sizes, each into an empty car_metrics table, and of a rerun
+# that finds every window already computed. The log is the test split of the
+# cleaned source data repeated over --days days of daily windows; the model is
+# trained for 100 rounds on the training split, which is also the reference.
+# The log is written as one Parquet part file per day.
+# Metrics go to MONITORING_TEST_CONNINFO or an embedded pgserver instance.
+#
+# Usage: python benchmark_drift_backfill.py [--days N] [--rows-per-day N] [workers ...]
+# Worker counts default to 1 2 4; 90 days of 20000 rows by default.
+
+import os
+import sys
+import time
+import datetime
+import tempfile
+import numpy as np
+import pandas as pd
+import psycopg
+import mlflow.xgboost
+import xgboost as xgb
+from sklearn.model_selection import train_test_split
+from pipeline_fixtures import DATA_DIR, workflow_orchestration as wo  # isort: skip  (adds the workflow directory to sys.path)
+from data_store import TARGET_COLUMN, DatasetWriter
+from drift_backfill import backfill
+from drift_statistics import ReferenceStatistics
+from metrics_sink import MetricsSink, create_database
+from postgres_fixtures import postgres_server
+from preprocessing_engine import preprocess
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def option(args, name, default):
+    if name not in args:
+        return default
+    i = args.index(name)
+    value = int(args[i + 1])
+    del args[i:i + 2]
+    return value
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    days = option(args, '--days', 90)
+    rows_per_day = option(args, '--rows-per-day', 20000)
+    worker_counts = [int(arg) for arg in args] or [1, 2, 4]
+
+    cleaned_df, _, _ = preprocess(DATA_DIR)
+    X = wo.compact_features(cleaned_df.drop(columns=[TARGET_COLUMN]))
+    X_train, X_test, y_train, _ = train_test_split(X, cleaned_df[TARGET_COLUMN], test_size=0.2, random_state=42)
+    booster = wo.fit_booster(X_train, y_train, dict(wo.get_optimized_params.fn(), n_estimators=100))
+    categorical = [column for column, dtype in X.dtypes.items() if dtype == bool]
+    reference = ReferenceStatistics.build(X_train.assign(**{TARGET_COLUMN: booster.predict(xgb.DMatrix(X_train))}),
+                                          [column for column in X.columns if column not in categorical] + [TARGET_COLUMN],
+                                          categorical)
+
+    with tempfile.TemporaryDirectory() as tmp_dir, postgres_server() as server_conninfo:
+        model_path = os.path.join(tmp_dir, 'model')
+        mlflow.xgboost.save_model(booster, model_path)
+        n_rows = days * rows_per_day
+        log = pd.concat([X_test] * -(-n_rows // len(X_test)), ignore_index=True).head(n_rows)
+        log.insert(0, 'timestamp', datetime.datetime(2024, 1, 1) + pd.to_timedelta(
+            np.arange(n_rows) * (86400 / rows_per_day), unit='s'))
+        # One Parquet part per day, as a rotating log writes them, so each window reads only its own part
+        writer = DatasetWriter(os.path.join(tmp_dir, 'prediction_log.parquet'))
+        for start in range(0, n_rows, rows_per_day):
+            writer.write(log.iloc[start:start + rows_per_day])
+        log_path = writer.path
+        conninfo = create_database(server_conninfo, 'benchmark_backfill')
+        print(f"{os.cpu_count()} CPUs, {n_rows} logged rows in {days} daily windows")
+
+        baseline = None
+        for workers in worker_counts:
+            with psycopg.connect(conninfo, autocommit=True) as conn:
+                conn.execute("DROP TABLE IF EXISTS car_metrics")
+            with MetricsSink(conninfo, reference.columns) as sink:
+                sink.ensure_schema()
+                counts, seconds = timed(lambda: backfill(log_path, model_path, reference, sink, '1D', workers))
+                baseline = baseline or seconds
+                rerun, rerun_seconds = timed(lambda: backfill(log_path, model_path, reference, sink, '1D', workers))
+            print(f"{workers:3d} workers: {seconds:7.2f}s ({baseline / seconds:4.2f}x), {counts['written']} windows, "
+                  f"{counts['rows'] / seconds:8.0f} rows/s; rerun {rerun_seconds:5.2f}s ({rerun['skipped']} skipped)")
@@ -0,0 +1,78 @@
+# unit_tests/benchmark_drift_statistics.py
+#
+# Wall time of drift scoring from precomputed reference statistics on the
+# cleaned source data, against Evidently's report on the raw rows where
+# Evidently is installed. The reference is the training split with the
+# predictions of a 100-round model; current windows are the test split,
+# repeated up to the given number of rows and summarized in 100000-row batches.
+#
+# Usage: python benchmark_drift_statistics.py [rows ...]
+# Window sizes default to 20000 200000 2000000.
+
+import sys
+import time
+import importlib.util
+import pandas as pd
+import xgboost as xgb
+from sklearn.model_selection import train_test_split
+from pipeline_fixtures import DATA_DIR, workflow_orchestration as wo  # isort: skip  (adds the workflow directory to sys.path)
+from data_store import TARGET_COLUMN
+from drift_statistics import ReferenceStatistics, drift_report
+from preprocessing_engine import preprocess
+
+BATCH_SIZE = 100000
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def evidently_report(reference_data, current_data, numerical, categorical):
+    from evidently import ColumnMapping
+    from evidently.metrics import ColumnDriftMetric, DatasetDriftMetric, DatasetMissingValuesMetric
+    from evidently.report import Report
+
+    report = Report(metrics=[ColumnDriftMetric(column_name=TARGET_COLUMN), DatasetDriftMetric(), DatasetMissingValuesMetric()])
+    report.run(reference_data=reference_data, current_data=current_data, column_mapping=ColumnMapping(
+        prediction=TARGET_COLUMN, numerical_features=numerical, categorical_features=categorical, target=None))
+    return report.as_dict()
+
+
+if __name__ == '__main__':
+    sizes = [int(arg) for arg in sys.argv[1:]] or [20000, 200000, 2000000]
+    cleaned_df, _, _ = preprocess(DATA_DIR)
+    X = wo.compact_features(cleaned_df.drop(columns=[TARGET_COLUMN]))
+    X_train, X_test, y_train, _ = train_test_split(X, cleaned_df[TARGET_COLUMN], test_size=0.2, random_state=42)
+    booster = wo.fit_booster(X_train, y_train, dict(wo.get_optimized_params.fn(), n_estimators=100))
+    reference_data = X_train.assign(**{TARGET_COLUMN: booster.predict(xgb.DMatrix(X_train))})
+    current_data = X_test.assign(**{TARGET_COLUMN: booster.predict(xgb.DMatrix(X_test))})
+    categorical = [column for column, dtype in X.dtypes.items() if dtype == bool]
+    numerical = [column for column in X.columns if column not in categorical]
+
+    reference, seconds = timed(lambda: ReferenceStatistics.build(reference_data, numerical + [TARGET_COLUMN], categorical))
+    print(f"Reference statistics of {len(reference_data)} rows built in {seconds:.2f}s")
+    with_evidently = importlib.util.find_spec('evidently') is not None
+    if not with_evidently:
+        print("Evidently is not installed; timing the summaries only")
+
+    for rows in sizes:
+        window = pd.concat([current_data] * -(-rows // len(current_data)), ignore_index=True).head(rows)
+
+        def summarize():
+            summary = reference.window()
+            for start in range(0, rows, BATCH_SIZE):
+                summary.update(window.iloc[start:start + BATCH_SIZE])
+            return summary
+
+        summary, summarize_seconds = timed(summarize)
+        result, report_seconds = timed(lambda: drift_report(reference, summary))
+        line = (f"{rows:8d} rows: summarize {summarize_seconds:6.2f}s, scores {report_seconds * 1000:6.1f}ms, "
+                f"price drift {result['columns'][TARGET_COLUMN]['drift_score']:.4f}")
+        if with_evidently:
+            evidently_result, evidently_seconds = timed(
+                lambda: evidently_report(reference_data, window, numerical, categorical))
+            line += (f", Evidently {evidently_seconds:7.2f}s "
+                     f"(price drift {evidently_result['metrics'][0]['result']['drift_score']:.4f})")
+        print(line)
@@ -0,0 +1,41 @@
+# unit_tests/benchmark_hyperparameter_search.py
+#
+# Wall time of the successive halving hyperparameter search on the cleaned
+# source data for different process pool sizes. Each worker builds its
+# QuantileDMatrix once (included in the time) and trials share the CPUs.
+#
+# Usage: python benchmark_hyperparameter_search.py [--trials N] [workers ...]
+# Worker counts default to 1 2 4; the search runs N trials (default 9) from
+# 20 to 180 boosting rounds, keeping a third at each rung.
+
+import os
+import sys
+import time
+from pipeline_fixtures import DATA_DIR, workflow_orchestration as wo  # isort: skip  (adds the workflow directory to sys.path)
+from data_store import TARGET_COLUMN
+from hyperparameter_search import successive_halving
+from preprocessing_engine import preprocess
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    n_trials = 9
+    if '--trials' in args:
+        i = args.index('--trials')
+        n_trials = int(args[i + 1])
+        del args[i:i + 2]
+    worker_counts = [int(arg) for arg in args] or [1, 2, 4]
+
+    cleaned_df, _, _ = preprocess(DATA_DIR)
+    X = wo.compact_features(cleaned_df.drop(columns=[TARGET_COLUMN]))
+    y = cleaned_df[TARGET_COLUMN].astype('float32')
+    print(f"{os.cpu_count()} CPUs, {n_trials} trials, {len(y)} rows")
+
+    baseline = None
+    for workers in worker_counts:
+        start = time.perf_counter()
+        best_params, _ = successive_halving(X, y, n_trials, min_rounds=20, max_rounds=180, workers=workers)
+        seconds = time.perf_counter() - start
+        baseline = baseline or seconds
+        print(f"{workers:3d} workers: {seconds:7.2f}s ({baseline / seconds:4.2f}x), "
+              f"best max_depth={best_params['max_depth']} n_estimators={best_params['n_estimators']}")
@@ -0,0 +1,64 @@
+# unit_tests/benchmark_incremental_preprocessing.py
+#
+# Fused preprocessing with and without the per-file partition cache: a full
+# rebuild, the first (cold) cached run, a run with no changes and a daily
+# delta where one make's feed gains a day of new listings.
+#
+# Usage: python benchmark_incremental_preprocessing.py [factor]
+# The source CSVs are repeated `factor` times (default 10).
+
+import os
+import sys
+import time
+import tempfile
+from pipeline_fixtures import DATA_DIR, scale_sources  # isort: skip  (adds the workflow directory to sys.path)
+from partition_cache import PartitionCache
+from preprocessing_engine import preprocess
+
+DELTA_FILE = 'ford.csv'
+DELTA_ROWS = 2000
+
+
+def timed_run(data_dir, cache_dir=None):
+    cache = PartitionCache(cache_dir) if cache_dir else None
+    start = time.perf_counter()
+    df, _, _ = preprocess(data_dir, cache=cache)
+    seconds = time.perf_counter() - start
+    stats = cache.stats() if cache else None
+    return seconds, len(df), stats
+
+
+def append_delta(data_dir):
+    # A day of new listings: the first DELTA_ROWS rows again, with the mileage bumped
+    path = os.path.join(data_dir, DELTA_FILE)
+    with open(path) as f:
+        header, *rows = f.readlines()[:DELTA_ROWS + 1]
+    mileage = header.strip().split(',').index('mileage')
+    with open(path, 'a') as f:
+        for row in rows:
+            values = row.rstrip('\n').split(',')
+            values[mileage] = str(int(values[mileage]) + 500)
+            f.write(','.join(values) + '\n')
+
+
+def report(name, result):
+    seconds, rows, stats = result
+    cache = f", {stats['hits']} cached / {stats['misses']} rebuilt files" if stats else ''
+    print(f"{name:26s}: {seconds:6.2f}s, {rows} cleaned rows{cache}")
+
+
+if __name__ == '__main__':
+    factor = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        data_dir = os.path.join(tmp_dir, 'original')
+        cache_dir = os.path.join(tmp_dir, 'partition_cache')
+        os.makedirs(data_dir)
+        scale_sources(DATA_DIR, factor, data_dir)
+
+        print(f"{factor}x source data")
+        report('full rebuild', timed_run(data_dir))
+        report('cold cache', timed_run(data_dir, cache_dir))
+        report('no changes', timed_run(data_dir, cache_dir))
+        append_delta(data_dir)
+        report(f'daily delta ({DELTA_FILE})', timed_run(data_dir, cache_dir))
+        report('full rebuild after delta', timed_run(data_dir))
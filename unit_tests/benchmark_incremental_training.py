@@ -0,0 +1,55 @@
+# unit_tests/benchmark_incremental_training.py
+#
+# Wall time and shared-holdout RMSE of incremental retraining against a full
+# retrain on the cleaned source data. The prior model is trained on the
+# training split of a random (1 - new_share) of the rows; the remaining rows
+# are the newly arrived data. The holdout is the test rows the prior model
+# never saw.
+#
+# Usage: python benchmark_incremental_training.py [new_share ...]
+# Shares of new rows default to 0.02 0.1.
+
+import sys
+import time
+import numpy as np
+from sklearn.model_selection import train_test_split
+from data_store import TARGET_COLUMN
+from pipeline_fixtures import DATA_DIR, workflow_orchestration as wo
+from incremental_training import holdout_rmse, row_fingerprints, warm_start_booster
+from preprocessing_engine import preprocess
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    shares = [float(arg) for arg in sys.argv[1:]] or [0.02, 0.1]
+    cleaned_df, _, _ = preprocess(DATA_DIR)
+    X = wo.compact_features(cleaned_df.drop(columns=[TARGET_COLUMN]))
+    y = cleaned_df[TARGET_COLUMN].astype(np.float32)
+    params = wo.get_optimized_params.fn()
+
+    for share in shares:
+        old = np.random.default_rng(0).random(len(y)) >= share
+        X_old_train, _, y_old_train, _ = train_test_split(X[old], y[old], test_size=0.2, random_state=42)
+        prior = wo.fit_booster(X_old_train, y_old_train, params)
+        seen_rows = row_fingerprints(X_old_train, y_old_train)
+
+        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+        new = ~np.isin(row_fingerprints(X_train, y_train), seen_rows)
+        holdout = ~np.isin(row_fingerprints(X_test, y_test), seen_rows)
+        X_holdout, y_holdout = X_test[holdout], y_test[holdout]
+        print(f"new share {share:.2f}: {new.sum()} new training rows, {holdout.sum()} holdout rows, "
+              f"prior RMSE {holdout_rmse(prior, X_holdout, y_holdout):8.2f}")
+
+        runs = {
+            'full retrain': lambda: wo.fit_booster(X_train, y_train, params),
+            'continue 50': lambda: warm_start_booster(prior, X_train[new], y_train[new], params, 'continue', 50),
+            'refresh': lambda: warm_start_booster(prior, X_train[new], y_train[new], params, 'refresh'),
+        }
+        for name, run in runs.items():
+            booster, seconds = timed(run)
+            print(f"  {name:12s}: {seconds:7.2f}s, holdout RMSE {holdout_rmse(booster, X_holdout, y_holdout):8.2f}")
@@ -0,0 +1,92 @@
+# unit_tests/benchmark_instrumentation.py
+#
+# p50/p99 latency of ModelService.predict_car_price with and without the
+# Prometheus instrumentation, for the pyfunc and booster inference paths, and
+# the cost of one timed stage and of rendering /metrics. The runs with and
+# without instrumentation alternate, so both see the same machine load.
+#
+# Usage: python benchmark_instrumentation.py [--requests N]
+# 5000 requests per path by default.
+
+import os
+import sys
+import time
+import tempfile
+import numpy as np
+import mlflow.pyfunc
+from booster import BoosterPredictor
+from model import ModelService
+from model_fixtures import make_car_data, save_test_model
+
+ROUNDS = 5
+
+
+def option(args, name, default):
+    if name not in args:
+        return default
+    i = args.index(name)
+    value = int(args[i + 1])
+    del args[i:i + 2]
+    return value
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def latencies_ms(model_service, cars):
+    latencies = np.empty(len(cars))
+    for i, car_data in enumerate(cars):
+        start = time.perf_counter()
+        model_service.predict_car_price(car_data)
+        latencies[i] = time.perf_counter() - start
+    return latencies * 1000
+
+
+def compare(plain, instrumented, cars):
+    latencies_ms(plain, cars[:100])
+    latencies_ms(instrumented, cars[:100])
+    without, with_metrics = [], []
+    for chunk in np.array_split(np.arange(len(cars)), ROUNDS):
+        without.append(latencies_ms(plain, [cars[i] for i in chunk]))
+        with_metrics.append(latencies_ms(instrumented, [cars[i] for i in chunk]))
+    return np.concatenate(without), np.concatenate(with_metrics)
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    num_requests = option(args, '--requests', 5000)
+    X, _ = make_car_data(num_requests, seed=1)
+    cars = X.to_dict(orient='records')
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        model_dir = os.path.join(tmp_dir, 'xgboost_model')
+        save_test_model(model_dir, n_estimators=500, max_depth=9)
+        # Separate pyfunc instances: instrumentation wraps the model it is given
+        paths = {
+            'pyfunc': (mlflow.pyfunc.load_model(model_dir), mlflow.pyfunc.load_model(model_dir)),
+            'booster': (BoosterPredictor.from_model_dir(model_dir), BoosterPredictor.from_model_dir(model_dir)),
+        }
+
+        for name, (plain_model, instrumented_model) in paths.items():
+            instrumented = ModelService(instrumented_model, model_version='v1')
+            instrumented.enable_instrumentation()
+            without, with_metrics = compare(ModelService(plain_model, model_version='v1'), instrumented, cars)
+            p50, p99 = np.percentile(without, [50, 99])
+            instrumented_p50, instrumented_p99 = np.percentile(with_metrics, [50, 99])
+            print(f"{name:8s} p50 {p50:.3f} ms -> {instrumented_p50:.3f} ms ({instrumented_p50 - p50:+.3f} ms), "
+                  f"p99 {p99:.3f} ms -> {instrumented_p99:.3f} ms ({instrumented_p99 - p99:+.3f} ms)")
+
+        instrumentation = instrumented.instrumentation
+        n = 100000
+
+        def stages():
+            for _ in range(n):
+                with instrumentation.stage('predict_car_price', 'features'):
+                    pass
+
+        _, seconds = timed(stages)
+        _, render_seconds = timed(instrumentation.exposition)
+        print(f"one timed stage: {seconds / n * 1e6:.2f} us; rendering /metrics: {render_seconds * 1000:.2f} ms")
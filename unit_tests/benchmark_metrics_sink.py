@@ -0,0 +1,69 @@
+# unit_tests/benchmark_metrics_sink.py
+#
+# Rows per second written to the car_metrics table by the original per-row
+# insert (a new connection and one INSERT per row) and by MetricsSink (pooled
+# connections, one COPY per batch), on MONITORING_TEST_CONNINFO or an embedded
+# pgserver instance. The per-row insert is timed on the original four columns
+# and on the full row with every column's drift score.
+#
+# Usage: python benchmark_metrics_sink.py [rows ...]
+# Row counts default to 1000 10000.
+
+import sys
+import time
+import datetime
+import psycopg
+from psycopg import sql
+from metrics_sink import MetricsSink, create_database, metrics_row
+from model_fixtures import NUM_FEATURES, CAT_FEATURES
+from postgres_fixtures import postgres_server
+
+MONITORED_COLUMNS = NUM_FEATURES + CAT_FEATURES + ['price']
+
+
+def drift_rows(n_rows):
+    columns = {column: {'drift_score': 0.01 * (i % 20)} for i, column in enumerate(MONITORED_COLUMNS)}
+    result = {'columns': columns, 'number_of_drifted_columns': 2, 'share_of_drifted_columns': 0.1,
+              'dataset_drift': False, 'share_of_missing_values': 0.0}
+    start = datetime.datetime(2024, 1, 1)
+    return [metrics_row(start + datetime.timedelta(minutes=i), result) for i in range(n_rows)]
+
+
+def insert_per_row(conninfo, rows, columns):
+    statement = sql.SQL("INSERT INTO car_metrics({}) VALUES ({})").format(
+        sql.SQL(', ').join(map(sql.Identifier, columns)), sql.SQL(', ').join(sql.Placeholder() * len(columns)))
+    for row in rows:
+        with psycopg.connect(conninfo, autocommit=True) as conn:
+            with conn.cursor() as curr:
+                curr.execute(statement, [row[column] for column in columns])
+
+
+def copy_in_batches(conninfo, rows):
+    with MetricsSink(conninfo, MONITORED_COLUMNS) as sink:
+        sink.write_many(rows)
+
+
+if __name__ == '__main__':
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1000, 10000]
+    with postgres_server() as server_conninfo:
+        conninfo = create_database(server_conninfo, 'benchmark_metrics')
+        with MetricsSink(conninfo, MONITORED_COLUMNS) as sink:
+            columns = sink.columns
+        methods = {
+            'per-row INSERT, 4 columns': lambda rows: insert_per_row(conninfo, rows, columns[:4]),
+            f'per-row INSERT, {len(columns)} columns': lambda rows: insert_per_row(conninfo, rows, columns),
+            f'MetricsSink COPY, {len(columns)} columns': lambda rows: copy_in_batches(conninfo, rows),
+        }
+        for n_rows in sizes:
+            rows = drift_rows(n_rows)
+            for name, method in methods.items():
+                with psycopg.connect(conninfo, autocommit=True) as conn:
+                    conn.execute("DROP TABLE IF EXISTS car_metrics")
+                with MetricsSink(conninfo, MONITORED_COLUMNS) as sink:
+                    sink.ensure_schema()
+                start = time.perf_counter()
+                method(rows)
+                seconds = time.perf_counter() - start
+                with psycopg.connect(conninfo) as conn:
+                    assert conn.execute("SELECT count(*) FROM car_metrics").fetchone()[0] == n_rows
+                print(f"{n_rows:6d} rows, {name:28s}: {seconds:7.2f}s, {n_rows / seconds:9.0f} rows/s")
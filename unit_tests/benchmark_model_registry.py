@@ -0,0 +1,36 @@
+# unit_tests/benchmark_model_registry.py
+#
+# Per-version latency and memory when several model versions stay resident.
+#
+# Usage: python benchmark_model_registry.py [num_versions]
+
+import os
+import sys
+import tempfile
+import mlflow.pyfunc
+from model import ModelService
+from model_fixtures import make_car_data, save_test_model
+
+if __name__ == '__main__':
+    num_versions = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    X, _ = make_car_data(200, seed=1)
+    records = X.to_dict(orient='records')
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        model_dirs = []
+        for i in range(num_versions):
+            model_dirs.append(os.path.join(tmp_dir, f'v{i + 1}'))
+            save_test_model(model_dirs[-1], n_estimators=500, max_depth=9)
+
+        model_service = ModelService(mlflow.pyfunc.load_model(model_dirs[0]), model_version='v1')
+        model_service.registry.max_versions = num_versions
+        for i, model_dir in enumerate(model_dirs[1:], start=2):
+            model_service.registry.load(f'v{i}', lambda path=model_dir: mlflow.pyfunc.load_model(path)).result()
+
+        for version in model_service.registry.versions():
+            for car_data in records:
+                model_service.predict_car_price(car_data, version=version)
+
+        for version, stats in model_service.registry.stats()['versions'].items():
+            memory = f"{stats['memory_bytes'] / 1024 ** 2:.1f} MB" if stats['memory_bytes'] is not None else 'n/a (loaded before the registry)'
+            print(f"{version}: p50 {stats['p50_ms']:.3f} ms, p99 {stats['p99_ms']:.3f} ms, memory {memory}")
@@ -0,0 +1,68 @@
+# unit_tests/benchmark_prediction_cache.py
+#
+# Replays a JSON-lines request log (one car per line) through ModelService with
+# and without the prediction cache, at several hit ratios.
+#
+# Usage: python benchmark_prediction_cache.py [requests.jsonl]
+# Without a log, synthetic cars with the 19 model features are used.
+
+import os
+import sys
+import json
+import time
+import tempfile
+import numpy as np
+import mlflow.pyfunc
+from model import ModelService
+from model_fixtures import make_car_data, save_test_model
+
+NUM_REQUESTS = 1000
+
+
+def load_requests(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def replay_stream(cars, hit_ratio, rng):
+    # A hit_ratio share of the requests repeats a car that was already quoted
+    stream = [cars[0]]
+    unique = 1
+    for _ in range(NUM_REQUESTS - 1):
+        if rng.random() < hit_ratio or unique == len(cars):
+            stream.append(stream[rng.integers(len(stream))])
+        else:
+            stream.append(cars[unique])
+            unique += 1
+    return stream
+
+
+def mean_latency_ms(model_service, stream):
+    start = time.perf_counter()
+    for car_data in stream:
+        model_service.predict_car_price(car_data)
+    return (time.perf_counter() - start) / len(stream) * 1000
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        cars = load_requests(sys.argv[1])
+    else:
+        X, _ = make_car_data(NUM_REQUESTS, seed=1)
+        cars = X.to_dict(orient='records')
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        model_dir = os.path.join(tmp_dir, 'xgboost_model')
+        save_test_model(model_dir, n_estimators=500, max_depth=9)
+        model = mlflow.pyfunc.load_model(model_dir)
+
+    rng = np.random.default_rng(42)
+    for hit_ratio in [0.0, 0.25, 0.5, 0.75, 0.9]:
+        stream = replay_stream(cars, hit_ratio, rng)
+        uncached = mean_latency_ms(ModelService(model, model_version='v1'), stream)
+        cached_service = ModelService(model, model_version='v1')
+        cached_service.enable_prediction_cache()
+        cached = mean_latency_ms(cached_service, stream)
+        stats = cached_service.cache.stats()
+        print(f"target hit ratio {hit_ratio:.2f}: measured {stats['hit_rate']:.2f}, "
+              f"mean latency {uncached:.3f} ms -> {cached:.3f} ms ({uncached - cached:.3f} ms saved per request)")
@@ -0,0 +1,93 @@
+# unit_tests/benchmark_prediction_log.py
+#
+# p50/p99 latency of ModelService.predict_car_price with and without the
+# prediction log, for the pyfunc and booster inference paths, and a burst of
+# log calls far faster than the writer drains them, which shows the cost of a
+# logged and of a dropped record and how many are dropped.
+# The runs with and without the log alternate, so both see the same machine load.
+#
+# Usage: python benchmark_prediction_log.py [--requests N] [--burst N]
+# 5000 requests per path and a burst of 200000 records by default.
+
+import os
+import sys
+import time
+import tempfile
+import numpy as np
+import mlflow.pyfunc
+from booster import BoosterPredictor
+from model import ModelService
+from model_fixtures import make_car_data, save_test_model
+from prediction_log import PredictionLogger
+
+ROUNDS = 5
+
+
+def option(args, name, default):
+    if name not in args:
+        return default
+    i = args.index(name)
+    value = int(args[i + 1])
+    del args[i:i + 2]
+    return value
+
+
+def latencies_ms(model_service, cars):
+    latencies = np.empty(len(cars))
+    for i, car_data in enumerate(cars):
+        start = time.perf_counter()
+        model_service.predict_car_price(car_data)
+        latencies[i] = time.perf_counter() - start
+    return latencies * 1000
+
+
+def compare(model, cars, log_dir):
+    plain = ModelService(model, model_version='v1')
+    logged = ModelService(model, model_version='v1')
+    logger = logged.enable_prediction_log(log_dir)
+    latencies_ms(plain, cars[:100])
+    latencies_ms(logged, cars[:100])
+    chunks = np.array_split(np.arange(len(cars)), ROUNDS)
+    without, with_log = [], []
+    for chunk in chunks:
+        without.append(latencies_ms(plain, [cars[i] for i in chunk]))
+        with_log.append(latencies_ms(logged, [cars[i] for i in chunk]))
+    logger.close()
+    return np.concatenate(without), np.concatenate(with_log), logger.stats()
+
+
+def burst(log_dir, cars, n_records):
+    # Log as fast as possible; the queue fills and the rest are dropped
+    logger = PredictionLogger(log_dir)
+    latencies = np.empty(n_records)
+    for i in range(n_records):
+        start = time.perf_counter()
+        logger.log(cars[i % len(cars)], 1.0, 'v1', 0.001)
+        latencies[i] = time.perf_counter() - start
+    logger.close()
+    return latencies * 1e6, logger.stats()
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    num_requests = option(args, '--requests', 5000)
+    burst_records = option(args, '--burst', 200000)
+    X, _ = make_car_data(num_requests, seed=1)
+    cars = X.to_dict(orient='records')
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        model_dir = os.path.join(tmp_dir, 'xgboost_model')
+        save_test_model(model_dir, n_estimators=500, max_depth=9)
+        models = {'pyfunc': mlflow.pyfunc.load_model(model_dir), 'booster': BoosterPredictor.from_model_dir(model_dir)}
+
+        for name, model in models.items():
+            without, with_log, stats = compare(model, cars, os.path.join(tmp_dir, f'log_{name}'))
+            p50, p99 = np.percentile(without, [50, 99])
+            logged_p50, logged_p99 = np.percentile(with_log, [50, 99])
+            print(f"{name:8s} p50 {p50:.3f} ms -> {logged_p50:.3f} ms, p99 {p99:.3f} ms -> {logged_p99:.3f} ms "
+                  f"({logged_p99 - p99:+.3f} ms); {stats['written']} written, {stats['dropped']} dropped")
+
+        latencies, stats = burst(os.path.join(tmp_dir, 'log_burst'), cars, burst_records)
+        p50, p99 = np.percentile(latencies, [50, 99])
+        print(f"burst of {burst_records}: log() p50 {p50:.1f} us, p99 {p99:.1f} us; "
+              f"{stats['written']} written, {stats['dropped']} dropped")
@@ -0,0 +1,57 @@
+# unit_tests/benchmark_preprocessing_engine.py
+#
+# Wall time and peak RSS of the fused preprocessing engine against the
+# original task chain, on the 13 source CSVs scaled up by repeating their rows.
+# Each run happens in a fresh interpreter so peak memory is not shared.
+#
+# Usage: python benchmark_preprocessing_engine.py [factor ...]
+# Factors default to 1 10 100; the task chain is skipped above 10x unless
+# --all is given, as it needs several times the engine's memory.
+
+import os
+import sys
+import json
+import tempfile
+import subprocess
+from pipeline_fixtures import DATA_DIR, scale_sources
+
+LEGACY_MAX_FACTOR = 10
+
+# Both engines import the workflow module (and its dependencies) before timing starts
+RUN_SCRIPTS = {
+    'tasks': "df, _ = run_task_chain(sys.argv[1], sys.argv[2] + '/combined.csv')",
+    'fused': "df, _, _ = preprocess(sys.argv[1])",
+}
+
+
+def measure(engine, data_dir, tmp_dir):
+    script = (
+        "import sys, json, time; "
+        "from pipeline_fixtures import run_task_chain; from preprocessing_engine import preprocess; "
+        "start = time.perf_counter(); " + RUN_SCRIPTS[engine] + "; "
+        "seconds = time.perf_counter() - start; "
+        "peak = [line for line in open('/proc/self/status') if line.startswith('VmHWM')][0]; "
+        "print(json.dumps({'seconds': seconds, 'rows': len(df), 'peak_rss_mb': int(peak.split()[1]) / 1024}))"
+    )
+    output = subprocess.run(
+        [sys.executable, '-c', script, data_dir, tmp_dir],
+        capture_output=True, text=True, check=True, cwd=os.path.dirname(os.path.abspath(__file__)),
+    )
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+if __name__ == '__main__':
+    args = [arg for arg in sys.argv[1:] if arg != '--all']
+    factors = [int(arg) for arg in args] or [1, 10, 100]
+    max_legacy_factor = float('inf') if '--all' in sys.argv else LEGACY_MAX_FACTOR
+
+    for factor in factors:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            data_dir = os.path.join(tmp_dir, 'original')
+            os.makedirs(data_dir)
+            scale_sources(DATA_DIR, factor, data_dir)
+            engines = ['tasks', 'fused'] if factor <= max_legacy_factor else ['fused']
+            for engine in engines:
+                result = measure(engine, data_dir, tmp_dir)
+                print(f"{factor:4d}x {engine:6s}: {result['seconds']:7.2f}s, "
+                      f"peak RSS {result['peak_rss_mb']:8.1f} MB, {result['rows']} cleaned rows")
@@ -0,0 +1,57 @@
+# unit_tests/benchmark_source_loading.py
+#
+# Wall time and peak RSS of loading the per-make source CSVs: the original
+# load_and_process_datasets + combine_datasets tasks against the typed,
+# threaded load_sources loader. The sources are scaled up by repeating rows
+# and each run happens in a fresh interpreter so peak memory is not shared.
+#
+# Usage: python benchmark_source_loading.py [factor] [workers ...]
+# Defaults to 10x the source data with 1 and 4 loader threads.
+
+import os
+import sys
+import json
+import tempfile
+import subprocess
+from pipeline_fixtures import DATA_DIR, scale_sources
+
+LOAD_SCRIPTS = {
+    'tasks': (
+        "w = workflow_orchestration; "
+        "df = w.combine_datasets.fn(w.load_and_process_datasets.fn(sys.argv[1])); rows = len(df)"
+    ),
+    'typed': "_, _, numeric, _ = load_sources(sys.argv[1], int(sys.argv[2])); rows = len(numeric['price'])",
+}
+
+
+def measure(loader, data_dir, workers=1):
+    script = (
+        "import sys, json, time; "
+        "from pipeline_fixtures import workflow_orchestration; from preprocessing_engine import load_sources; "
+        "start = time.perf_counter(); " + LOAD_SCRIPTS[loader] + "; "
+        "seconds = time.perf_counter() - start; "
+        "peak = [line for line in open('/proc/self/status') if line.startswith('VmHWM')][0]; "
+        "print(json.dumps({'seconds': seconds, 'rows': rows, 'peak_rss_mb': int(peak.split()[1]) / 1024}))"
+    )
+    output = subprocess.run(
+        [sys.executable, '-c', script, data_dir, str(workers)],
+        capture_output=True, text=True, check=True, cwd=os.path.dirname(os.path.abspath(__file__)),
+    )
+    # The task prints the head of every file; the measurement is the last line
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def report(name, result):
+    print(f"{name:16s}: {result['seconds']:6.2f}s, peak RSS {result['peak_rss_mb']:7.1f} MB, {result['rows']} rows")
+
+
+if __name__ == '__main__':
+    factor = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    worker_counts = [int(arg) for arg in sys.argv[2:]] or [1, 4]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        scale_sources(DATA_DIR, factor, tmp_dir)
+        print(f"{factor}x source data, {os.cpu_count()} CPUs")
+        report('tasks', measure('tasks', tmp_dir))
+        for workers in worker_counts:
+            report(f'typed {workers} thread(s)', measure('typed', tmp_dir, workers))
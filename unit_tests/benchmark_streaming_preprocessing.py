@@ -0,0 +1,59 @@
+# unit_tests/benchmark_streaming_preprocessing.py
+#
+# Wall time and peak RSS of the streaming (out-of-core) preprocessing mode
+# against the in-memory fused engine, on the 13 source CSVs scaled up by
+# repeating their rows. Both write the cleaned dataset to Parquet. Each run
+# happens in a fresh interpreter so peak memory is not shared.
+#
+# Usage: python benchmark_streaming_preprocessing.py [--chunk-size N] [factor ...]
+# Factors default to 1 10 100; the chunk size defaults to 100000 rows.
+
+import os
+import sys
+import json
+import tempfile
+import subprocess
+from pipeline_fixtures import DATA_DIR, scale_sources
+
+RUN_SCRIPTS = {
+    'fused': "df, _, _ = preprocess(sys.argv[1]); write_dataset(df, output_file); rows = len(df)",
+    'streaming': "_, stage_rows, _ = stream_preprocess(sys.argv[1], output_file, int(sys.argv[3])); rows = stage_rows[-1][1]",
+}
+
+
+def measure(engine, data_dir, tmp_dir, chunk_size):
+    script = (
+        "import os, sys, json, time; "
+        "from pipeline_fixtures import DATA_DIR; from data_store import write_dataset; "
+        "from preprocessing_engine import preprocess; from streaming_preprocessing import stream_preprocess; "
+        "output_file = os.path.join(sys.argv[2], 'cleaned_car_data.csv'); "
+        "start = time.perf_counter(); " + RUN_SCRIPTS[engine] + "; "
+        "seconds = time.perf_counter() - start; "
+        "peak = [line for line in open('/proc/self/status') if line.startswith('VmHWM')][0]; "
+        "print(json.dumps({'seconds': seconds, 'rows': rows, 'peak_rss_mb': int(peak.split()[1]) / 1024}))"
+    )
+    output = subprocess.run(
+        [sys.executable, '-c', script, data_dir, tmp_dir, str(chunk_size)],
+        capture_output=True, text=True, check=True, cwd=os.path.dirname(os.path.abspath(__file__)),
+    )
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    chunk_size = 100000
+    if '--chunk-size' in args:
+        i = args.index('--chunk-size')
+        chunk_size = int(args[i + 1])
+        del args[i:i + 2]
+    factors = [int(arg) for arg in args] or [1, 10, 100]
+
+    for factor in factors:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            data_dir = os.path.join(tmp_dir, 'original')
+            os.makedirs(data_dir)
+            scale_sources(DATA_DIR, factor, data_dir)
+            for engine in ['fused', 'streaming']:
+                result = measure(engine, data_dir, tmp_dir, chunk_size)
+                print(f"{factor:4d}x {engine:9s}: {result['seconds']:7.2f}s, "
+                      f"peak RSS {result['peak_rss_mb']:8.1f} MB, {result['rows']} cleaned rows")
@@ -0,0 +1,73 @@
+# unit_tests/benchmark_training_memory.py
+#
+# Peak RSS and wall time of the training path (load the cleaned Parquet
+# dataset, split it, fit XGBoost, predict the test split) before and after
+# the compact training layout. 'before' is the original load_and_prepare_data
+# and XGBRegressor.fit on the float64 frame; 'after' is load_and_prepare_data
+# and fit_booster from the workflow. Each run happens in a fresh interpreter
+# so peak memory is not shared.
+#
+# Usage: python benchmark_training_memory.py [--rounds N] [factor ...]
+# The cleaned source data is repeated `factor` times (default: 1 and 10);
+# the optimized parameters are used with N boosting rounds (default 50).
+
+import os
+import sys
+import json
+import tempfile
+import subprocess
+import pandas as pd
+from data_store import write_dataset
+from pipeline_fixtures import DATA_DIR
+from preprocessing_engine import preprocess
+
+RUN_SCRIPTS = {
+    'before': (
+        "df = read_dataset(path); X = df.drop(columns=['price']); y = df['price']; "
+        "X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42); "
+        "model = xgb.XGBRegressor(**params).fit(X_train, y_train); y_pred = model.predict(X_test)"
+    ),
+    'after': (
+        "X_train, X_test, y_train, y_test = wo.load_and_prepare_data.fn(path); "
+        "model = wo.fit_booster(X_train, y_train, params); y_pred = model.predict(xgb.DMatrix(X_test))"
+    ),
+}
+
+
+def measure(mode, path, rounds):
+    script = (
+        "import sys, json, time; import xgboost as xgb; "
+        "from sklearn.model_selection import train_test_split; "
+        "from pipeline_fixtures import workflow_orchestration as wo; from data_store import read_dataset; "
+        "path = sys.argv[1]; params = dict(wo.get_optimized_params.fn(), n_estimators=int(sys.argv[2])); "
+        "start = time.perf_counter(); " + RUN_SCRIPTS[mode] + "; "
+        "seconds = time.perf_counter() - start; "
+        "peak = [line for line in open('/proc/self/status') if line.startswith('VmHWM')][0]; "
+        "print(json.dumps({'seconds': seconds, 'rows': len(X_train) + len(X_test), "
+        "'peak_rss_mb': int(peak.split()[1]) / 1024}))"
+    )
+    output = subprocess.run(
+        [sys.executable, '-c', script, path, str(rounds)],
+        capture_output=True, text=True, check=True, cwd=os.path.dirname(os.path.abspath(__file__)),
+    )
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    rounds = 50
+    if '--rounds' in args:
+        i = args.index('--rounds')
+        rounds = int(args[i + 1])
+        del args[i:i + 2]
+    factors = [int(arg) for arg in args] or [1, 10]
+    cleaned_df, _, _ = preprocess(DATA_DIR)
+
+    for factor in factors:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = write_dataset(pd.concat([cleaned_df] * factor, ignore_index=True),
+                                 os.path.join(tmp_dir, 'cleaned_car_data.csv'), feature_matrix=False)
+            for mode in ['before', 'after']:
+                result = measure(mode, path, rounds)
+                print(f"{factor:4d}x {mode:6s}: {result['seconds']:7.2f}s, "
+                      f"peak RSS {result['peak_rss_mb']:8.1f} MB, {result['rows']} rows")
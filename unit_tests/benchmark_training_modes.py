@@ -0,0 +1,58 @@
+# unit_tests/benchmark_training_modes.py
+#
+# Training time, boosting rounds and test RMSE of the training modes of
+# model_training_flow on the cleaned source data: 'fixed' (the optimized
+# parameters for all 500 rounds with XGBoost's default tree method) and
+# 'hist' (histogram tree method on nthread threads with early stopping).
+# 'exact' is 'fixed' on the exact tree method, which is what the default
+# resolves to on the pinned XGBoost 1.7 for data of this size.
+#
+# Usage: python benchmark_training_modes.py [--nthread N] [factor ...]
+# The cleaned source data is repeated `factor` times (default: 1).
+
+import os
+import sys
+import time
+import tempfile
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+from data_store import write_dataset
+from pipeline_fixtures import DATA_DIR, workflow_orchestration as wo
+from preprocessing_engine import preprocess
+
+
+def run(mode, split, nthread):
+    X_train, X_test, y_train, y_test = split
+    params = wo.get_optimized_params.fn()
+    early_stopping_rounds = None
+    if mode == 'exact':
+        params['tree_method'] = 'exact'
+    elif mode == 'hist':
+        params = wo.hist_params(params, nthread)
+        early_stopping_rounds = wo.EARLY_STOPPING_ROUNDS
+    start = time.perf_counter()
+    booster = wo.fit_booster(X_train, y_train, params, early_stopping_rounds)
+    seconds = time.perf_counter() - start
+    rmse = np.sqrt(np.mean((booster.predict(xgb.DMatrix(X_test)) - y_test) ** 2))
+    return seconds, booster.num_boosted_rounds(), rmse
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    nthread = None
+    if '--nthread' in args:
+        i = args.index('--nthread')
+        nthread = int(args[i + 1])
+        del args[i:i + 2]
+    factors = [int(arg) for arg in args] or [1]
+    cleaned_df, _, _ = preprocess(DATA_DIR)
+
+    for factor in factors:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = write_dataset(pd.concat([cleaned_df] * factor, ignore_index=True),
+                                 os.path.join(tmp_dir, 'cleaned_car_data.csv'), feature_matrix=False)
+            split = wo.load_and_prepare_data.fn(path)
+            for mode in ['exact', 'fixed', 'hist']:
+                seconds, rounds, rmse = run(mode, split, nthread)
+                print(f"{factor:4d}x {mode:5s}: {seconds:7.2f}s, {rounds:4d} rounds, test RMSE {rmse:9.2f}")
@@ -0,0 +1,77 @@
+# unit_tests/benchmark_tree_ensemble.py
+#
+# Compares the pure NumPy evaluator with XGBoost/pyfunc on import time,
+# memory after loading the model and batch throughput.
+#
+# Usage: python benchmark_tree_ensemble.py [model_dir]
+# Without a model directory a 500-tree, depth-9 model is trained on synthetic data.
+
+import os
+import sys
+import json
+import tempfile
+import subprocess
+import time
+
+LOAD_SCRIPTS = {
+    'numpy': (
+        "import time; start = time.perf_counter(); "
+        "from tree_ensemble import TreeEnsemble; import_time = time.perf_counter() - start; "
+        "model = TreeEnsemble.load(sys.argv[1] + '/tree_ensemble.npz')"
+    ),
+    'xgboost': (
+        "import time; start = time.perf_counter(); "
+        "import mlflow.pyfunc; import_time = time.perf_counter() - start; "
+        "model = mlflow.pyfunc.load_model(sys.argv[1])"
+    ),
+}
+
+
+def measure_startup(backend, model_dir):
+    # Run in a fresh interpreter so imports and memory are not shared
+    script = (
+        "import sys, json; " + LOAD_SCRIPTS[backend] + "; "
+        "peak = [line for line in open('/proc/self/status') if line.startswith('VmHWM')][0]; "
+        "print(json.dumps({'import_time': import_time, 'peak_rss_mb': int(peak.split()[1]) / 1024}))"
+    )
+    output = subprocess.run([sys.executable, '-c', script, model_dir], capture_output=True, text=True, check=True)
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def measure_throughput(predict, X, repeats=3):
+    best = min(_timed(predict, X) for _ in range(repeats))
+    return len(X) / best
+
+
+def _timed(predict, X):
+    start = time.perf_counter()
+    predict(X)
+    return time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    import mlflow.pyfunc
+    from booster import BoosterPredictor
+    from tree_ensemble import TreeEnsemble, export_booster
+    from model_fixtures import make_car_data, save_test_model
+
+    tmp_dir = tempfile.TemporaryDirectory()
+    if len(sys.argv) > 1:
+        model_dir = sys.argv[1]
+        booster = BoosterPredictor.from_model_dir(model_dir).booster
+    else:
+        model_dir = os.path.join(tmp_dir.name, 'xgboost_model')
+        booster = save_test_model(model_dir, n_estimators=500, max_depth=9)[0].get_booster()
+
+    if not os.path.exists(os.path.join(model_dir, 'tree_ensemble.npz')):
+        export_booster(booster, os.path.join(model_dir, 'tree_ensemble.npz'))
+
+    for backend in LOAD_SCRIPTS:
+        startup = measure_startup(backend, model_dir)
+        print(f"{backend:8s} import: {startup['import_time']:.3f}s, peak RSS after load: {startup['peak_rss_mb']:.1f} MB")
+
+    X, _ = make_car_data(10000, seed=1)
+    ensemble = TreeEnsemble.load(os.path.join(model_dir, 'tree_ensemble.npz'))
+    pyfunc_model = mlflow.pyfunc.load_model(model_dir)
+    for backend, predict in [('numpy', ensemble.predict), ('xgboost', pyfunc_model.predict)]:
+        print(f"{backend:8s} throughput: {measure_throughput(predict, X):,.0f} rows/s")
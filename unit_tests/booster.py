@@ -0,0 +1,58 @@
+import os
+import threading
+import numpy as np
+import xgboost as xgb
+from mlflow.models import Model
+
+
+class BoosterPredictor:
+    """Score feature dicts with the raw XGBoost booster of an MLflow model.
+
+    Skips pyfunc signature enforcement and pandas: the column order is taken
+    once from the model signature and each request is copied into a
+    preallocated float32 row buffer before calling `inplace_predict`.
+    """
+
+    def __init__(self, booster, feature_names):
+        self.booster = booster
+        self.feature_names = list(feature_names)
+        self._local = threading.local()
+
+    @classmethod
+    def from_model_dir(cls, model_dir):
+        # Read the column order from the MLflow signature and load the booster directly
+        mlflow_model = Model.load(model_dir)
+        feature_names = mlflow_model.signature.inputs.input_names()
+        booster = xgb.Booster()
+        booster.load_model(os.path.join(model_dir, mlflow_model.flavors['xgboost']['data']))
+        return cls(booster, feature_names)
+
+    def _row_buffer(self):
+        # One buffer per thread so concurrent requests don't overwrite each other
+        row = getattr(self._local, 'row', None)
+        if row is None:
+            row = self._local.row = np.empty((1, len(self.feature_names)), dtype=np.float32)
+        return row
+
+    def _fill(self, row, car_data):
+        try:
+            for i, name in enumerate(self.feature_names):
+                row[i] = car_data[name]
+        except KeyError as e:
+            raise ValueError(f"Missing feature: {e.args[0]}") from e
+
+    def predict_record(self, car_data):
+        row = self._row_buffer()
+        self._fill(row[0], car_data)
+        return float(self.booster.inplace_predict(row)[0])
+
+    def predict_records(self, records):
+        matrix = np.empty((len(records), len(self.feature_names)), dtype=np.float32)
+        for row, car_data in zip(matrix, records):
+            self._fill(row, car_data)
+        return self.booster.inplace_predict(matrix)
+
+    def predict(self, features):
+        # Same interface as the pyfunc model, for DataFrame inputs
+        matrix = features[self.feature_names].to_numpy(dtype=np.float32)
+        return self.booster.inplace_predict(matrix)
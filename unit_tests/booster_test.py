@@ -0,0 +1,53 @@
+# unit_tests/booster_test.py
+
+import os
+import tempfile
+import unittest
+import numpy as np
+import mlflow.pyfunc
+from booster import BoosterPredictor
+from model import ModelService
+from model_fixtures import save_test_model, NUM_FEATURES, CAT_FEATURES
+
+
+class TestBoosterPredictor(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp_dir = tempfile.TemporaryDirectory()
+        cls.model_dir = os.path.join(cls.tmp_dir.name, 'xgboost_model')
+        _, cls.X = save_test_model(cls.model_dir)
+        cls.pyfunc_model = mlflow.pyfunc.load_model(cls.model_dir)
+        cls.predictor = BoosterPredictor.from_model_dir(cls.model_dir)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp_dir.cleanup()
+
+    def test_column_order_from_signature(self):
+        self.assertEqual(self.predictor.feature_names, NUM_FEATURES + CAT_FEATURES)
+
+    def test_predict_record_matches_pyfunc(self):
+        records = self.X.head(50).to_dict(orient='records')
+        expected = self.pyfunc_model.predict(self.X.head(50))
+        actual = [self.predictor.predict_record(car_data) for car_data in records]
+        np.testing.assert_allclose(actual, expected, rtol=1e-5)
+
+    def test_predict_records_matches_pyfunc(self):
+        records = self.X.to_dict(orient='records')
+        expected = self.pyfunc_model.predict(self.X)
+        np.testing.assert_allclose(self.predictor.predict_records(records), expected, rtol=1e-5)
+
+    def test_missing_feature(self):
+        with self.assertRaises(ValueError):
+            self.predictor.predict_record({'year': 2020.0})
+
+    def test_model_service_uses_booster(self):
+        car_data = self.X.iloc[0].to_dict()
+        model_service = ModelService(self.predictor, model_version='v1')
+        result = model_service.predict_car_price(car_data)
+        expected = float(self.pyfunc_model.predict(self.X.head(1))[0])
+        self.assertAlmostEqual(result['prediction']['car_price'], expected, places=2)
+
+
+if __name__ == '__main__':
+    unittest.main()
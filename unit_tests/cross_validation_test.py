@@ -0,0 +1,74 @@
+# unit_tests/cross_validation_test.py
+
+from pipeline_fixtures import workflow_orchestration  # isort: skip  (adds the workflow directory to sys.path)
+import os
+import tempfile
+import unittest
+import mlflow
+import numpy as np
+from cross_validation import cross_validate, prepare_arrays
+from data_store import write_dataset
+from model_fixtures import make_car_data
+
+PARAMS = {'learning_rate': 0.1, 'max_depth': 4, 'n_estimators': 20, 'objective': 'reg:squarederror'}
+
+
+class TestCrossValidation(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.cache_dir = os.path.join(self.tmp_dir.name, 'cv_cache')
+        self.X, self.y = make_car_data(600)
+
+    def test_folds_partition_rows(self):
+        data_dir, folds_path = prepare_arrays(self.cache_dir, self.X, self.y, n_folds=4)
+        folds = np.load(folds_path)
+        self.assertEqual(sorted(np.unique(folds)), [0, 1, 2, 3])
+        self.assertEqual(np.bincount(folds).tolist(), [150] * 4)
+        features = np.load(os.path.join(data_dir, 'features.npy'), mmap_mode='r')
+        np.testing.assert_array_equal(features, self.X.to_numpy(dtype=np.float32))
+        # The same data maps to the same directory
+        self.assertEqual(prepare_arrays(self.cache_dir, self.X, self.y, n_folds=4)[0], data_dir)
+
+    def test_rerun_skips_finished_folds(self):
+        fold_metrics, summary = cross_validate(self.X, self.y, PARAMS, n_folds=3, workers=1, cache_dir=self.cache_dir)
+        self.assertEqual([metrics['cached'] for metrics in fold_metrics], [False] * 3)
+        self.assertEqual(sum(metrics['rows'] for metrics in fold_metrics), 600)
+        self.assertAlmostEqual(summary['cv_rmse_mean'], np.mean([metrics['rmse'] for metrics in fold_metrics]))
+
+        rerun_metrics, rerun_summary = cross_validate(self.X, self.y, PARAMS, n_folds=3, workers=1,
+                                                      cache_dir=self.cache_dir)
+        self.assertEqual([metrics['cached'] for metrics in rerun_metrics], [True] * 3)
+        self.assertEqual(rerun_summary, summary)
+
+        # Other parameters or data train every fold again
+        changed, _ = cross_validate(self.X, self.y, dict(PARAMS, max_depth=3), n_folds=3, workers=1,
+                                    cache_dir=self.cache_dir)
+        self.assertFalse(any(metrics['cached'] for metrics in changed))
+        changed, _ = cross_validate(self.X, self.y + 1, PARAMS, n_folds=3, workers=1, cache_dir=self.cache_dir)
+        self.assertFalse(any(metrics['cached'] for metrics in changed))
+
+    def test_process_pool_gives_same_metrics(self):
+        in_process, _ = cross_validate(self.X, self.y, PARAMS, n_folds=3, workers=1)
+        pooled, _ = cross_validate(self.X, self.y, PARAMS, n_folds=3, workers=2)
+        self.assertEqual(pooled, in_process)
+
+    def test_metrics_logged_per_fold(self):
+        mlflow.set_tracking_uri(f"sqlite:///{os.path.join(self.tmp_dir.name, 'mlflow.db')}")
+        self.addCleanup(mlflow.set_tracking_uri, None)
+        mlflow.set_experiment(experiment_id=mlflow.create_experiment(
+            'cross-validation-test', artifact_location=os.path.join(self.tmp_dir.name, 'artifacts')))
+        df = self.X.copy()
+        df.insert(1, 'price', self.y)
+        path = write_dataset(df, os.path.join(self.tmp_dir.name, 'cleaned_car_data.csv'))
+
+        summary = workflow_orchestration.cross_validate_model.fn(path, PARAMS, n_folds=3, workers=1,
+                                                                 cache_dir=self.cache_dir)
+        run = mlflow.last_active_run()
+        history = mlflow.tracking.MlflowClient().get_metric_history(run.info.run_id, 'fold_rmse')
+        self.assertEqual([metric.step for metric in history], [0, 1, 2])
+        self.assertAlmostEqual(run.data.metrics['cv_rmse_mean'], summary['cv_rmse_mean'])
+
+
+if __name__ == '__main__':
+    unittest.main()
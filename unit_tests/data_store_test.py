@@ -0,0 +1,80 @@
+# unit_tests/data_store_test.py
+
+import os
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from data_store import csv_path, feature_frame, iter_dataset, open_feature_matrix, read_dataset, write_dataset
+from model_fixtures import NUM_FEATURES, CAT_FEATURES, make_car_data
+from pipeline_fixtures import workflow_orchestration
+
+
+def cleaned_data(n_rows=500):
+    X, y = make_car_data(n_rows)
+    df = X.copy()
+    df.insert(1, 'price', y)
+    return df
+
+
+class TestDataStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.df = cleaned_data()
+        self.path = write_dataset(self.df, os.path.join(self.tmp_dir.name, 'cleaned_car_data.csv'))
+
+    def test_round_trip_keeps_schema(self):
+        self.assertTrue(self.path.endswith('cleaned_car_data.parquet'))
+        pd.testing.assert_frame_equal(read_dataset(self.path), self.df)
+
+    def test_reads_only_requested_columns(self):
+        columns = NUM_FEATURES + CAT_FEATURES
+        df = read_dataset(self.path, columns=columns)
+        self.assertEqual(list(df.columns), columns)
+        pd.testing.assert_frame_equal(df, self.df[columns])
+
+    def test_reads_csv_export(self):
+        self.df.to_csv(csv_path(self.path), index=False)
+        df = read_dataset(csv_path(self.path), columns=['mpg', 'year'])
+        self.assertEqual(list(df.columns), ['mpg', 'year'])
+        np.testing.assert_array_equal(df['year'], self.df['year'])
+
+    def test_reads_in_batches(self):
+        columns = ['year', 'price', 'make_bmw']
+        batches = list(iter_dataset(self.path, columns=columns, batch_size=200))
+        self.assertEqual([len(batch) for batch in batches], [200, 200, 100])
+        pd.testing.assert_frame_equal(pd.concat(batches, ignore_index=True), self.df[columns])
+        self.df.to_csv(csv_path(self.path), index=False)
+        batches = list(iter_dataset(csv_path(self.path), columns=columns, batch_size=200))
+        self.assertEqual([len(batch) for batch in batches], [200, 200, 100])
+        pd.testing.assert_frame_equal(pd.concat(batches, ignore_index=True), self.df[columns])
+
+    def test_filters_parquet_rows(self):
+        df = read_dataset(self.path, columns=['year', 'price'], filters=[('year', '>=', 2015)])
+        expected = self.df.loc[self.df['year'] >= 2015, ['year', 'price']].reset_index(drop=True)
+        pd.testing.assert_frame_equal(df, expected)
+        self.df.to_csv(csv_path(self.path), index=False)
+        with self.assertRaises(ValueError):
+            read_dataset(csv_path(self.path), filters=[('year', '>=', 2015)])
+
+    def test_feature_matrix_is_memory_mapped(self):
+        X, y, columns, dtypes = open_feature_matrix(self.path)
+        self.assertIsInstance(X, np.memmap)
+        self.assertFalse(X.flags.writeable)
+        self.assertEqual(X.shape, (len(self.df), len(self.df.columns) - 1))
+        np.testing.assert_array_equal(y, self.df['price'])
+        features = feature_frame(X, columns, dtypes)
+        pd.testing.assert_frame_equal(features, self.df.drop(columns=['price']))
+
+    def test_memory_mapped_training_split_matches(self):
+        load = workflow_orchestration.load_and_prepare_data.fn
+        expected = load(self.path)
+        split = load(self.path, memory_map=True)
+        for actual, frame in zip(split, expected):
+            np.testing.assert_array_equal(np.asarray(actual), np.asarray(frame))
+        pd.testing.assert_series_equal(split[0].dtypes, expected[0].dtypes)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+import os
+import logging
+import datetime
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import partial
+import pandas as pd
+import mlflow.pyfunc
+from data_store import read_dataset
+from drift_statistics import drift_report
+from metrics_sink import metrics_row
+
+# The worker's model, reference statistics and log layout, loaded once by _init_worker
+_state = None
+
+
+def window_starts(log_path, window, timestamp_column='timestamp'):
+    # Start of every window that holds a logged row; windows are aligned on the epoch, so a day starts at midnight
+    timestamps = pd.to_datetime(read_dataset(log_path, columns=[timestamp_column])[timestamp_column])
+    return [start.to_pydatetime() for start in sorted(timestamps.dt.floor(window).unique())]
+
+
+def _init_worker(model_path, reference, log_path, features, prediction_column, timestamp_column, nthread=None):
+    global _state
+    if nthread:
+        # Set before XGBoost starts its OpenMP threads, so workers share the CPUs
+        os.environ['OMP_NUM_THREADS'] = str(nthread)
+    _state = (mlflow.pyfunc.load_model(model_path), reference, log_path, features, prediction_column, timestamp_column)
+
+
+def _close_worker():
+    global _state
+    _state = None
+
+
+def _score_window(start, end):
+    # Score the logged inputs of one window and compare their summary with the reference
+    model, reference, log_path, features, prediction_column, timestamp_column = _state
+    frame = read_dataset(log_path, columns=features,
+                         filters=[(timestamp_column, '>=', start), (timestamp_column, '<', end)])
+    frame[prediction_column] = model.predict(frame.fillna(0))
+    summary = reference.summarize(frame)
+    return metrics_row(start, drift_report(reference, summary), prediction_column), summary.rows
+
+
+def backfill(log_path, model_path, reference, sink, window='1D', workers=None, features=None,
+             timestamp_column='timestamp', prediction_column='price', now=None):
+    """Write one drift metrics row per time window of a prediction log.
+
+    The logged inputs in the Parquet dataset at `log_path` are split into
+    windows of `window` (a fixed length such as '1h' or '1D') by their
+    `timestamp_column`. Each window is read with a row filter, scored by
+    the model at `model_path` and summarized against `reference`. Logged
+    predictions are not used: the reference holds this model's predictions,
+    and the log may span several model versions. Windows run on a pool of
+    `workers` processes (default: one per CPU; 1 runs in this process) that
+    each load the model once. Every window's row goes to `sink` with the
+    window start as its timestamp, and windows whose start is already in the
+    sink's table are skipped, so an interrupted backfill resumes where it
+    stopped. Windows that end after `now` (default: the current UTC time,
+    the log's time zone) are still being logged and are left for a later
+    run, so no row is written from part of a window. A window that cannot be
+    scored (a column with no logged values) is logged and counted as failed,
+    and the other windows are still written; a rerun tries it again.
+
+    Returns counts of the windows found, still open, skipped, written and
+    failed, and of the rows scored.
+    """
+    window = pd.Timedelta(window)
+    now = now or datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+    features = features or [column for column in reference.columns if column != prediction_column]
+    found = window_starts(log_path, window, timestamp_column)
+    starts = [start for start in found if start + window <= now]
+    done = sink.timestamps(starts[0], starts[-1] + window) if starts else set()
+    pending = [start for start in starts if start not in done]
+
+    workers = min(workers or os.cpu_count(), max(len(pending), 1))
+    initargs = (model_path, reference, log_path, features, prediction_column, timestamp_column)
+    scored_rows = 0
+    failed = []
+
+    def write(start, result):
+        nonlocal scored_rows
+        try:
+            row, rows = result()
+        except ValueError as e:
+            logging.warning(f"Skipping the window starting {start}: {e}")
+            failed.append(start)
+            return
+        sink.write(row)
+        scored_rows += rows
+
+    if workers > 1:
+        # spawn: OpenMP in XGBoost is not safe to use in a forked child
+        with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('spawn'), initializer=_init_worker,
+                                 initargs=(*initargs, max(1, (os.cpu_count() or 1) // workers))) as pool:
+            futures = {pool.submit(_score_window, start, start + window): start for start in pending}
+            for future in as_completed(futures):
+                write(futures[future], future.result)
+    else:
+        _init_worker(*initargs)
+        try:
+            for start in pending:
+                write(start, partial(_score_window, start, start + window))
+        finally:
+            _close_worker()
+    sink.flush()
+    return {'windows': len(found), 'open': len(found) - len(starts), 'skipped': len(starts) - len(pending),
+            'written': len(pending) - len(failed), 'failed': len(failed), 'rows': scored_rows}
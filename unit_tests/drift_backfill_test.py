@@ -0,0 +1,116 @@
+# unit_tests/drift_backfill_test.py
+
+from pipeline_fixtures import workflow_orchestration  # isort: skip  (adds the workflow directory to sys.path)
+import os
+import datetime
+import tempfile
+import unittest
+import mlflow.pyfunc
+import numpy as np
+import pandas as pd
+import psycopg
+from data_store import write_dataset
+from drift_backfill import backfill, window_starts
+from drift_statistics import ReferenceStatistics
+from metrics_sink import MetricsSink, create_database
+from model_fixtures import NUM_FEATURES, CAT_FEATURES, make_car_data, save_test_model
+from postgres_fixtures import postgres_available, postgres_server
+
+START = datetime.datetime(2024, 3, 1)
+
+
+def prediction_log(path, days=4, rows_per_day=300, missing_mpg_day=None):
+    # Logged inputs of `days` days, each day's cars a year newer than the day before
+    X, _ = make_car_data(days * rows_per_day, seed=7)
+    X['year'] += X.index // rows_per_day
+    if missing_mpg_day is not None:
+        # Requests of that day omitted the field
+        X.loc[X.index // rows_per_day == missing_mpg_day, 'mpg'] = np.nan
+    X.insert(0, 'timestamp', [START + datetime.timedelta(days=i // rows_per_day, minutes=i % rows_per_day)
+                              for i in range(len(X))])
+    return write_dataset(X, path, feature_matrix=False)
+
+
+@unittest.skipUnless(postgres_available(), 'no Postgres server (set MONITORING_TEST_CONNINFO or install pgserver)')
+class TestDriftBackfill(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server_conninfo = cls.enterClassContext(postgres_server())
+        cls.tmp_dir = tempfile.TemporaryDirectory()
+        cls.addClassCleanup(cls.tmp_dir.cleanup)
+        cls.model_path = os.path.join(cls.tmp_dir.name, 'model')
+        save_test_model(cls.model_path)
+        X, _ = make_car_data(3000, seed=3)
+        reference_data = X.assign(price=mlflow.pyfunc.load_model(cls.model_path).predict(X))
+        cls.reference = ReferenceStatistics.build(reference_data, NUM_FEATURES + ['price'], CAT_FEATURES)
+        cls.log_path = prediction_log(os.path.join(cls.tmp_dir.name, 'prediction_log.parquet'))
+
+    def setUp(self):
+        self.conninfo = create_database(self.server_conninfo, self._testMethodName.lower())
+        with psycopg.connect(self.conninfo, autocommit=True) as conn:
+            conn.execute("DROP TABLE IF EXISTS car_metrics")
+
+    def run_backfill(self, window='1D', workers=1, now=None, log_path=None):
+        with MetricsSink(self.conninfo, self.reference.columns) as sink:
+            sink.ensure_schema()
+            return backfill(log_path or self.log_path, self.model_path, self.reference, sink, window, workers, now=now)
+
+    def metrics(self):
+        with psycopg.connect(self.conninfo) as conn:
+            return conn.execute("SELECT timestamp, year_drift, prediction_drift FROM car_metrics ORDER BY 1").fetchall()
+
+    def test_windows_start_on_the_window_boundary(self):
+        self.assertEqual(window_starts(self.log_path, pd.Timedelta('1D')),
+                         [START + datetime.timedelta(days=day) for day in range(4)])
+        self.assertEqual(len(window_starts(self.log_path, pd.Timedelta('2h'))), 12)
+
+    def test_one_row_per_window_and_rerun_skips(self):
+        counts = self.run_backfill()
+        self.assertEqual(counts, {'windows': 4, 'open': 0, 'skipped': 0, 'written': 4, 'failed': 0, 'rows': 1200})
+        metrics = self.metrics()
+        self.assertEqual([timestamp for timestamp, _, _ in metrics], [START + datetime.timedelta(days=day) for day in range(4)])
+        # Each day's cars are newer, so the year drifts further from the reference
+        year_drift = [drift for _, drift, _ in metrics]
+        self.assertEqual(year_drift, sorted(year_drift))
+
+        self.assertEqual(self.run_backfill(), {'windows': 4, 'open': 0, 'skipped': 4, 'written': 0, 'failed': 0, 'rows': 0})
+        self.assertEqual(self.metrics(), metrics)
+
+        # Windows missing from the table are computed again
+        with psycopg.connect(self.conninfo) as conn:
+            conn.execute("DELETE FROM car_metrics WHERE timestamp = %s", (START + datetime.timedelta(days=2),))
+        self.assertEqual(self.run_backfill()['written'], 1)
+        self.assertEqual(self.metrics(), metrics)
+
+    def test_open_window_is_left_for_a_later_run(self):
+        # The last day is still being logged: it is not written from part of its rows
+        now = START + datetime.timedelta(days=3, hours=12)
+        self.assertEqual(self.run_backfill(now=now), {'windows': 4, 'open': 1, 'skipped': 0, 'written': 3, 'failed': 0, 'rows': 900})
+        self.assertEqual([timestamp for timestamp, _, _ in self.metrics()],
+                         [START + datetime.timedelta(days=day) for day in range(3)])
+
+        # Once the day has ended, the next run writes it
+        counts = self.run_backfill(now=START + datetime.timedelta(days=4))
+        self.assertEqual(counts, {'windows': 4, 'open': 0, 'skipped': 3, 'written': 1, 'failed': 0, 'rows': 300})
+
+    def test_failed_window_does_not_abort_the_backfill(self):
+        log_path = prediction_log(os.path.join(self.tmp_dir.name, 'missing_mpg.parquet'), missing_mpg_day=1)
+        for workers in [1, 2]:
+            with psycopg.connect(self.conninfo) as conn:
+                conn.execute("DROP TABLE IF EXISTS car_metrics")
+            counts = self.run_backfill(workers=workers, log_path=log_path)
+            self.assertEqual(counts, {'windows': 4, 'open': 0, 'skipped': 0, 'written': 3, 'failed': 1, 'rows': 900})
+            self.assertEqual([timestamp for timestamp, _, _ in self.metrics()],
+                             [START + datetime.timedelta(days=day) for day in [0, 2, 3]])
+
+    def test_process_pool_gives_same_metrics(self):
+        self.run_backfill(workers=1)
+        in_process = self.metrics()
+        with psycopg.connect(self.conninfo) as conn:
+            conn.execute("DELETE FROM car_metrics")
+        self.assertEqual(self.run_backfill(workers=2)['written'], 4)
+        self.assertEqual(self.metrics(), in_process)
+
+
+if __name__ == '__main__':
+    unittest.main()
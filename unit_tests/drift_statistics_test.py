@@ -0,0 +1,126 @@
+# unit_tests/drift_statistics_test.py
+
+from pipeline_fixtures import workflow_orchestration  # isort: skip  (adds the workflow directory to sys.path)
+import os
+import json
+import importlib.util
+import tempfile
+import unittest
+import mlflow
+import numpy as np
+import xgboost as xgb
+from scipy.spatial import distance
+from scipy.stats import wasserstein_distance
+from sklearn.model_selection import train_test_split
+from drift_statistics import ReferenceStatistics, drift_report
+from model_fixtures import NUM_FEATURES, CAT_FEATURES, make_car_data
+
+NUMERICAL = NUM_FEATURES + ['price']
+
+
+def car_frame(n_rows, seed):
+    X, y = make_car_data(n_rows, seed)
+    return X.assign(price=y)
+
+
+class TestDriftStatistics(unittest.TestCase):
+    def setUp(self):
+        self.reference_data = car_frame(3000, seed=1)
+        self.reference = ReferenceStatistics.build(self.reference_data, NUMERICAL, CAT_FEATURES, max_bins=256)
+        self.current_data = car_frame(800, seed=2)
+        self.current_data['year'] += 1
+        self.current_data['make_bmw'] = np.random.default_rng(3).random(800) < 0.4
+
+    def test_scores_match_direct_computation(self):
+        result = drift_report(self.reference, self.reference.summarize(self.current_data))['columns']
+        ref, cur = self.reference_data, self.current_data
+
+        # year has fewer distinct values than bins, so the distance is exact
+        self.assertEqual(result['year']['stattest'], 'wasserstein')
+        self.assertAlmostEqual(result['year']['drift_score'],
+                               wasserstein_distance(ref['year'], cur['year']) / np.std(ref['year']), places=9)
+        self.assertTrue(result['year']['drift_detected'])
+        # mileage has more, and is within a bin width of the exact distance
+        exact = wasserstein_distance(ref['mileage'], cur['mileage']) / np.std(ref['mileage'])
+        self.assertAlmostEqual(result['mileage']['drift_score'], exact, delta=0.002)
+
+        # Columns with at most 5 values use the Jensen-Shannon distance of the value shares
+        for column in ['enginesize', 'make_bmw']:
+            values = sorted(set(ref[column]) | set(cur[column]))
+            shares = [data[column].value_counts(normalize=True).reindex(values, fill_value=0) for data in (ref, cur)]
+            self.assertEqual(result[column]['stattest'], 'jensenshannon')
+            self.assertAlmostEqual(result[column]['drift_score'], distance.jensenshannon(*shares), places=9)
+        self.assertTrue(result['make_bmw']['drift_detected'])
+        self.assertFalse(result['make_cclass']['drift_detected'])
+
+    def test_batches_merge_into_window(self):
+        whole = drift_report(self.reference, self.reference.summarize(self.current_data))
+        window = self.reference.window()
+        for start in range(0, 800, 300):
+            window.merge(self.reference.summarize(self.current_data.iloc[start:start + 300]))
+        self.assertEqual(window.rows, 800)
+        merged = drift_report(self.reference, window)
+        for column, result in whole['columns'].items():
+            self.assertAlmostEqual(merged['columns'][column]['drift_score'], result['drift_score'], places=9)
+
+        # Persisted statistics give the same scores
+        restored = ReferenceStatistics.from_dict(json.loads(json.dumps(self.reference.to_dict())))
+        self.assertEqual(drift_report(restored, self.reference.summarize(self.current_data)), whole)
+
+    def test_dataset_drift_and_missing_values(self):
+        self.current_data.loc[:99, 'mileage'] = np.nan
+        self.current_data.loc[:49, 'mpg'] = np.inf
+        result = drift_report(self.reference, self.reference.summarize(self.current_data))
+        self.assertEqual(result['number_of_columns'], 20)
+        self.assertEqual(result['number_of_drifted_columns'], 2)
+        self.assertEqual(result['share_of_drifted_columns'], 0.1)
+        self.assertFalse(result['dataset_drift'])
+        self.assertAlmostEqual(result['share_of_missing_values'], 150 / (800 * 20))
+
+        # Below 1000 reference values Evidently uses p-value tests instead of these distances
+        with self.assertRaises(ValueError):
+            ReferenceStatistics.build(self.reference_data.head(1000), NUMERICAL, CAT_FEATURES)
+
+    @unittest.skipUnless(importlib.util.find_spec('evidently'), 'evidently is not installed')
+    def test_matches_evidently_report(self):
+        from evidently import ColumnMapping
+        from evidently.metrics import ColumnDriftMetric, DatasetDriftMetric, DatasetMissingValuesMetric
+        from evidently.report import Report
+
+        report = Report(metrics=[ColumnDriftMetric(column_name='price'), DatasetDriftMetric(), DatasetMissingValuesMetric()])
+        report.run(reference_data=self.reference_data, current_data=self.current_data, column_mapping=ColumnMapping(
+            prediction='price', numerical_features=NUM_FEATURES, categorical_features=CAT_FEATURES, target=None))
+        column_drift, dataset_drift, missing_values = (metric['result'] for metric in report.as_dict()['metrics'])
+        result = drift_report(self.reference, self.reference.summarize(self.current_data))
+        self.assertAlmostEqual(result['columns']['price']['drift_score'], column_drift['drift_score'], delta=0.002)
+        self.assertEqual(result['number_of_drifted_columns'], dataset_drift['number_of_drifted_columns'])
+        self.assertEqual(result['share_of_missing_values'], missing_values['current']['share_of_missing_values'])
+
+    def test_reference_logged_with_model(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        mlflow.set_tracking_uri(f"sqlite:///{os.path.join(tmp_dir.name, 'mlflow.db')}")
+        self.addCleanup(mlflow.set_tracking_uri, None)
+        mlflow.set_experiment(experiment_id=mlflow.create_experiment(
+            'drift-statistics-test', artifact_location=os.path.join(tmp_dir.name, 'artifacts')))
+
+        X, y = make_car_data(2000)
+        X_train, X_test, y_train, y_test = train_test_split(workflow_orchestration.compact_features(X), y,
+                                                            test_size=0.2, random_state=42)
+        params = {'learning_rate': 0.1, 'max_depth': 4, 'n_estimators': 20, 'objective': 'reg:squarederror'}
+        workflow_orchestration.train_and_log_model.fn(X_train, X_test, y_train, y_test, params)
+        run_id = mlflow.last_active_run().info.run_id
+        reference = ReferenceStatistics.from_dict(
+            mlflow.artifacts.load_dict(f"runs:/{run_id}/drift_reference/reference_statistics.json"))
+        self.assertEqual(sorted(reference.columns), sorted(NUMERICAL + CAT_FEATURES))
+        self.assertEqual(reference.categorical, CAT_FEATURES)
+        self.assertEqual(reference.summary.rows, 1600)
+
+        # The training rows scored by the logged model match the reference exactly
+        booster = mlflow.xgboost.load_model(f"runs:/{run_id}/xgboost_model")
+        result = drift_report(reference, reference.summarize(X_train.assign(price=booster.predict(xgb.DMatrix(X_train)))))
+        self.assertEqual({column['drift_score'] for column in result['columns'].values()}, {0.0})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+import re
+import json
+import numpy as np
+
+CATEGORICAL_COLUMNS = ['make', 'transmission', 'fueltype']
+FILL_COLUMNS = ['enginesize', 'tax', 'mpg']
+MAKE_MAPPING = {'unclean focus': 'focus', 'unclean cclass': 'cclass'}
+
+
+def standardize_key(key):
+    # Same column naming as standardize_columns in the training pipeline
+    return key.lower().replace(' ', '_').replace('£', '')
+
+
+def parse_number(value):
+    # Accepts numbers or listing strings such as " £30,495" and "1,200"
+    if value is None or isinstance(value, (int, float)):
+        return None if value is None or value != value else float(value)
+    digits = re.sub(r'[^\d.]', '', str(value))
+    return float(digits) if digits else None
+
+
+class FeatureTransformer:
+    """Encode raw car listings into the model's feature columns.
+
+    Stores what the training pipeline learns from the data: the fill values
+    used by `handle_missing_values`, the category vocabularies seen by
+    `feature_engineering` and the final feature column order. Encoding a
+    listing is a handful of dict lookups, with no pandas involved.
+    """
+
+    def __init__(self, feature_columns, fill_values, vocabularies):
+        self.feature_columns = list(feature_columns)
+        self.fill_values = dict(fill_values)
+        self.vocabularies = {column: list(values) for column, values in vocabularies.items()}
+        self._index = {name: i for i, name in enumerate(self.feature_columns)}
+        self._numeric = [name for name in self.feature_columns if name not in self._indicator_columns()]
+
+    def _indicator_columns(self):
+        return {
+            f'{column}_{value}'
+            for column, values in self.vocabularies.items()
+            for value in values
+        }
+
+    @classmethod
+    def fit(cls, df, feature_columns=None):
+        # df is the combined frame as it enters handle_missing_values
+        fill_values = {'fueltype': df['fueltype'].mode()[0]}
+        for column in FILL_COLUMNS:
+            fill_values[column] = float(df[column].median())
+        vocabularies = {
+            column: sorted(str(value) for value in df[column].replace(MAKE_MAPPING).dropna().unique())
+            for column in CATEGORICAL_COLUMNS
+        }
+        vocabularies['fueltype'] = sorted(set(vocabularies['fueltype']) | {fill_values['fueltype']})
+        return cls(feature_columns or [], fill_values, vocabularies)
+
+    def with_feature_columns(self, feature_columns):
+        return FeatureTransformer(feature_columns, self.fill_values, self.vocabularies)
+
+    def to_dict(self):
+        return {
+            'feature_columns': self.feature_columns,
+            'fill_values': self.fill_values,
+            'vocabularies': self.vocabularies,
+        }
+
+    def save(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            return cls(**json.load(f))
+
+    def transform(self, listing):
+        """Return the model features for one raw listing as a dict."""
+        listing = {standardize_key(key): value for key, value in listing.items()}
+        features = {name: False for name in self.feature_columns}
+
+        for name in self._numeric:
+            value = parse_number(listing.get(name))
+            if value is None:
+                value = self.fill_values.get(name)
+            if value is None:
+                raise ValueError(f"Missing value for '{name}'")
+            features[name] = value
+
+        for column in CATEGORICAL_COLUMNS:
+            value = listing.get(column)
+            if value is None or value != value:
+                value = self.fill_values.get(column)
+            if value is None:
+                raise ValueError(f"Missing value for '{column}'")
+            value = str(value).strip()
+            if column == 'make':
+                value = MAKE_MAPPING.get(value.lower(), value.lower())
+            if value not in self.vocabularies[column]:
+                raise ValueError(f"Unknown {column} '{value}'")
+            # The first category and rare categories have no indicator column
+            name = f'{column}_{value}'
+            if name in self._index:
+                features[name] = True
+        return features
+
+    def transform_matrix(self, listings):
+        """Return a float32 matrix in feature column order."""
+        matrix = np.zeros((len(listings), len(self.feature_columns)), dtype=np.float32)
+        for row, listing in zip(matrix, listings):
+            features = self.transform(listing)
+            for i, name in enumerate(self.feature_columns):
+                row[i] = features[name]
+        return matrix
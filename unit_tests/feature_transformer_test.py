@@ -0,0 +1,94 @@
+# unit_tests/feature_transformer_test.py
+
+import os
+import tempfile
+import unittest
+from unittest.mock import Mock
+import numpy as np
+import pandas as pd
+from feature_transformer import FeatureTransformer, parse_number
+from model import ModelService
+
+FEATURE_COLUMNS = [
+    'year', 'mileage', 'tax', 'mpg', 'enginesize', 'make_bmw', 'make_ford', 'make_vw',
+    'transmission_Manual', 'transmission_Semi-Auto', 'fueltype_Hybrid', 'fueltype_Petrol'
+]
+
+
+def combined_data():
+    # A small frame shaped like the combined dataset as it enters handle_missing_values
+    return pd.DataFrame({
+        'make': ['audi', 'bmw', 'ford', 'vw', 'ford', 'unclean focus'],
+        'model': [' A1', ' 5 Series', ' Fiesta', ' Golf', ' Focus', ' Focus'],
+        'year': [2017, 2014, 2017, 2019, 2018, 2016],
+        'price': [12500.0, 11200.0, 12000.0, 25000.0, 14000.0, 8000.0],
+        'transmission': ['Manual', 'Automatic', 'Automatic', 'Semi-Auto', 'Manual', 'Other'],
+        'mileage': [15735.0, 67068.0, 15944.0, 13904.0, 9083.0, 38852.0],
+        'fueltype': ['Petrol', 'Diesel', 'Petrol', np.nan, 'Hybrid', 'Electric'],
+        'tax': [150.0, 125.0, np.nan, 145.0, 150.0, np.nan],
+        'mpg': [55.4, 57.6, 57.7, np.nan, 57.7, 50.0],
+        'enginesize': [1.4, 2.0, 1.0, 2.0, np.nan, 1.0],
+    })
+
+
+class TestFeatureTransformer(unittest.TestCase):
+    def setUp(self):
+        self.transformer = FeatureTransformer.fit(combined_data(), FEATURE_COLUMNS)
+
+    def test_fit_learns_fill_values_and_vocabularies(self):
+        self.assertEqual(self.transformer.fill_values, {'fueltype': 'Petrol', 'enginesize': 1.4, 'tax': 147.5, 'mpg': 57.6})
+        self.assertEqual(self.transformer.vocabularies['make'], ['audi', 'bmw', 'focus', 'ford', 'vw'])
+        self.assertEqual(self.transformer.vocabularies['transmission'], ['Automatic', 'Manual', 'Other', 'Semi-Auto'])
+
+    def test_matches_training_encoding(self):
+        # Same steps as handle_missing_values + feature_engineering + handle_low_frequency_categories
+        df = combined_data().replace({'make': {'unclean focus': 'focus'}})
+        df['fueltype'] = df['fueltype'].fillna(df['fueltype'].mode()[0])
+        for column in ['enginesize', 'tax', 'mpg']:
+            df[column] = df[column].fillna(df[column].median())
+        expected = pd.get_dummies(df, columns=['make', 'transmission', 'fueltype'], drop_first=True)
+        expected = expected.reindex(columns=FEATURE_COLUMNS, fill_value=False)
+
+        listings = combined_data().drop(columns=['price']).rename(columns={'fueltype': 'fuelType', 'enginesize': 'engineSize'})
+        actual = pd.DataFrame([self.transformer.transform(listing) for listing in listings.to_dict(orient='records')])
+        pd.testing.assert_frame_equal(actual, expected.reset_index(drop=True), check_dtype=False)
+
+    def test_raw_listing_strings(self):
+        features = self.transformer.transform({
+            'make': 'Ford', 'model': ' Fiesta', 'year': 2017, 'transmission': 'Manual',
+            'mileage': '15,944', 'fuelType': 'Petrol', 'tax': ' £150', 'mpg': 57.7, 'engineSize': 1.0
+        })
+        self.assertEqual(features['mileage'], 15944.0)
+        self.assertEqual(features['tax'], 150.0)
+        self.assertTrue(features['make_ford'] and features['transmission_Manual'] and features['fueltype_Petrol'])
+        self.assertEqual(parse_number(None), None)
+
+    def test_invalid_listings(self):
+        with self.assertRaises(ValueError):
+            self.transformer.transform({'make': 'tesla', 'year': 2020, 'mileage': 10, 'transmission': 'Manual'})
+        with self.assertRaises(ValueError):
+            self.transformer.transform({'make': 'ford', 'transmission': 'Manual', 'mileage': 10})
+
+    def test_save_load_and_matrix(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'feature_transformer.json')
+            self.transformer.save(path)
+            loaded = FeatureTransformer.load(path)
+        self.assertEqual(loaded.to_dict(), self.transformer.to_dict())
+        listing = {'make': 'vw', 'year': 2019, 'transmission': 'Semi-Auto', 'mileage': 13904}
+        matrix = loaded.transform_matrix([listing])
+        self.assertEqual(matrix.dtype, np.float32)
+        self.assertEqual(matrix[0, FEATURE_COLUMNS.index('make_vw')], 1.0)
+
+    def test_model_service_predict_listing(self):
+        mock_model = Mock()
+        mock_model.predict.return_value = [14259.82]
+        model_service = ModelService(mock_model, model_version='v1', transformer=self.transformer)
+        result = model_service.predict_listing({'make': 'ford', 'year': 2017, 'transmission': 'Manual', 'mileage': 15944})
+        self.assertEqual(result['prediction']['car_price'], 14259.82)
+        features = mock_model.predict.call_args[0][0]
+        self.assertEqual(list(features.columns), FEATURE_COLUMNS)
+
+
+if __name__ == '__main__':
+    unittest.main()
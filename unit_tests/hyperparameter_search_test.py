@@ -0,0 +1,55 @@
+# unit_tests/hyperparameter_search_test.py
+
+from pipeline_fixtures import workflow_orchestration  # isort: skip  (adds the workflow directory to sys.path)
+import os
+import tempfile
+import unittest
+import mlflow
+from hyperparameter_search import successive_halving
+from model_fixtures import make_car_data
+
+
+class TestHyperparameterSearch(unittest.TestCase):
+    def setUp(self):
+        self.X, self.y = make_car_data(600)
+
+    def search(self, workers):
+        return successive_halving(self.X, self.y, n_trials=4, min_rounds=5, max_rounds=20, eta=2, workers=workers)
+
+    def test_successive_halving_prunes_trials(self):
+        best_params, trials = self.search(workers=1)
+        # 4 trials for 5 rounds, the best 2 up to 10, the best of those up to 20
+        self.assertEqual(sorted(trial['rounds'] for trial in trials), [5, 5, 10, 20])
+        self.assertTrue(all(len(trial['rmse']) == trial['rounds'] for trial in trials))
+        winner = next(trial for trial in trials if trial['rounds'] == 20)
+        self.assertEqual(best_params['max_depth'], winner['params']['max_depth'])
+        self.assertEqual(best_params['n_estimators'], winner['rmse'].index(min(winner['rmse'])) + 1)
+        self.assertNotIn('nthread', best_params)
+
+    def test_process_pool_gives_same_result(self):
+        self.assertEqual(self.search(workers=2), self.search(workers=1))
+
+    def test_trials_logged_as_nested_runs(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        mlflow.set_tracking_uri(f"sqlite:///{os.path.join(tmp_dir.name, 'mlflow.db')}")
+        self.addCleanup(mlflow.set_tracking_uri, None)
+        mlflow.set_experiment(experiment_id=mlflow.create_experiment(
+            'hyperparameter-search-test', artifact_location=os.path.join(tmp_dir.name, 'artifacts')))
+
+        best_params = workflow_orchestration.tune_hyperparameters.fn(self.X, self.y, n_trials=3, workers=1,
+                                                                     min_rounds=5, max_rounds=15)
+        runs = mlflow.search_runs(output_format='list')
+        parent = next(run for run in runs if run.info.run_name == 'hyperparameter_search')
+        children = [run for run in runs if run.data.tags.get('mlflow.parentRunId') == parent.info.run_id]
+        self.assertEqual(len(children), 3)
+        self.assertLessEqual(best_params['n_estimators'], 15)
+        for child in children:
+            # The whole validation curve of each trial, one step per boosting round
+            history = mlflow.tracking.MlflowClient().get_metric_history(child.info.run_id, 'validation_rmse')
+            self.assertEqual([metric.step for metric in history], list(range(1, int(child.data.params['rounds']) + 1)))
+            self.assertIn('max_depth', child.data.params)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+# unit_tests/incremental_training_test.py
+
+from pipeline_fixtures import workflow_orchestration  # isort: skip  (adds the workflow directory to sys.path)
+import os
+import tempfile
+import unittest
+from unittest.mock import Mock
+import mlflow
+import numpy as np
+from sklearn.model_selection import train_test_split
+from incremental_training import incremental_retrain, row_fingerprints
+from model_fixtures import make_car_data
+
+PARAMS = {'learning_rate': 0.1, 'max_depth': 4, 'n_estimators': 30, 'objective': 'reg:squarederror'}
+
+
+def split(n_rows):
+    X, y = make_car_data(2000)
+    X, y = X.astype({column: np.float32 for column in X.columns[:5]}).head(n_rows), y.astype(np.float32).head(n_rows)
+    return train_test_split(X, y, test_size=0.2, random_state=42)
+
+
+class TestIncrementalTraining(unittest.TestCase):
+    def setUp(self):
+        # The prior model saw a split of the first 1500 rows; 500 rows have arrived since
+        X_old, _, y_old, _ = split(1500)
+        self.prior = workflow_orchestration.fit_booster(X_old, y_old, PARAMS)
+        self.seen_rows = np.unique(row_fingerprints(X_old, y_old))
+        self.X_train, self.X_test, self.y_train, self.y_test = split(2000)
+        self.full_retrain = Mock(return_value='full booster')
+
+    def retrain(self, seen_rows=None, **options):
+        seen_rows = self.seen_rows if seen_rows is None else seen_rows
+        return incremental_retrain(self.prior, seen_rows, self.X_train, self.y_train, self.X_test, self.y_test,
+                                   PARAMS, self.full_retrain, **options)
+
+    def test_continues_boosting_on_new_rows(self):
+        booster, path, report = self.retrain(rounds=10)
+        self.assertEqual(path, 'incremental-continue')
+        self.assertEqual(booster.num_boosted_rounds(), 40)
+        self.assertEqual(self.prior.num_boosted_rounds(), 30)
+        self.full_retrain.assert_not_called()
+        new = ~np.isin(row_fingerprints(self.X_train, self.y_train), self.seen_rows)
+        self.assertEqual(report['new_rows'], new.sum())
+        self.assertGreater(report['new_rows'], 0)
+        self.assertLess(report['holdout_rows'], len(self.X_test))
+
+    def test_refresh_keeps_tree_count(self):
+        booster, path, _ = self.retrain(method='refresh', max_rmse_increase=1.0)
+        self.assertEqual(path, 'incremental-refresh')
+        self.assertEqual(booster.num_boosted_rounds(), 30)
+
+    def test_falls_back_when_accuracy_degrades(self):
+        booster, path, report = self.retrain(max_rmse_increase=-0.9)
+        self.assertEqual((booster, path), ('full booster', 'full-fallback'))
+        self.assertEqual(report['fallback_reason'], 'accuracy-degraded')
+        self.assertIn('incremental_holdout_rmse', report)
+
+    def test_falls_back_without_fingerprints_or_on_new_columns(self):
+        _, path, report = incremental_retrain(self.prior, None, self.X_train, self.y_train, self.X_test, self.y_test,
+                                              PARAMS, self.full_retrain)
+        self.assertEqual((path, report['fallback_reason']), ('full-fallback', 'no-row-fingerprints'))
+        self.X_train['make_audi'] = False
+        _, path, report = self.retrain()
+        self.assertEqual((path, report['fallback_reason']), ('full-fallback', 'feature-columns-changed'))
+
+    def test_unchanged_without_new_rows(self):
+        booster, path, report = self.retrain(seen_rows=row_fingerprints(self.X_train, self.y_train))
+        self.assertIs(booster, self.prior)
+        self.assertEqual((path, report['new_rows']), ('unchanged', 0))
+
+    def test_warm_start_from_logged_run(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        mlflow.set_tracking_uri(f"sqlite:///{os.path.join(tmp_dir.name, 'mlflow.db')}")
+        self.addCleanup(mlflow.set_tracking_uri, None)
+        mlflow.set_experiment(experiment_id=mlflow.create_experiment(
+            'incremental-training-test', artifact_location=os.path.join(tmp_dir.name, 'artifacts')))
+
+        train_and_log_model = workflow_orchestration.train_and_log_model.fn
+        train_and_log_model(*split(1500), PARAMS)
+        prior_run = mlflow.last_active_run()
+        booster, seen_rows = workflow_orchestration.load_warm_start.fn(prior_run.info.run_id)
+        self.assertEqual(booster.num_boosted_rounds(), 30)
+        self.assertEqual(len(seen_rows), 1200)
+
+        options = {'method': 'continue', 'rounds': 10, 'max_rmse_increase': 1.0}
+        train_and_log_model(self.X_train, self.X_test, self.y_train, self.y_test, PARAMS,
+                            warm_start=(prior_run.info.run_id, booster, seen_rows, options))
+        run = mlflow.get_run(mlflow.last_active_run().info.run_id)
+        self.assertEqual(run.data.params['training_path'], 'incremental-continue')
+        self.assertEqual(run.data.params['warm_start_run_id'], prior_run.info.run_id)
+        self.assertEqual(run.data.metrics['boosting_rounds'], 40)
+        self.assertIn('train_seconds', run.data.metrics)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+import time
+import threading
+import mlflow.pyfunc
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+
+# Stages of a request, each timed per endpoint: parse: JSON body, features: DataFrame,
+# validate: pyfunc schema enforcement, model: the XGBoost call (with the row buffer on the booster path),
+# total: the whole request
+STAGES = ['parse', 'features', 'validate', 'model', 'total']
+LATENCY_BUCKETS = [0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0]
+BATCH_BUCKETS = [1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 2048, 4096, 10000]
+
+# Seconds spent in the flavor's own predict during the current pyfunc call, per thread
+_model_call = threading.local()
+
+
+class _StageTimer:
+    __slots__ = ('histogram', 'start')
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self.start)
+
+
+class Instrumentation:
+    """Prometheus metrics of the prediction hot path.
+
+    Latency is recorded per endpoint and stage of a request (see STAGES),
+    next to request and row counters, the number of rows per model call
+    and the time taken to fetch and load each model version. The metrics
+    live in their own registry and are rendered in the Prometheus text
+    format by `exposition`. `wrap_pyfunc` lets `predict_pyfunc` split a
+    pyfunc call into schema enforcement and the XGBoost call.
+    """
+
+    def __init__(self, registry=None):
+        self.registry = registry or CollectorRegistry()
+        self.stage_seconds = Histogram('car_price_stage_seconds', 'Latency of one stage of a prediction request',
+                                       ['endpoint', 'stage'], buckets=LATENCY_BUCKETS, registry=self.registry)
+        self.requests = Counter('car_price_requests', 'Prediction requests', ['endpoint', 'status'],
+                                registry=self.registry)
+        self.rows = Counter('car_price_rows', 'Cars scored', ['endpoint'], registry=self.registry)
+        self.batch_rows = Histogram('car_price_batch_rows', 'Cars per model call', buckets=BATCH_BUCKETS,
+                                    registry=self.registry)
+        self.model_load_seconds = Gauge('car_price_model_load_seconds', 'Time to fetch or load a model version',
+                                        ['version', 'phase'], registry=self.registry)
+        # Histogram children by (endpoint, stage): the label lookup is done once per pair
+        self._stages = {}
+
+    def _stage(self, endpoint, name):
+        try:
+            return self._stages[endpoint, name]
+        except KeyError:
+            child = self._stages[endpoint, name] = self.stage_seconds.labels(endpoint, name)
+            return child
+
+    def stage(self, endpoint, name):
+        # Context manager that records the time spent in the block
+        return _StageTimer(self._stage(endpoint, name))
+
+    def observe(self, endpoint, name, seconds):
+        self._stage(endpoint, name).observe(seconds)
+
+    def count_request(self, endpoint, status=200, rows=1):
+        self.requests.labels(endpoint, str(status)).inc()
+        if rows:
+            self.rows.labels(endpoint).inc(rows)
+
+    def model_loaded(self, version, seconds, phase='load'):
+        self.model_load_seconds.labels(str(version), phase).set(seconds)
+
+    def wrap_pyfunc(self, model):
+        # Time the flavor's predict inside PyFuncModel.predict; the rest of the call is schema enforcement
+        if not isinstance(model, mlflow.pyfunc.PyFuncModel) or getattr(model._predict_fn, 'timed', False):
+            return model
+        predict_fn = model._predict_fn
+
+        def timed_predict(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return predict_fn(*args, **kwargs)
+            finally:
+                _model_call.seconds = time.perf_counter() - start
+
+        timed_predict.timed = True
+        model._predict_fn = timed_predict
+        return model
+
+    def predict_pyfunc(self, model, features, endpoint):
+        # model.predict(features), recorded as validate + model stages and one batch
+        _model_call.seconds = None
+        start = time.perf_counter()
+        predictions = model.predict(features)
+        seconds = time.perf_counter() - start
+        model_seconds = _model_call.seconds
+        if model_seconds is None:
+            # Not a wrapped pyfunc model: the whole call counts as the model
+            self.observe(endpoint, 'model', seconds)
+        else:
+            self.observe(endpoint, 'model', model_seconds)
+            self.observe(endpoint, 'validate', seconds - model_seconds)
+        self.batch_rows.observe(len(features))
+        return predictions
+
+    def exposition(self):
+        # (body, content type) of the /metrics response
+        return generate_latest(self.registry), CONTENT_TYPE_LATEST
@@ -0,0 +1,105 @@
+# unit_tests/instrumentation_test.py
+
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+import mlflow.pyfunc
+from prometheus_client.parser import text_string_to_metric_families
+from booster import BoosterPredictor
+from instrumentation import Instrumentation
+from model import ModelService
+from model_fixtures import save_test_model
+
+
+class TestInstrumentation(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp_dir = tempfile.TemporaryDirectory()
+        cls.model_dir = os.path.join(cls.tmp_dir.name, 'xgboost_model')
+        _, X = save_test_model(cls.model_dir)
+        cls.records = X.head(3).to_dict(orient='records')
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp_dir.cleanup()
+
+    def stage(self, instrumentation, endpoint, stage, suffix='count'):
+        return instrumentation.registry.get_sample_value(f'car_price_stage_seconds_{suffix}',
+                                                         {'endpoint': endpoint, 'stage': stage})
+
+    def test_pyfunc_stages(self):
+        model_service = ModelService(mlflow.pyfunc.load_model(self.model_dir), model_version='v1')
+        instrumentation = model_service.enable_instrumentation()
+        for car_data in self.records:
+            model_service.predict_car_price(car_data)
+
+        for stage in ['features', 'validate', 'model', 'total']:
+            self.assertEqual(self.stage(instrumentation, 'predict_car_price', stage), 3, stage)
+        # Schema enforcement and the XGBoost call are timed apart, both inside the request
+        inner = sum(self.stage(instrumentation, 'predict_car_price', stage, 'sum') for stage in ['features', 'validate', 'model'])
+        self.assertLess(inner, self.stage(instrumentation, 'predict_car_price', 'total', 'sum'))
+        self.assertGreater(self.stage(instrumentation, 'predict_car_price', 'validate', 'sum'), 0)
+
+        registry = instrumentation.registry
+        self.assertEqual(registry.get_sample_value('car_price_requests_total',
+                                                   {'endpoint': 'predict_car_price', 'status': '200'}), 3)
+        self.assertEqual(registry.get_sample_value('car_price_rows_total', {'endpoint': 'predict_car_price'}), 3)
+        self.assertEqual(registry.get_sample_value('car_price_batch_rows_sum'), 3)
+
+    def test_booster_and_batches(self):
+        model_service = ModelService(BoosterPredictor.from_model_dir(self.model_dir), model_version='v1',
+                                     inference_mode='booster')
+        instrumentation = model_service.enable_instrumentation()
+        model_service.predict_car_price(self.records[0])
+        model_service.predict_batch(self.records)
+
+        self.assertEqual(self.stage(instrumentation, 'predict_car_price', 'model'), 1)
+        self.assertIsNone(self.stage(instrumentation, 'predict_car_price', 'validate'))
+        self.assertEqual(self.stage(instrumentation, 'predict_batch', 'model'), 1)
+        self.assertEqual(instrumentation.registry.get_sample_value('car_price_batch_rows_count'), 2)
+        self.assertEqual(instrumentation.registry.get_sample_value('car_price_batch_rows_sum'), 4)
+
+    def test_model_load_time_and_exposition(self):
+        model_service = ModelService(mlflow.pyfunc.load_model(self.model_dir), model_version='v1')
+        instrumentation = model_service.enable_instrumentation()
+        with patch.dict(os.environ, {'MODEL_LOCATION': self.model_dir}):
+            model_service.load_version('v2', activate=True).result(timeout=30)
+        self.assertGreater(instrumentation.registry.get_sample_value(
+            'car_price_model_load_seconds', {'version': 'v2', 'phase': 'load'}), 0)
+
+        # The newly loaded pyfunc model is timed by stage too
+        model_service.predict_car_price(self.records[0])
+        self.assertEqual(self.stage(instrumentation, 'predict_car_price', 'validate'), 1)
+
+        body, content_type = instrumentation.exposition()
+        self.assertTrue(content_type.startswith('text/plain'))
+        names = {family.name for family in text_string_to_metric_families(body.decode())}
+        self.assertLessEqual({'car_price_stage_seconds', 'car_price_requests', 'car_price_rows',
+                              'car_price_batch_rows', 'car_price_model_load_seconds'}, names)
+
+    def test_failed_requests_are_counted(self):
+        model_service = ModelService(mlflow.pyfunc.load_model(self.model_dir), model_version='v1')
+        instrumentation = model_service.enable_instrumentation()
+        model_service.predict_car_price(self.records[0])
+        with self.assertRaises(KeyError):
+            model_service.predict_car_price(self.records[0], version='v9')
+
+        registry = instrumentation.registry
+        for status in ['200', '500']:
+            self.assertEqual(registry.get_sample_value('car_price_requests_total',
+                                                       {'endpoint': 'predict_car_price', 'status': status}), 1, status)
+        self.assertEqual(registry.get_sample_value('car_price_rows_total', {'endpoint': 'predict_car_price'}), 1)
+        self.assertEqual(self.stage(instrumentation, 'predict_car_price', 'total'), 2)
+
+    def test_disabled_by_default(self):
+        model = mlflow.pyfunc.load_model(self.model_dir)
+        plain = ModelService(model, model_version='v1')
+        instrumented = ModelService(model, model_version='v1')
+        instrumented.enable_instrumentation(Instrumentation())
+        self.assertIsNone(plain.instrumentation)
+        self.assertEqual(plain.predict_car_price(self.records[0]), instrumented.predict_car_price(self.records[0]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+# unit_tests/load_test_asgi.py
+#
+# Local load test for the asyncio server: throughput and tail latency as the
+# number of worker processes grows.
+#
+# Usage: python load_test_asgi.py [model_dir]
+# Without a model directory a 500-tree, depth-9 model is trained on synthetic data.
+# The server is run with uvicorn, which has to be installed separately.
+
+import os
+import sys
+import time
+import tempfile
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import requests
+from model_fixtures import make_car_data, save_test_model
+
+NUM_REQUESTS = 2000
+CONCURRENCY = 32
+PORT = 9797
+
+
+def wait_until_ready(url, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if requests.get(url, timeout=1).status_code == 200:
+                return
+        except requests.ConnectionError:
+            time.sleep(0.2)
+    raise RuntimeError(f"Server at {url} did not start")
+
+
+def run_load(cars):
+    url = f'http://localhost:{PORT}/predict'
+    local = threading.local()
+
+    def send(car_data):
+        # One keep-alive session per client thread
+        if not hasattr(local, 'session'):
+            local.session = requests.Session()
+        session = local.session
+        start = time.perf_counter()
+        status = session.post(url, json=car_data).status_code
+        return status, time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=CONCURRENCY) as pool:
+        results = list(pool.map(send, cars))
+    elapsed = time.perf_counter() - start
+
+    latencies = np.array([latency for status, latency in results if status == 200]) * 1000
+    shed = sum(status == 503 for status, _ in results)
+    return len(latencies) / elapsed, np.percentile(latencies, 50), np.percentile(latencies, 99), shed
+
+
+if __name__ == '__main__':
+    X, _ = make_car_data(NUM_REQUESTS, seed=1)
+    cars = X.to_dict(orient='records')
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        model_dir = sys.argv[1] if len(sys.argv) > 1 else os.path.join(tmp_dir, 'xgboost_model')
+        if len(sys.argv) == 1:
+            save_test_model(model_dir, n_estimators=500, max_depth=9)
+
+        for workers in [1, 2, 4]:
+            env = dict(os.environ, MODEL_LOCATION=model_dir, RUN_ID='load-test', WORKERS=str(workers),
+                       MAX_PENDING=str(CONCURRENCY * 2))
+            server = subprocess.Popen([sys.executable, '-m', 'uvicorn', '--factory', 'asgi_app:create_app',
+                                       '--port', str(PORT)], env=env,
+                                      stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            try:
+                wait_until_ready(f'http://localhost:{PORT}/health')
+                run_load(cars[:100])  # warm up every worker
+                throughput, p50, p99, shed = run_load(cars)
+                print(f"workers={workers}: {throughput:,.0f} req/s, p50 {p50:.1f} ms, p99 {p99:.1f} ms, shed {shed}")
+            finally:
+                server.terminate()
+                server.wait()
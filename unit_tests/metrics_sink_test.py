@@ -0,0 +1,88 @@
+# unit_tests/metrics_sink_test.py
+
+import datetime
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+import psycopg
+from metrics_sink import MetricsSink, create_database, drift_column, metrics_row
+from model_fixtures import NUM_FEATURES, CAT_FEATURES
+from postgres_fixtures import postgres_available, postgres_server
+
+MONITORED_COLUMNS = NUM_FEATURES + CAT_FEATURES + ['price']
+START = datetime.datetime(2024, 1, 1)
+
+
+def drift_result(score):
+    columns = {column: {'stattest': 'wasserstein', 'drift_score': score, 'drift_detected': score >= 0.1}
+               for column in MONITORED_COLUMNS}
+    drifted = 20 if score >= 0.1 else 0
+    return {'columns': columns, 'number_of_columns': 20, 'number_of_drifted_columns': drifted,
+            'share_of_drifted_columns': drifted / 20, 'dataset_drift': drifted >= 10, 'share_of_missing_values': 0.0}
+
+
+class TestMetricsRow(unittest.TestCase):
+    def test_row_holds_summary_and_column_drift(self):
+        row = metrics_row(START, drift_result(0.25))
+        self.assertEqual(row['prediction_drift'], 0.25)
+        self.assertEqual(row['num_drifted_columns'], 20)
+        self.assertTrue(row['dataset_drift'])
+        self.assertEqual(drift_column('transmission_Semi-Auto'), 'transmission_semi_auto_drift')
+        self.assertEqual(row['transmission_semi_auto_drift'], 0.25)
+        self.assertEqual(len(row), 6 + 20)
+
+
+@unittest.skipUnless(postgres_available(), 'no Postgres server (set MONITORING_TEST_CONNINFO or install pgserver)')
+class TestMetricsSink(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server_conninfo = cls.enterClassContext(postgres_server())
+
+    def setUp(self):
+        # A database per test, so each starts without a metrics table
+        self.conninfo = create_database(self.server_conninfo, self._testMethodName.lower())
+        with psycopg.connect(self.conninfo, autocommit=True) as conn:
+            conn.execute("DROP TABLE IF EXISTS car_metrics")
+
+    def query(self, statement):
+        with psycopg.connect(self.conninfo) as conn:
+            return conn.execute(statement).fetchall()
+
+    def test_schema_is_idempotent_and_upgrades_old_table(self):
+        with psycopg.connect(self.conninfo) as conn:
+            conn.execute("CREATE TABLE car_metrics(timestamp TIMESTAMP, prediction_drift FLOAT, "
+                         "num_drifted_columns integer, share_missing_values FLOAT)")
+            conn.execute("INSERT INTO car_metrics VALUES (%s, 0.5, 3, 0.0)", (START,))
+        for _ in range(2):
+            with MetricsSink(self.conninfo, MONITORED_COLUMNS) as sink:
+                sink.ensure_schema()
+
+        columns = [name for name, in self.query(
+            "SELECT column_name FROM information_schema.columns WHERE table_name = 'car_metrics' ORDER BY ordinal_position")]
+        self.assertEqual(columns, sink.columns)
+        self.assertEqual(self.query("SELECT timestamp, prediction_drift, year_drift FROM car_metrics"), [(START, 0.5, None)])
+        self.assertEqual(self.query("SELECT indexname FROM pg_indexes WHERE tablename = 'car_metrics'"),
+                         [('car_metrics_timestamp_idx',)])
+
+    def test_copies_rows_in_batches(self):
+        with MetricsSink(self.conninfo, MONITORED_COLUMNS, batch_size=100) as sink:
+            sink.ensure_schema()
+            sink.write_many(metrics_row(START + datetime.timedelta(hours=hour), drift_result(hour / 1000))
+                            for hour in range(250))
+            self.assertEqual((sink.rows, len(sink.pending)), (200, 50))
+        self.assertEqual(sink.rows, 250)
+        self.assertEqual(self.query("SELECT count(*), max(timestamp), max(mpg_drift) FROM car_metrics"),
+                         [(250, START + datetime.timedelta(hours=249), 0.249)])
+        self.assertEqual(self.query("SELECT count(*) FROM car_metrics WHERE dataset_drift"), [(150,)])
+
+    def test_concurrent_writers_share_the_pool(self):
+        with MetricsSink(self.conninfo, MONITORED_COLUMNS, batch_size=30, pool_size=2) as sink:
+            sink.ensure_schema()
+            with ThreadPoolExecutor(4) as executor:
+                for writer in range(4):
+                    executor.submit(sink.write_many, [metrics_row(START, drift_result(writer))] * 100)
+        self.assertEqual(self.query("SELECT prediction_drift, count(*) FROM car_metrics GROUP BY 1 ORDER BY 1"),
+                         [(0.0, 100), (1.0, 100), (2.0, 100), (3.0, 100)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,22 @@
 import os
 import json
+import time
+from contextlib import nullcontext
 import mlflow
+import pandas as pd
+from mlflow.artifacts import download_artifacts
+from artifact_cache import ArtifactCache
+from batching import MicroBatcher
+from booster import BoosterPredictor
+from feature_transformer import FeatureTransformer
+from instrumentation import Instrumentation
+from model_registry import ModelRegistry
+from prediction_cache import PredictionCache, canonical_key
+from prediction_log import PredictionLogger
+from tree_ensemble import TreeEnsemble
+
+# Models that score feature dicts directly, without building a DataFrame
+FAST_PATH_MODELS = (BoosterPredictor, TreeEnsemble)
 
 
 def get_model_location(run_id):
@@ -16,46 +32,231 @@ def get_model_location(run_id):
     return model_location
 
 
-def load_model(run_id):
+def get_artifact_cache():
+    # Local model cache, enabled by setting MODEL_CACHE_DIR
+    cache_dir = os.getenv('MODEL_CACHE_DIR')
+    if cache_dir is None:
+        return None
+    max_size_bytes = int(os.getenv('MODEL_CACHE_MAX_BYTES', str(2 * 1024 ** 3)))
+    offline = os.getenv('MODEL_CACHE_OFFLINE', 'false').lower() == 'true'
+    return ArtifactCache(cache_dir, max_size_bytes=max_size_bytes, offline=offline)
+
+
+def download_model(artifact_uri):
+    cache = get_artifact_cache()
+    if cache is None:
+        return download_artifacts(artifact_uri=artifact_uri)
+    return cache.fetch_uri(artifact_uri)
+
+
+def load_model(run_id, inference_mode='pyfunc'):
     model_path = get_model_location(run_id)
+    if inference_mode == 'booster':
+        # Fast path: score with the raw XGBoost booster instead of pyfunc
+        return BoosterPredictor.from_model_dir(download_model(model_path))
+    if inference_mode == 'numpy':
+        # Pure NumPy evaluator over the node tables exported at training time
+        return TreeEnsemble.load(download_model(f'{model_path}/tree_ensemble.npz'))
+    if get_artifact_cache() is not None:
+        model_path = download_model(model_path)
     model = mlflow.pyfunc.load_model(model_path)
     return model
 
 
+def load_feature_transformer(run_id):
+    # Fitted preprocessing logged next to the model by the training flow
+    model_path = get_model_location(run_id)
+    return FeatureTransformer.load(download_model(f'{model_path}/feature_transformer.json'))
+
+
 class ModelService:
-    def __init__(self, model, model_version=None):
-        self.model = model
-        self.model_version = model_version
+    def __init__(self, model, model_version=None, inference_mode='pyfunc', transformer=None):
+        self.registry = ModelRegistry()
+        self.registry.add(model_version, model, activate=True)
+        # Set by enable_micro_batching, whose batcher scores (version, model, car_data) rows
+        self.batcher = None
+        self.inference_mode = inference_mode
+        self.cache = None
+        self.prediction_log = None
+        self.instrumentation = None
+        self.transformer = transformer
+
+    @property
+    def model(self):
+        return self.registry.get()[1]
+
+    @property
+    def model_version(self):
+        return self.registry.active_version
+
+    def load_version(self, run_id, activate=False, warmup_rows=None):
+        # Load another run in the background; returns a Future
+        def loader():
+            start = time.perf_counter()
+            model = load_model(run_id, inference_mode=self.inference_mode)
+            if self.instrumentation is not None:
+                self.instrumentation.model_loaded(run_id, time.perf_counter() - start)
+                self.instrumentation.wrap_pyfunc(model)
+            return model
+
+        def warmup(model):
+            for car_data in warmup_rows or []:
+                self.score(model, car_data)
+
+        return self.registry.load(run_id, loader, activate=activate, warmup=warmup)
+
+    def enable_micro_batching(self, max_batch_size=32, max_wait_ms=5):
+        # Merge concurrent predict_car_price calls into one model call
+        self.batcher = MicroBatcher(self._predict_batched, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+        return self.batcher
+
+    def enable_prediction_cache(self, max_entries=10000, ttl_seconds=None):
+        # Serve repeated feature vectors from memory; keys include the model version
+        self.cache = PredictionCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+        return self.cache
+
+    def enable_prediction_log(self, log_dir, max_queue=10000, segment_rows=100000, segment_seconds=3600):
+        # Log every prediction to Parquet segments in log_dir from a background thread
+        self.prediction_log = PredictionLogger(log_dir, max_queue=max_queue, segment_rows=segment_rows,
+                                               segment_seconds=segment_seconds)
+        return self.prediction_log
+
+    def enable_instrumentation(self, instrumentation=None):
+        # Record per-stage latency, request counts and batch sizes in Prometheus metrics
+        self.instrumentation = instrumentation or Instrumentation()
+        for version in self.registry.versions():
+            self.instrumentation.wrap_pyfunc(self.registry.get(version)[1])
+        return self.instrumentation
+
+    def _stage(self, endpoint, name):
+        if self.instrumentation is None or endpoint is None:
+            return nullcontext()
+        return self.instrumentation.stage(endpoint, name)
+
+    def _predict_model(self, model, features, endpoint):
+        if self.instrumentation is None or endpoint is None:
+            return model.predict(features)
+        return self.instrumentation.predict_pyfunc(model, features, endpoint)
+
+    def _count_batch(self, endpoint, rows):
+        if self.instrumentation is not None and endpoint is not None:
+            self.instrumentation.batch_rows.observe(rows)
 
     def prepare_features(self, car_data):
         # Assuming car_data is a dictionary with keys as feature names
         return pd.DataFrame([car_data])  # Convert to DataFrame for ML model input
 
-    def predict(self, features):
-        pred = self.model.predict(features)
+    def predict(self, features, model=None, endpoint=None):
+        model = self.model if model is None else model
+        pred = self._predict_model(model, features, endpoint)
         return float(pred[0])
 
-    def predict_car_price(self, car_data):
+    def predict_batch(self, records, endpoint='predict_batch', model=None):
+        # Score a list of feature dicts with a single model call
+        model = self.model if model is None else model
+        if isinstance(model, FAST_PATH_MODELS):
+            with self._stage(endpoint, 'model'):
+                pred = model.predict_records(records)
+            self._count_batch(endpoint, len(records))
+        else:
+            with self._stage(endpoint, 'features'):
+                features = pd.DataFrame.from_records(records)
+            pred = self._predict_model(model, features, endpoint)
+        return [float(p) for p in pred]
+
+    def _predict_batched(self, items):
+        # (version, model, car_data) rows merged by the batcher: one model call per version in the batch
+        groups = {}
+        for i, (version, model, _) in enumerate(items):
+            groups.setdefault(version, (model, []))[1].append(i)
+        predictions = [None] * len(items)
+        for model, indices in groups.values():
+            batch = self.predict_batch([items[i][2] for i in indices], endpoint='predict_car_price', model=model)
+            for i, prediction in zip(indices, batch):
+                predictions[i] = prediction
+        return predictions
+
+    def score(self, model, car_data, endpoint=None):
+        # endpoint names the request in the instrumentation; warm-up and shadow scoring pass none
+        if isinstance(model, FAST_PATH_MODELS):
+            # Booster or NumPy fast path: no DataFrame needed
+            with self._stage(endpoint, 'model'):
+                prediction = model.predict_record(car_data)
+            self._count_batch(endpoint, 1)
+            return prediction
+
         # Prepare features
-        features = self.prepare_features(car_data)
+        with self._stage(endpoint, 'features'):
+            features = self.prepare_features(car_data)
 
         # Predict car price
-        prediction = self.predict(features)
+        return self.predict(features, model, endpoint)
+
+    def predict_car_price(self, car_data, version=None):
+        # A call that raises is counted as a 500, so the counters show the error rate
+        status = 500
+        try:
+            with self._stage('predict_car_price', 'total'):
+                response = self._predict_car_price(car_data, version)
+            status = 200
+            return response
+        finally:
+            if self.instrumentation is not None:
+                self.instrumentation.count_request('predict_car_price', status, rows=1 if status == 200 else 0)
+
+    def _predict_car_price(self, car_data, version):
+        if version is None:
+            version = self.model_version
+        start = time.perf_counter()
+        prediction = None
+        if self.cache is not None:
+            cache_key = canonical_key(car_data, version)
+            prediction = self.cache.get(cache_key)
+
+        if prediction is None:
+            prediction = self._predict_uncached(car_data, version)
+            if self.cache is not None:
+                self.cache.put(cache_key, prediction)
+
+        if self.prediction_log is not None:
+            # Never blocks: a full queue drops the record and counts it
+            self.prediction_log.log(car_data, prediction, version, time.perf_counter() - start)
 
         # Return the prediction in a structured way
         return {
             'model': 'car_price_prediction_model',
-            'version': self.model_version,
+            'version': version,
             'prediction': {'car_price': prediction}
         }
 
+    def predict_listing(self, listing, version=None):
+        # Encode a raw listing (make, model, year, transmission, ...) and predict its price
+        if self.transformer is None:
+            raise ValueError("No feature transformer loaded for raw listings")
+        return self.predict_car_price(self.transformer.transform(listing), version=version)
+
+    def _predict_uncached(self, car_data, version):
+        start = time.perf_counter()
+        _, model = self.registry.get(version)
+        if self.batcher is not None:
+            # Let the batcher merge this row with concurrent requests; the model travels with the row,
+            # so a version activated before the batch is scored doesn't change which model scores it
+            prediction = self.batcher.predict((version, model, car_data))
+        else:
+            prediction = self.score(model, car_data, endpoint='predict_car_price')
+        self.registry.record_latency(version, time.perf_counter() - start)
+
+        if version != self.registry.shadow_version:
+            self.registry.shadow_score(self.score, car_data, prediction)
+        return prediction
+
 
 # Example usage:
-def init(run_id: str):
+def init(run_id: str, inference_mode: str = 'pyfunc'):
     # Load the model with the given run_id
-    model = load_model(run_id)
+    model = load_model(run_id, inference_mode=inference_mode)
 
     # Create and return the ModelService instance
-    model_service = ModelService(model=model, model_version=run_id)
+    model_service = ModelService(model=model, model_version=run_id, inference_mode=inference_mode)
 
     return model_service
@@ -0,0 +1,34 @@
+# unit_tests/model_fixtures.py
+
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+import mlflow.xgboost
+from mlflow.models.signature import infer_signature
+from model_features import CATEGORICAL_FEATURES as CAT_FEATURES, NUMERICAL_FEATURES as NUM_FEATURES
+
+
+def make_car_data(n_rows=500, seed=42):
+    # Synthetic cars with the same 19 columns as cleaned_car_data.csv
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame({
+        'year': rng.integers(2000, 2021, n_rows).astype(float),
+        'mileage': rng.uniform(0, 150000, n_rows).round(),
+        'enginesize': rng.choice([1.0, 1.4, 1.6, 2.0, 3.0], n_rows),
+        'tax': rng.choice([0.0, 20.0, 145.0, 150.0, 235.0], n_rows),
+        'mpg': rng.uniform(30, 70, n_rows).round(1),
+    })
+    for col in CAT_FEATURES:
+        X[col] = rng.random(n_rows) < 0.15
+    y = 20000 + (X['year'] - 2010) * 800 - X['mileage'] * 0.05 + X['enginesize'] * 3000
+    return X, y.rename('price')
+
+
+def save_test_model(model_dir, n_estimators=20, max_depth=4):
+    # Train a small XGBoost model and save it in MLflow format
+    X, y = make_car_data()
+    model = xgb.XGBRegressor(n_estimators=n_estimators, max_depth=max_depth)
+    model.fit(X, y)
+    signature = infer_signature(X, y)
+    mlflow.xgboost.save_model(model, model_dir, signature=signature)
+    return model, X
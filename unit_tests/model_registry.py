@@ -0,0 +1,168 @@
+import time
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import psutil
+
+
+class ModelVersion:
+    def __init__(self, version, model, memory_bytes=None, load_seconds=None, latency_window=1000):
+        self.version = version
+        self.model = model
+        self.memory_bytes = memory_bytes
+        self.load_seconds = load_seconds
+        self.requests = 0
+        self.latencies = deque(maxlen=latency_window)
+
+    def stats(self):
+        latencies_ms = np.array(self.latencies) * 1000
+        return {
+            'requests': self.requests,
+            'p50_ms': float(np.percentile(latencies_ms, 50)) if len(latencies_ms) else None,
+            'p99_ms': float(np.percentile(latencies_ms, 99)) if len(latencies_ms) else None,
+            'memory_bytes': self.memory_bytes,
+            'load_seconds': self.load_seconds,
+        }
+
+
+class ModelRegistry:
+    """Keep several model versions resident and swap the active one in place.
+
+    New versions are loaded and warmed up on a background thread, then made
+    active with a single reference swap, so requests already in flight finish
+    on the model they started with. An optional shadow version scores the same
+    requests off the request path for comparison; at most `max_shadow_pending`
+    requests wait for it, and the rest are dropped and counted, so a slow
+    shadow model can't grow the queue without limit.
+    """
+
+    def __init__(self, max_versions=3, max_shadow_pending=1000):
+        self.max_versions = max_versions
+        self.max_shadow_pending = max_shadow_pending
+        self.active_version = None
+        self.shadow_version = None
+        self._versions = {}
+        self._lock = threading.Lock()
+        self._loader = ThreadPoolExecutor(max_workers=1, thread_name_prefix='model-loader')
+        self._shadow = ThreadPoolExecutor(max_workers=1, thread_name_prefix='shadow-scorer')
+        self._shadow_count = 0
+        self._shadow_abs_diff = 0.0
+        self._shadow_pending = 0
+        self._shadow_dropped = 0
+
+    def add(self, version, model, activate=False, warmup=None, memory_bytes=None, load_seconds=None):
+        if warmup is not None:
+            # Score sample rows so the first real request doesn't pay for lazy initialisation
+            warmup(model)
+
+        with self._lock:
+            self._versions[version] = ModelVersion(version, model, memory_bytes, load_seconds)
+            if activate or self.active_version is None:
+                self.active_version = version
+            self._evict()
+
+    def load(self, version, loader, activate=False, warmup=None):
+        # Load, warm and register a version on the background thread; returns a Future
+        return self._loader.submit(self._load, version, loader, activate, warmup)
+
+    def _load(self, version, loader, activate, warmup):
+        process = psutil.Process()
+        rss_before = process.memory_info().rss
+        start = time.perf_counter()
+        model = loader()
+        load_seconds = time.perf_counter() - start
+        memory_bytes = max(process.memory_info().rss - rss_before, 0)
+        self.add(version, model, activate=activate, warmup=warmup,
+                 memory_bytes=memory_bytes, load_seconds=load_seconds)
+        return version
+
+    def activate(self, version):
+        with self._lock:
+            if version not in self._versions:
+                raise KeyError(f"Model version {version} is not loaded")
+            self.active_version = version
+
+    def set_shadow(self, version):
+        with self._lock:
+            if version is not None and version not in self._versions:
+                raise KeyError(f"Model version {version} is not loaded")
+            self.shadow_version = version
+            self._shadow_count = 0
+            self._shadow_abs_diff = 0.0
+            self._shadow_dropped = 0
+
+    def unload(self, version):
+        with self._lock:
+            if version == self.active_version:
+                raise ValueError("Cannot unload the active model version")
+            self._versions.pop(version, None)
+            if version == self.shadow_version:
+                self.shadow_version = None
+
+    def get(self, version=None):
+        # Returns (version, model); defaults to the active version
+        with self._lock:
+            version = self.active_version if version is None else version
+            try:
+                return version, self._versions[version].model
+            except KeyError:
+                raise KeyError(f"Model version {version} is not loaded") from None
+
+    def versions(self):
+        with self._lock:
+            return list(self._versions)
+
+    def record_latency(self, version, seconds):
+        with self._lock:
+            entry = self._versions.get(version)
+            if entry is not None:
+                entry.requests += 1
+                entry.latencies.append(seconds)
+
+    def shadow_score(self, score_fn, car_data, prediction):
+        # Score the request with the shadow version without delaying the caller
+        with self._lock:
+            shadow_version = self.shadow_version
+            if shadow_version is None:
+                return
+            if self._shadow_pending >= self.max_shadow_pending:
+                self._shadow_dropped += 1
+                return
+            self._shadow_pending += 1
+        self._shadow.submit(self._score_shadow, shadow_version, score_fn, car_data, prediction)
+
+    def _score_shadow(self, version, score_fn, car_data, prediction):
+        try:
+            _, model = self.get(version)
+            start = time.perf_counter()
+            shadow_prediction = score_fn(model, car_data)
+        finally:
+            with self._lock:
+                self._shadow_pending -= 1
+        self.record_latency(version, time.perf_counter() - start)
+        with self._lock:
+            self._shadow_count += 1
+            self._shadow_abs_diff += abs(shadow_prediction - prediction)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'active_version': self.active_version,
+                'shadow_version': self.shadow_version,
+                'shadow': {
+                    'requests': self._shadow_count,
+                    'mean_abs_diff': self._shadow_abs_diff / self._shadow_count if self._shadow_count else None,
+                    'pending': self._shadow_pending,
+                    'dropped': self._shadow_dropped,
+                },
+                'versions': {version: entry.stats() for version, entry in self._versions.items()},
+            }
+
+    def _evict(self):
+        # Drop the oldest versions that are neither active nor shadow
+        for version in list(self._versions):
+            if len(self._versions) <= self.max_versions:
+                break
+            if version not in (self.active_version, self.shadow_version):
+                del self._versions[version]
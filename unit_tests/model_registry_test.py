@@ -0,0 +1,124 @@
+# unit_tests/model_registry_test.py
+
+import time
+import unittest
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import Mock, patch
+import numpy as np
+from model import ModelService
+from model_registry import ModelRegistry
+
+
+def constant_model(price):
+    model = Mock()
+    model.predict.side_effect = lambda df: np.full(len(df), price)
+    return model
+
+
+class TestModelRegistry(unittest.TestCase):
+    def test_background_load_and_swap(self):
+        model_service = ModelService(constant_model(10000.0), model_version='v1')
+        new_model = constant_model(20000.0)
+
+        with patch('model.load_model', return_value=new_model) as mock_load_model:
+            future = model_service.load_version('v2', activate=True, warmup_rows=[{'year': 2020.0}] * 3)
+            self.assertEqual(future.result(timeout=5), 'v2')
+        mock_load_model.assert_called_once_with('v2', inference_mode='pyfunc')
+
+        # The warm-up rows were scored before the swap
+        self.assertEqual(new_model.predict.call_count, 3)
+        result = model_service.predict_car_price({'year': 2020.0})
+        self.assertEqual(result['version'], 'v2')
+        self.assertEqual(result['prediction']['car_price'], 20000.0)
+
+    def test_request_can_choose_version(self):
+        model_service = ModelService(constant_model(10000.0), model_version='v1')
+        model_service.registry.add('v2', constant_model(20000.0))
+
+        self.assertEqual(model_service.predict_car_price({'year': 2020.0})['prediction']['car_price'], 10000.0)
+        result = model_service.predict_car_price({'year': 2020.0}, version='v2')
+        self.assertEqual(result, {
+            'model': 'car_price_prediction_model',
+            'version': 'v2',
+            'prediction': {'car_price': 20000.0}
+        })
+        with self.assertRaises(KeyError):
+            model_service.predict_car_price({'year': 2020.0}, version='v3')
+
+    def test_batched_row_keeps_the_version_it_was_queued_for(self):
+        model_service = ModelService(constant_model(10000.0), model_version='v1')
+        model_service.registry.add('v2', constant_model(20000.0))
+        model_service.enable_prediction_cache()
+        model_service.enable_micro_batching(max_batch_size=2, max_wait_ms=500)
+
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            future = pool.submit(model_service.predict_car_price, {'year': 2020.0})
+            # v2 becomes active while the v1 row waits in the batcher
+            time.sleep(0.1)
+            model_service.registry.activate('v2')
+            result = future.result(timeout=5)
+        self.assertEqual(result['version'], 'v1')
+        self.assertEqual(result['prediction']['car_price'], 10000.0)
+
+        # Rows queued for different versions in one batch are each scored by their own model
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            results = list(pool.map(lambda version: model_service.predict_car_price({'year': 2021.0}, version=version),
+                                    ['v1', 'v2']))
+        self.assertEqual([result['prediction']['car_price'] for result in results], [10000.0, 20000.0])
+        self.assertEqual(model_service.batcher.stats()['max_batch_size'], 2)
+
+    def test_shadow_scoring(self):
+        model_service = ModelService(constant_model(10000.0), model_version='v1')
+        model_service.registry.add('candidate', constant_model(10500.0))
+        model_service.registry.set_shadow('candidate')
+
+        result = model_service.predict_car_price({'year': 2020.0})
+        self.assertEqual(result['prediction']['car_price'], 10000.0)
+
+        # Shadow scoring happens off the request path
+        deadline = time.time() + 5
+        while model_service.registry.stats()['shadow']['requests'] == 0 and time.time() < deadline:
+            time.sleep(0.01)
+        stats = model_service.registry.stats()
+        self.assertEqual(stats['shadow']['mean_abs_diff'], 500.0)
+        self.assertEqual(stats['versions']['candidate']['requests'], 1)
+        self.assertEqual(stats['versions']['v1']['requests'], 1)
+        self.assertIsNotNone(stats['versions']['v1']['p99_ms'])
+
+    def test_shadow_queue_is_bounded(self):
+        registry = ModelRegistry(max_shadow_pending=2)
+        registry.add('v1', Mock(), activate=True)
+        registry.add('candidate', Mock())
+        registry.set_shadow('candidate')
+        release = threading.Event()
+
+        def slow_score(model, car_data):
+            release.wait(5)
+            return 1.0
+
+        for _ in range(5):
+            registry.shadow_score(slow_score, {'year': 2020.0}, 1.0)
+        self.assertEqual(registry.stats()['shadow']['pending'], 2)
+        self.assertEqual(registry.stats()['shadow']['dropped'], 3)
+
+        release.set()
+        deadline = time.time() + 5
+        while registry.stats()['shadow']['requests'] < 2 and time.time() < deadline:
+            time.sleep(0.01)
+        stats = registry.stats()['shadow']
+        self.assertEqual((stats['requests'], stats['pending'], stats['dropped']), (2, 0, 3))
+
+    def test_eviction_keeps_active_and_shadow(self):
+        registry = ModelRegistry(max_versions=2)
+        registry.add('v1', Mock(), activate=True)
+        registry.add('v2', Mock())
+        registry.set_shadow('v2')
+        registry.add('v3', Mock())
+        self.assertEqual(registry.versions(), ['v1', 'v2'])
+        with self.assertRaises(ValueError):
+            registry.unload('v1')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+# unit_tests/partition_cache_test.py
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+import pandas as pd
+from pipeline_fixtures import DATA_DIR, write_source_files  # isort: skip  (adds the workflow directory to sys.path)
+from partition_cache import PartitionCache
+from preprocessing_engine import preprocess
+import preprocessing_engine
+
+
+class TestPartitionCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.data_dir = os.path.join(self.tmp_dir.name, 'original')
+        self.cache_dir = os.path.join(self.tmp_dir.name, 'partition_cache')
+        os.makedirs(self.data_dir)
+        write_source_files(self.data_dir)
+
+    def run_cached(self):
+        cache = PartitionCache(self.cache_dir)
+        df, transformer, stage_rows = preprocess(self.data_dir, cache=cache)
+        return df, transformer, stage_rows, cache.stats()
+
+    def assert_matches_full_rebuild(self, result):
+        df, transformer, stage_rows = preprocess(self.data_dir)
+        pd.testing.assert_frame_equal(result[0], df)
+        self.assertEqual(result[1].to_dict(), transformer.to_dict())
+        self.assertEqual(result[2], stage_rows)
+
+    def test_unchanged_files_are_not_reparsed(self):
+        self.run_cached()
+        with patch.object(preprocessing_engine.pd, 'read_csv', side_effect=AssertionError('file was reparsed')):
+            result = self.run_cached()
+        self.assertEqual(result[3], {'hits': 3, 'misses': 0, 'files': 3})
+        self.assert_matches_full_rebuild(result)
+
+    def test_changed_file_is_rebuilt(self):
+        self.run_cached()
+        # A daily delta: new listings appended to one make's feed, moving the global medians and mode
+        with open(os.path.join(self.data_dir, 'hyundi.csv'), 'a') as f:
+            f.write(' I20,2018,9000,Manual,8000,Diesel,145,70.6,1.2\n')
+            f.write(' I20,2019,9500,Manual,6000,Diesel,145,70.6,1.2\n')
+        result = self.run_cached()
+        self.assertEqual(result[3], {'hits': 2, 'misses': 1, 'files': 3})
+        self.assert_matches_full_rebuild(result)
+
+    def test_touched_file_is_checked_by_hash(self):
+        self.run_cached()
+        path = os.path.join(self.data_dir, 'audi.csv')
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        self.assertEqual(self.run_cached()[3]['misses'], 0)
+
+    def test_removed_file_is_dropped(self):
+        self.run_cached()
+        os.remove(os.path.join(self.data_dir, 'unclean focus.csv'))
+        result = self.run_cached()
+        self.assertEqual(result[3], {'hits': 2, 'misses': 0, 'files': 2})
+        self.assertFalse(os.path.exists(os.path.join(self.cache_dir, 'partitions', 'unclean focus.parquet')))
+        self.assert_matches_full_rebuild(result)
+
+    def test_matches_full_rebuild_on_source_data(self):
+        shutil.rmtree(self.data_dir)
+        shutil.copytree(DATA_DIR, self.data_dir)
+        self.run_cached()
+        self.assert_matches_full_rebuild(self.run_cached())
+
+
+if __name__ == '__main__':
+    unittest.main()
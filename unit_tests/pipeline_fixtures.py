@@ -0,0 +1,91 @@
+# unit_tests/pipeline_fixtures.py
+
+import io
+import os
+import sys
+import contextlib
+import pandas as pd
+
+WORKFLOW_DIR = os.path.join(os.path.dirname(__file__), '..', 'workflow_orchestration_with_prefect')
+DATA_DIR = os.path.join(os.path.dirname(__file__), '..', 'data', 'original')
+
+# The pipeline modules live next to the Prefect flows
+sys.path.append(WORKFLOW_DIR)
+
+import workflow_orchestration  # noqa: E402  pylint: disable=wrong-import-position
+
+
+def run_task_chain(data_dir, combined_output_file):
+    # The original task-by-task data_preprocessing_flow, without a Prefect run
+    w = workflow_orchestration
+    with contextlib.redirect_stdout(io.StringIO()):
+        combined_df = w.combine_datasets.fn(w.load_and_process_datasets.fn(data_dir))
+        combined_df.to_csv(combined_output_file, index=False)
+        df = pd.read_csv(combined_output_file, low_memory=False)
+        for step in [w.drop_redundant_columns, w.handle_unclean_categories, w.convert_mileage]:
+            df = step.fn(df)
+        transformer = w.fit_feature_transformer.fn(df)
+        for step in [w.handle_missing_values, w.feature_engineering, w.handle_unusual_year_values,
+                     w.handle_outliers, w.drop_duplicates, w.handle_low_frequency_categories]:
+            df = step.fn(df)
+    return df, transformer
+
+
+def write_source_files(data_dir):
+    # A few cars in each of the three source schemas: clean, hyundi's tax(£) and the unclean exports
+    clean = pd.DataFrame({
+        'model': [' A1', ' A3', ' A3', ' A4', ' Q5', ' A1', ' TT', ' A3'],
+        'year': [2017, 2016, 2016, 1970, 2019, 2018, 2060, 2016],
+        'price': [12500, 16500, 16500, 11000, 31000, 14000, 26000, 250000],
+        'transmission': ['Manual', 'Automatic', 'Automatic', 'Manual', 'Semi-Auto', 'Manual', 'Manual', 'Other'],
+        'mileage': [15735, 36203, 36203, 29946, 4000, 250000, 5000, 9000],
+        'fuelType': ['Petrol', 'Diesel', 'Diesel', 'Petrol', 'Hybrid', 'Petrol', None, 'Electric'],
+        'tax': [150, 20, 20, 30, 145, 150, 145, 0],
+        'mpg': [55.4, 64.2, 64.2, 55.4, 49.6, 150.0, 40.0, 201.8],
+        'engineSize': [1.4, 2.0, 2.0, 1.4, 2.0, 1.0, 2.0, 0.0],
+    })
+    clean.to_csv(os.path.join(data_dir, 'audi.csv'), index=False)
+
+    hyundi = pd.DataFrame({
+        'model': [' I10', ' Tucson', ' I30'],
+        'year': [2017, 2016, 2019],
+        'price': [7500, 12000, 15000],
+        'transmission': ['Manual', 'Automatic', 'Manual'],
+        'mileage': [12000, 23000, 5000],
+        'fuelType': ['Petrol', 'Diesel', 'Petrol'],
+        'tax(£)': [145, 160, 145],
+        'mpg': [60.1, 55.0, 52.3],
+        'engineSize': [1.0, 1.7, 1.4],
+    })
+    hyundi.to_csv(os.path.join(data_dir, 'hyundi.csv'), index=False)
+
+    unclean = pd.DataFrame({
+        'model': [' Focus', ' Focus', ' Focus', ' Focus'],
+        'year': [2015.0, 2015.0, None, 2016.0],
+        'price': ['£7,500', '£9,500', '£8,000', '£14,250'],
+        'transmission': ['Manual', 'Automatic', 'Manual', 'Manual'],
+        'mileage': ['42,112', '30,292', '10,000', '40,696'],
+        'fuel type': ['11', '14', '20', '26'],
+        'engine size': ['£20', '£165', '£30', '£20'],
+        'mileage2': ['61.4', '44.8', '50.0', '67.3'],
+        'fuel type2': ['Petrol', 'Petrol', 'Diesel', 'Diesel'],
+        'engine size2': ['0.999', '1.596', '1.5', '1.997'],
+        'reference': ['/ad/25476700', '/ad/25476687', '/ad/1', '/ad/25392262'],
+    })
+    unclean.to_csv(os.path.join(data_dir, 'unclean focus.csv'), index=False)
+
+
+def scale_sources(src_dir, factor, dst_dir):
+    # Repeat every data row of each source CSV `factor` times; the header is written once
+    for file in os.listdir(src_dir):
+        if not file.endswith('.csv'):
+            continue
+        with open(os.path.join(src_dir, file), 'rb') as f:
+            header = f.readline()
+            body = f.read()
+        if not body.endswith(b'\n'):
+            body += b'\n'
+        with open(os.path.join(dst_dir, file), 'wb') as f:
+            f.write(header)
+            for _ in range(factor):
+                f.write(body)
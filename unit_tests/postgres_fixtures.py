@@ -0,0 +1,28 @@
+# unit_tests/postgres_fixtures.py
+
+import os
+import tempfile
+import contextlib
+import importlib.util
+
+# A server to test against; without it an embedded server is started if pgserver is installed
+TEST_CONNINFO = os.getenv('MONITORING_TEST_CONNINFO')
+
+
+def postgres_available():
+    return bool(TEST_CONNINFO) or importlib.util.find_spec('pgserver') is not None
+
+
+@contextlib.contextmanager
+def postgres_server():
+    # Yields the conninfo of a Postgres server for the duration of the block
+    if TEST_CONNINFO:
+        yield TEST_CONNINFO
+        return
+    import pgserver
+    with tempfile.TemporaryDirectory() as data_dir:
+        server = pgserver.get_server(data_dir, cleanup_mode='stop')
+        try:
+            yield server.get_uri()
+        finally:
+            server.cleanup()
@@ -0,0 +1,61 @@
+# unit_tests/prediction_cache_test.py
+
+import time
+import unittest
+from unittest.mock import Mock
+import numpy as np
+from model import ModelService
+from prediction_cache import PredictionCache, canonical_key
+
+
+class TestPredictionCache(unittest.TestCase):
+    def test_canonical_key(self):
+        car_data = {'year': 2020.0, 'mileage': 15944.0, 'make_ford': True}
+        reordered = {'make_ford': 1.0, 'mileage': 15944, 'year': 2020}
+        self.assertEqual(canonical_key(car_data, 'v1'), canonical_key(reordered, 'v1'))
+        self.assertNotEqual(canonical_key(car_data, 'v1'), canonical_key(car_data, 'v2'))
+        self.assertNotEqual(canonical_key(car_data, 'v1'), canonical_key(dict(car_data, mileage=1.0), 'v1'))
+        # Fields that are not model features are ignored
+        self.assertEqual(canonical_key(car_data, 'v1'),
+                         canonical_key(dict(car_data, request_id='abc-123', timestamp=1700000000), 'v1'))
+
+    def test_lru_eviction_and_stats(self):
+        cache = PredictionCache(max_entries=2)
+        cache.put('a', 1.0)
+        cache.put('b', 2.0)
+        self.assertEqual(cache.get('a'), 1.0)
+        cache.put('c', 3.0)  # evicts 'b', the least recently used entry
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('c'), 3.0)
+        self.assertEqual(cache.stats(), {
+            'size': 2, 'hits': 2, 'misses': 1, 'hit_rate': 2 / 3, 'evictions': 1, 'expirations': 0
+        })
+
+    def test_ttl(self):
+        cache = PredictionCache(ttl_seconds=0.01)
+        cache.put('a', 1.0)
+        time.sleep(0.02)
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.stats()['expirations'], 1)
+
+    def test_model_service_cache(self):
+        mock_model = Mock()
+        mock_model.predict.side_effect = lambda df: np.full(len(df), 14259.82)
+        model_service = ModelService(mock_model, model_version='v1')
+        model_service.enable_prediction_cache()
+
+        car_data = {'year': 2020.0, 'mileage': 15944.0, 'make_ford': True}
+        first = model_service.predict_car_price(car_data)
+        second = model_service.predict_car_price(dict(car_data))
+        self.assertEqual(first, second)
+        self.assertEqual(mock_model.predict.call_count, 1)
+
+        # A new active version never sees entries cached for the old one
+        model_service.registry.add('v2', mock_model, activate=True)
+        self.assertEqual(model_service.predict_car_price(car_data)['version'], 'v2')
+        self.assertEqual(mock_model.predict.call_count, 2)
+        self.assertEqual(model_service.cache.stats()['hits'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,164 @@
+# unit_tests/prediction_log_test.py
+
+import os
+import time
+import datetime
+import tempfile
+import threading
+import unittest
+from unittest.mock import Mock, patch
+import numpy as np
+import pyarrow.parquet as pq
+from data_store import read_dataset
+from model import ModelService
+from model_fixtures import NUM_FEATURES, CAT_FEATURES, make_car_data
+from prediction_log import PredictionLogger
+
+
+def car_records(n_rows):
+    X, _ = make_car_data(n_rows, seed=5)
+    return X.to_dict(orient='records')
+
+
+class TestPredictionLogger(unittest.TestCase):
+    def setUp(self):
+        self.log_dir = tempfile.mkdtemp()
+
+    def held_writer(self):
+        # Keep the writer thread from draining the queue until the returned event is set
+        release = threading.Event()
+        collect = PredictionLogger._collect
+
+        def held_collect(logger):
+            release.wait()
+            return collect(logger)
+
+        patcher = patch.object(PredictionLogger, '_collect', held_collect)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(release.set)
+        return release
+
+    def segments(self):
+        return sorted(os.listdir(self.log_dir))
+
+    def test_model_service_logs_predictions(self):
+        mock_model = Mock()
+        mock_model.predict.side_effect = lambda df: np.full(len(df), 14259.82)
+        model_service = ModelService(mock_model, model_version='v1')
+        logger = model_service.enable_prediction_log(self.log_dir)
+
+        records = car_records(5)
+        start = datetime.datetime.utcnow()
+        for car_data in records:
+            model_service.predict_car_price(car_data)
+        logger.close()
+
+        log = read_dataset(self.log_dir)
+        self.assertEqual(list(log.columns), ['timestamp'] + NUM_FEATURES + CAT_FEATURES
+                         + ['prediction', 'model_version', 'latency_ms'])
+        self.assertEqual(log[NUM_FEATURES + CAT_FEATURES].to_dict(orient='records'), records)
+        self.assertEqual(log['prediction'].tolist(), [14259.82] * 5)
+        self.assertEqual(log['model_version'].tolist(), ['v1'] * 5)
+        self.assertTrue((log['latency_ms'] >= 0).all())
+        self.assertTrue((log['timestamp'] >= start - datetime.timedelta(seconds=1)).all())
+        self.assertEqual(logger.stats(), {'queue_depth': 0, 'logged': 5, 'dropped': 0, 'written': 5, 'failed': 0,
+                                          'segments': 1})
+
+        # The monitoring flow reads a time range of the log with a row filter
+        self.assertEqual(len(read_dataset(self.log_dir, filters=[('timestamp', '>=', start - datetime.timedelta(days=1))])), 5)
+
+    def test_full_queue_drops_without_blocking(self):
+        release = self.held_writer()
+        logger = PredictionLogger(self.log_dir, max_queue=2)
+        accepted = [logger.log(car_data, 1.0, 'v1', 0.001) for car_data in car_records(5)]
+        self.assertEqual(accepted, [True, True, False, False, False])
+        self.assertEqual(logger.stats()['dropped'], 3)
+
+        release.set()
+        logger.close()
+        self.assertEqual(logger.stats(), {'queue_depth': 0, 'logged': 2, 'dropped': 3, 'written': 2, 'failed': 0,
+                                          'segments': 1})
+        self.assertEqual(len(read_dataset(self.log_dir)), 2)
+
+    def test_segments_rotate_by_rows(self):
+        release = self.held_writer()
+        logger = PredictionLogger(self.log_dir, segment_rows=3, batch_size=3)
+        for i, car_data in enumerate(car_records(7)):
+            logger.log(car_data, float(i), 'v1', 0.001)
+        release.set()
+        logger.close()
+
+        segments = self.segments()
+        self.assertEqual(len(segments), 3)
+        self.assertTrue(all(name.startswith('part-') and name.endswith('.parquet') for name in segments))
+        self.assertEqual([len(read_dataset(os.path.join(self.log_dir, name))) for name in segments], [3, 3, 1])
+        self.assertEqual(read_dataset(self.log_dir)['prediction'].tolist(), [float(i) for i in range(7)])
+
+    def test_idle_segment_rotates_by_age(self):
+        logger = PredictionLogger(self.log_dir, segment_seconds=0.2, flush_seconds=0.05)
+        self.addCleanup(logger.close)
+        logger.log(car_records(1)[0], 1.0, 'v1', 0.001)
+        deadline = time.monotonic() + 5
+        while logger.stats()['segments'] == 0 and time.monotonic() < deadline:
+            time.sleep(0.05)
+
+        # The closed segment is readable while the logger keeps running
+        self.assertEqual(logger.stats()['segments'], 1)
+        self.assertEqual(len(read_dataset(self.log_dir)), 1)
+
+    def test_invalid_record_is_counted_and_skipped(self):
+        release = self.held_writer()
+        logger = PredictionLogger(self.log_dir, batch_size=1)
+        logger.log(dict(car_records(1)[0], year='unknown'), 1.0, 'v1', 0.001)
+        logger.log(car_records(1)[0], 2.0, 'v1', 0.001)
+        release.set()
+        logger.close()
+
+        self.assertEqual(logger.stats()['failed'], 1)
+        self.assertEqual(read_dataset(self.log_dir)['prediction'].tolist(), [2.0])
+
+    def test_invalid_record_does_not_drop_its_batch(self):
+        release = self.held_writer()
+        logger = PredictionLogger(self.log_dir)
+        records = car_records(3)
+        logger.log(records[0], 1.0, 'v1', 0.001)
+        logger.log(dict(records[1], mileage='12000'), 2.0, 'v1', 0.001)
+        logger.log(records[2], 3.0, 'v1', 0.001)
+        release.set()
+        logger.close()
+
+        self.assertEqual(logger.stats()['failed'], 1)
+        self.assertEqual(logger.stats()['written'], 2)
+        self.assertEqual(read_dataset(self.log_dir)['prediction'].tolist(), [1.0, 3.0])
+
+
+    def test_write_error_loses_only_the_open_segment(self):
+        release = self.held_writer()
+        writer = pq.ParquetWriter
+        opened = []
+
+        def failing_writer(*args, **kwargs):
+            # The first segment cannot be opened, as on a full disk
+            opened.append(args[0])
+            if len(opened) == 1:
+                raise OSError('No space left on device')
+            return writer(*args, **kwargs)
+
+        patcher = patch('prediction_log.pq.ParquetWriter', failing_writer)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        logger = PredictionLogger(self.log_dir, segment_rows=2, batch_size=2, row_group_rows=2)
+        for i, car_data in enumerate(car_records(4)):
+            logger.log(car_data, float(i), 'v1', 0.001)
+        release.set()
+        logger.close()
+
+        self.assertEqual(len(opened), 2)
+        self.assertEqual(logger.stats(), {'queue_depth': 0, 'logged': 4, 'dropped': 0, 'written': 2, 'failed': 2,
+                                          'segments': 1})
+        self.assertEqual(read_dataset(self.log_dir)['prediction'].tolist(), [2.0, 3.0])
+
+
+if __name__ == '__main__':
+    unittest.main()
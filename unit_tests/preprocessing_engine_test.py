@@ -0,0 +1,100 @@
+# unit_tests/preprocessing_engine_test.py
+
+import os
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from pipeline_fixtures import DATA_DIR, run_task_chain, write_source_files
+from preprocessing_engine import load_source, load_sources, preprocess
+
+
+class TestPreprocessingEngine(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+
+    def assert_matches_task_chain(self, data_dir):
+        expected_df, expected_transformer = run_task_chain(data_dir, os.path.join(self.tmp_dir.name, 'combined.csv'))
+        df, transformer, stage_rows = preprocess(data_dir)
+
+        # Golden output: the cleaned CSV is byte-for-byte the same
+        self.assertEqual(df.to_csv(index=False), expected_df.to_csv(index=False))
+        self.assertEqual(transformer.to_dict(), expected_transformer.to_dict())
+        self.assertEqual(stage_rows[-1], ('duplicates', len(expected_df)))
+        return stage_rows
+
+    def test_matches_task_chain_on_source_data(self):
+        stage_rows = self.assert_matches_task_chain(DATA_DIR)
+        rows = [count for _, count in stage_rows]
+        self.assertEqual(rows, sorted(rows, reverse=True))
+
+    def test_matches_task_chain_on_edge_cases(self):
+        data_dir = os.path.join(self.tmp_dir.name, 'original')
+        os.makedirs(data_dir)
+        write_source_files(data_dir)
+        stage_rows = self.assert_matches_task_chain(data_dir)
+        self.assertEqual(stage_rows, [
+            ('read', 15), ('drop_missing', 13), ('unusual_year', 12), ('outliers', 10), ('duplicates', 9)
+        ])
+
+    def test_cleaning_rules_applied(self):
+        data_dir = os.path.join(self.tmp_dir.name, 'original')
+        os.makedirs(data_dir)
+        write_source_files(data_dir)
+        df, _, _ = preprocess(data_dir)
+        self.assertEqual(set(df.columns[:6]), {'year', 'price', 'mileage', 'tax', 'mpg', 'enginesize'})
+        self.assertTrue((df['mileage'] <= 200000).all())
+        self.assertFalse(df.duplicated().any())
+
+    def test_load_source_parses_unclean_schema(self):
+        data_dir = os.path.join(self.tmp_dir.name, 'original')
+        os.makedirs(data_dir)
+        write_source_files(data_dir)
+        columns, read_rows, numeric, categorical = load_source(os.path.join(data_dir, 'unclean focus.csv'))
+
+        self.assertEqual(columns[:2], ['make', 'model'])
+        self.assertEqual(read_rows, 4)
+        # The row without a year is dropped
+        self.assertEqual(list(numeric['price']), [7500.0, 9500.0, 14250.0])
+        self.assertEqual(list(numeric['mileage']), [42112.0, 30292.0, 40696.0])
+        self.assertTrue(all(numeric[column].dtype == np.float64 for column in numeric))
+        self.assertTrue(np.isnan(numeric['tax']).all())
+        self.assertEqual(list(categorical['make']), ['focus'] * 3)
+        self.assertEqual(list(categorical['transmission'].categories), ['Automatic', 'Manual'])
+        self.assertTrue(pd.isna(categorical['fueltype']).all())
+
+    def test_load_source_types_clean_schema(self):
+        data_dir = os.path.join(self.tmp_dir.name, 'original')
+        os.makedirs(data_dir)
+        write_source_files(data_dir)
+        _, read_rows, numeric, categorical = load_source(os.path.join(data_dir, 'hyundi.csv'))
+
+        self.assertEqual(read_rows, 3)
+        self.assertEqual(list(numeric['price']), [7500.0, 12000.0, 15000.0])
+        # hyundi's tax(£) column is dropped by the pipeline
+        self.assertTrue(np.isnan(numeric['tax']).all())
+        for column in ['model', 'transmission', 'fueltype']:
+            self.assertIsInstance(categorical[column], pd.Categorical)
+
+    def test_worker_count_does_not_change_result(self):
+        serial = load_sources(DATA_DIR, workers=1)
+        parallel = load_sources(DATA_DIR, workers=4)
+        self.assertEqual(serial[:2], parallel[:2])
+        for column, values in serial[2].items():
+            np.testing.assert_array_equal(values, parallel[2][column])
+        for column, values in serial[3].items():
+            self.assertTrue(values.equals(parallel[3][column]))
+
+    def test_unexpected_column_raises(self):
+        data_dir = os.path.join(self.tmp_dir.name, 'original')
+        os.makedirs(data_dir)
+        pd.DataFrame({'model': [' A1'], 'year': [2017], 'price': [12500], 'colour': ['red']}).to_csv(
+            os.path.join(data_dir, 'audi.csv'), index=False
+        )
+        with self.assertRaises(ValueError):
+            preprocess(data_dir)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+# unit_tests/streaming_preprocessing_test.py
+
+from pipeline_fixtures import DATA_DIR, write_source_files  # isort: skip  (adds the workflow directory to sys.path)
+import os
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from data_store import csv_path, read_dataset
+from preprocessing_engine import preprocess
+from streaming_preprocessing import QuantileSketch, RowHashSet, stream_preprocess
+
+
+class TestStreamingPreprocessing(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.output_file = os.path.join(self.tmp_dir.name, 'cleaned_car_data.csv')
+
+    def assert_matches_in_memory(self, data_dir, chunk_size):
+        expected_df, expected_transformer, expected_stage_rows = preprocess(data_dir)
+        transformer, stage_rows, _ = stream_preprocess(data_dir, self.output_file, chunk_size, export_csv=True)
+
+        pd.testing.assert_frame_equal(read_dataset(self.output_file.replace('.csv', '.parquet')), expected_df)
+        with open(csv_path(self.output_file)) as f:
+            self.assertEqual(f.read(), expected_df.to_csv(index=False))
+        expected_transformer = expected_transformer.with_feature_columns([c for c in expected_df.columns if c != 'price'])
+        self.assertEqual(transformer.to_dict(), expected_transformer.to_dict())
+        self.assertEqual(stage_rows, expected_stage_rows)
+
+    def test_matches_in_memory_engine_on_source_data(self):
+        self.assert_matches_in_memory(DATA_DIR, chunk_size=5000)
+
+    def test_matches_in_memory_engine_on_edge_cases(self):
+        data_dir = os.path.join(self.tmp_dir.name, 'original')
+        os.makedirs(data_dir)
+        write_source_files(data_dir)
+        # Chunks of two rows: duplicates and fill values span chunks and files
+        self.assert_matches_in_memory(data_dir, chunk_size=2)
+
+    def test_sketch_median_is_exact_below_max_bins(self):
+        rng = np.random.default_rng(0)
+        values = rng.integers(0, 500, 10001).astype(np.float64)
+        values[::7] = np.nan
+        sketch = QuantileSketch(max_bins=1024)
+        for chunk in np.array_split(values, 13):
+            sketch.update(chunk)
+        self.assertTrue(sketch.exact)
+        median, low, high = sketch.median()
+        self.assertEqual(median, np.nanmedian(values))
+        self.assertEqual((low, high), (median, median))
+
+    def test_sketch_median_bounds_hold_after_compression(self):
+        rng = np.random.default_rng(0)
+        values = rng.lognormal(9, 1, 100000)
+        sketch = QuantileSketch(max_bins=256)
+        for chunk in np.array_split(values, 50):
+            sketch.update(chunk)
+        self.assertFalse(sketch.exact)
+        self.assertLessEqual(len(sketch.lo), 256)
+        self.assertEqual(sketch.n, len(values))
+        median, low, high = sketch.median()
+        self.assertTrue(low <= np.median(values) <= high)
+        # The estimate's rank is within a couple of bins of the middle
+        rank = np.searchsorted(np.sort(values), median) / len(values)
+        self.assertLess(abs(rank - 0.5), 4 / 256)
+
+    def test_row_hash_set_keeps_first_occurrences(self):
+        seen = RowHashSet()
+        rng = np.random.default_rng(0)
+        chunks = [rng.integers(0, 300, 100).astype(np.uint64) for _ in range(20)]
+        kept = np.concatenate([chunk[seen.add(chunk)] for chunk in chunks])
+        all_values = np.concatenate(chunks)
+        _, first = np.unique(all_values, return_index=True)
+        np.testing.assert_array_equal(kept, all_values[np.sort(first)])
+        self.assertEqual(len(seen), len(first))
+
+
+if __name__ == '__main__':
+    unittest.main()
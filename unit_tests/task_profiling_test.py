@@ -0,0 +1,127 @@
+# unit_tests/task_profiling_test.py
+
+from pipeline_fixtures import run_task_chain, write_source_files  # isort: skip  (adds the workflow directory to sys.path)
+import os
+import json
+import time
+import tempfile
+import unittest
+import mlflow
+import numpy as np
+import pandas as pd
+from task_profiling import TaskProfiler, frame_shape, profiled, profiling
+
+
+@profiled
+def busy_task(seconds):
+    # Pure Python work, so the sampled stacks end in this function
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        sum(range(1000))
+    return pd.DataFrame({'a': range(5), 'b': range(5)})
+
+
+@profiled
+def small_task():
+    return 1
+
+
+@profiled
+def peak_then_nested_task(n_bytes):
+    # Touch n_bytes and free them, then run a task that allocates almost nothing
+    block = np.ones(n_bytes // 8)
+    del block
+    return small_task()
+
+
+class TestTaskProfiling(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+
+    def test_task_chain_report(self):
+        data_dir = os.path.join(self.tmp_dir.name, 'original')
+        os.makedirs(data_dir)
+        write_source_files(data_dir)
+        with TaskProfiler(sample_slowest=False) as profiler:
+            df, _ = run_task_chain(data_dir, os.path.join(self.tmp_dir.name, 'combined.csv'))
+
+        report = profiler.report()
+        records = {record['task']: record for record in report['tasks']}
+        self.assertLessEqual({'load_and_process_datasets', 'combine_datasets', 'feature_engineering',
+                              'handle_outliers', 'drop_duplicates', 'handle_low_frequency_categories'}, set(records))
+        for record in report['tasks']:
+            self.assertGreaterEqual(record['wall_seconds'], 0)
+            self.assertGreaterEqual(record['cpu_seconds'], 0)
+            self.assertGreaterEqual(record['peak_rss_delta_bytes'], 0)
+        self.assertGreaterEqual(report['wall_seconds'], sum(record['wall_seconds'] for record in report['tasks']))
+
+        # Row counts follow the data through the chain
+        self.assertEqual(records['handle_low_frequency_categories']['output_rows'], len(df))
+        self.assertEqual(records['handle_outliers']['output_rows'], records['drop_duplicates']['input_rows'])
+        self.assertLessEqual(records['drop_duplicates']['output_rows'], records['drop_duplicates']['input_rows'])
+        # One-hot encoding adds columns
+        self.assertGreater(records['feature_engineering']['output_columns'], records['feature_engineering']['input_columns'])
+        self.assertIsNone(records['fit_feature_transformer']['output_rows'])
+        self.assertIsNone(report['sampled_profile'])
+
+    def test_slowest_task_is_sampled(self):
+        with TaskProfiler(sample_interval=0.005) as profiler:
+            busy_task(0.02)
+            busy_task(0.3)
+        report = profiler.report()
+        self.assertEqual([record['wall_seconds'] > 0.25 for record in report['tasks']], [False, True])
+        self.assertEqual(report['slowest_task'], 'busy_task')
+        self.assertEqual(report['sampled_profile']['task'], 'busy_task')
+        self.assertGreater(report['sampled_profile']['samples'], 10)
+
+        stacks = profiler.folded_stacks().splitlines()
+        self.assertEqual(sum(int(line.rsplit(' ', 1)[1]) for line in stacks), report['sampled_profile']['samples'])
+        self.assertTrue(all('task_profiling_test.py:busy_task' in line for line in stacks))
+
+    @unittest.skipUnless(os.path.exists('/proc/self/clear_refs'), 'peak RSS is only tracked on Linux')
+    def test_nested_task_keeps_the_outer_peak(self):
+        with TaskProfiler(sample_slowest=False) as profiler:
+            peak_then_nested_task(200 * 2 ** 20)
+        records = {record['task']: record for record in profiler.report()['tasks']}
+        # The inner task resets the process peak; the outer one still reports the 200 MB it reached before
+        self.assertGreater(records['peak_then_nested_task']['peak_rss_delta_bytes'], 150 * 2 ** 20)
+        self.assertLess(records['small_task']['peak_rss_delta_bytes'], 50 * 2 ** 20)
+
+    def test_tasks_run_unprofiled_without_an_active_profiler(self):
+        self.assertEqual(len(busy_task(0)), 5)
+        with profiling(False, 'unused') as profiler:
+            self.assertIsNone(profiler)
+            busy_task(0)
+        self.assertEqual(frame_shape([1, 'a']), (None, None))
+        self.assertEqual(frame_shape([[pd.DataFrame({'a': [1]}), pd.DataFrame({'a': [1, 2], 'b': [3, 4]})]]), (2, 2))
+
+    def test_report_is_logged_to_mlflow(self):
+        mlflow.set_tracking_uri(f"sqlite:///{os.path.join(self.tmp_dir.name, 'mlflow.db')}")
+        self.addCleanup(mlflow.set_tracking_uri, None)
+        mlflow.set_experiment(experiment_id=mlflow.create_experiment(
+            'task-profiling-test', artifact_location=os.path.join(self.tmp_dir.name, 'artifacts')))
+
+        with profiling(True, 'profile') as profiler:
+            busy_task(0.01)
+            # An inner profiling block (a subflow under main_flow) leaves the report to the outer one
+            with profiling(True, 'inner') as inner:
+                self.assertIsNone(inner)
+                busy_task(0.05)
+
+        run = mlflow.search_runs(output_format='list')[0]
+        self.assertEqual(run.info.run_name, 'profile')
+        self.assertEqual(run.data.tags['slowest_task'], 'busy_task')
+        self.assertGreater(run.data.metrics['busy_task_2.wall_seconds'], run.data.metrics['busy_task.wall_seconds'])
+        self.assertEqual(run.data.metrics['busy_task.output_rows'], 5)
+        self.assertNotIn('busy_task.input_rows', run.data.metrics)
+
+        artifacts = mlflow.artifacts.download_artifacts(run_id=run.info.run_id, artifact_path='task_profile')
+        with open(os.path.join(artifacts, 'report.json')) as f:
+            self.assertEqual(json.load(f), json.loads(json.dumps(profiler.report())))
+        with open(os.path.join(artifacts, 'slowest_task.folded')) as f:
+            self.assertEqual(f.read(), profiler.folded_stacks())
+
+
+if __name__ == '__main__':
+    unittest.main()
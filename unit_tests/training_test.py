@@ -0,0 +1,66 @@
+# unit_tests/training_test.py
+
+import os
+import tempfile
+import unittest
+import numpy as np
+import mlflow
+import xgboost as xgb
+from data_store import write_dataset
+from model_fixtures import make_car_data
+from pipeline_fixtures import workflow_orchestration
+
+PARAMS = {'learning_rate': 0.1, 'max_depth': 4, 'n_estimators': 30, 'objective': 'reg:squarederror'}
+
+
+class TestCompactTraining(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        X, y = make_car_data(1000)
+        self.df = X.copy()
+        self.df.insert(1, 'price', y)
+        self.path = write_dataset(self.df, os.path.join(self.tmp_dir.name, 'cleaned_car_data.csv'))
+
+    def test_training_data_uses_compact_layout(self):
+        X_train, X_test, y_train, y_test = workflow_orchestration.load_and_prepare_data.fn(self.path)
+        self.assertEqual((len(X_train), len(X_test)), (800, 200))
+        for column, dtype in X_train.dtypes.items():
+            self.assertEqual(dtype, bool if column.startswith(('make_', 'transmission_', 'fueltype_')) else np.float32)
+        self.assertEqual(y_train.dtype, np.float32)
+        np.testing.assert_array_equal(X_test['mileage'], self.df.loc[X_test.index, 'mileage'].astype(np.float32))
+        np.testing.assert_array_equal(y_test, self.df.loc[y_test.index, 'price'].astype(np.float32))
+
+    def test_booster_matches_sklearn_estimator(self):
+        X_train, X_test, y_train, _ = workflow_orchestration.load_and_prepare_data.fn(self.path)
+        booster = workflow_orchestration.fit_booster(X_train, y_train, PARAMS)
+        expected = xgb.XGBRegressor(**PARAMS).fit(self.df.drop(columns=['price']).loc[X_train.index], y_train)
+        X_test64 = self.df.drop(columns=['price']).loc[X_test.index]
+        np.testing.assert_allclose(booster.predict(xgb.DMatrix(X_test64)), expected.predict(X_test64), rtol=1e-6)
+
+    def test_early_stopping_keeps_best_round(self):
+        X_train, _, y_train, _ = workflow_orchestration.load_and_prepare_data.fn(self.path)
+        params = workflow_orchestration.hist_params(dict(PARAMS, n_estimators=400, learning_rate=0.3), nthread=1)
+        self.assertEqual(params['tree_method'], 'hist')
+        booster = workflow_orchestration.fit_booster(X_train, y_train, params, early_stopping_rounds=5)
+        self.assertLess(booster.num_boosted_rounds(), 400)
+
+    def test_logged_model_accepts_float64_features(self):
+        mlflow.set_tracking_uri(f"sqlite:///{os.path.join(self.tmp_dir.name, 'mlflow.db')}")
+        self.addCleanup(mlflow.set_tracking_uri, None)
+        # Artifacts go to the temporary directory too, not ./mlruns
+        mlflow.set_experiment(experiment_id=mlflow.create_experiment(
+            'compact-training-test', artifact_location=os.path.join(self.tmp_dir.name, 'artifacts')))
+        split = workflow_orchestration.load_and_prepare_data.fn(self.path)
+        workflow_orchestration.train_and_log_model.fn(*split, PARAMS)
+
+        run = mlflow.search_runs(output_format='list')[0]
+        self.assertEqual(run.data.metrics['boosting_rounds'], PARAMS['n_estimators'])
+        self.assertGreater(run.data.metrics['train_seconds'], 0)
+        model = mlflow.pyfunc.load_model(f'runs:/{run.info.run_id}/xgboost_model')
+        features = self.df.drop(columns=['price']).head(5)
+        self.assertEqual(len(model.predict(features)), 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
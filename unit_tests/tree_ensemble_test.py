@@ -0,0 +1,51 @@
+# unit_tests/tree_ensemble_test.py
+
+import os
+import tempfile
+import unittest
+import numpy as np
+from tree_ensemble import TreeEnsemble, export_booster
+from model import ModelService
+from model_fixtures import make_car_data, save_test_model
+
+
+class TestTreeEnsemble(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp_dir = tempfile.TemporaryDirectory()
+        cls.model, cls.X = save_test_model(os.path.join(cls.tmp_dir.name, 'xgboost_model'), max_depth=6)
+        cls.path = os.path.join(cls.tmp_dir.name, 'tree_ensemble.npz')
+        export_booster(cls.model.get_booster(), cls.path)
+        cls.ensemble = TreeEnsemble.load(cls.path, chunk_size=64)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp_dir.cleanup()
+
+    def test_matches_xgboost(self):
+        X, _ = make_car_data(1000, seed=7)
+        expected = self.model.predict(X)
+        np.testing.assert_allclose(self.ensemble.predict(X), expected, rtol=1e-5)
+
+    def test_missing_values_follow_default_direction(self):
+        X, _ = make_car_data(200, seed=3)
+        X = X.astype(float)
+        X.loc[::3, 'mileage'] = np.nan
+        X.loc[::5, 'year'] = np.nan
+        expected = self.model.get_booster().inplace_predict(X.to_numpy(np.float32))
+        np.testing.assert_allclose(self.ensemble.predict(X), expected, rtol=1e-5)
+
+    def test_predict_records(self):
+        records = self.X.head(10).to_dict(orient='records')
+        np.testing.assert_allclose(self.ensemble.predict_records(records), self.model.predict(self.X.head(10)), rtol=1e-5)
+        with self.assertRaises(ValueError):
+            self.ensemble.predict_record({'year': 2020.0})
+
+    def test_model_service_with_numpy_backend(self):
+        model_service = ModelService(self.ensemble, model_version='v1')
+        result = model_service.predict_car_price(self.X.iloc[0].to_dict())
+        self.assertAlmostEqual(result['prediction']['car_price'], float(self.model.predict(self.X.head(1))[0]), places=1)
+
+
+if __name__ == '__main__':
+    unittest.main()
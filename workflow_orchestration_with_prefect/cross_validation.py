@@ -0,0 +1,166 @@
+import os
+import json
+import hashlib
+import tempfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import xgboost as xgb
+from sklearn.metrics import mean_absolute_error, r2_score, mean_squared_error
+from sklearn.model_selection import KFold
+
+# Bump when the cached arrays, fold assignment or fold results change meaning
+CV_CACHE_FORMAT = 1
+
+# The worker's memory-mapped features, target and fold assignment, opened once by _open_arrays
+_arrays = None
+
+
+def data_fingerprint(X, y, columns):
+    # SHA-256 of the float32 feature matrix, the target and the column names
+    digest = hashlib.sha256(json.dumps([CV_CACHE_FORMAT, list(columns)]).encode())
+    digest.update(X.data)
+    digest.update(y.data)
+    return digest.hexdigest()
+
+
+def params_fingerprint(params, quantile_matrix):
+    # nthread does not change the model, so runs with different pool sizes share folds
+    key = {key: value for key, value in params.items() if key != 'nthread'}
+    payload = json.dumps([key, quantile_matrix, xgb.__version__], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+def _save_atomic(path, save):
+    # Write through a temporary file and rename, so an interrupted run never leaves a partial file
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=os.path.splitext(path)[1])
+    os.close(fd)
+    save(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def _json_writer(value):
+    def write(path):
+        with open(path, 'w') as f:
+            json.dump(value, f)
+    return write
+
+
+def prepare_arrays(cache_dir, X, y, n_folds, seed=42):
+    """Store the features, target and fold assignment as .npy files for memory mapping.
+
+    The arrays live in `cache_dir/<data fingerprint>/` and are only written
+    the first time a dataset is seen; features and target are float32, the
+    fold of each row is int8. Returns (data_dir, folds_path).
+    """
+    columns = list(X.columns)
+    features = np.ascontiguousarray(X.to_numpy(dtype=np.float32))
+    target = np.ascontiguousarray(np.asarray(y, dtype=np.float32))
+    data_dir = os.path.join(cache_dir, data_fingerprint(features, target, columns))
+    os.makedirs(data_dir, exist_ok=True)
+    for name, values in (('features', features), ('target', target)):
+        path = os.path.join(data_dir, f'{name}.npy')
+        if not os.path.exists(path):
+            _save_atomic(path, lambda tmp_path: np.save(tmp_path, values))
+    columns_path = os.path.join(data_dir, 'columns.json')
+    if not os.path.exists(columns_path):
+        _save_atomic(columns_path, _json_writer(columns))
+
+    folds_path = os.path.join(data_dir, f'folds-{n_folds}-{seed}.npy')
+    if not os.path.exists(folds_path):
+        folds = np.empty(len(target), dtype=np.int8)
+        for fold, (_, test_idx) in enumerate(KFold(n_folds, shuffle=True, random_state=seed).split(folds)):
+            folds[test_idx] = fold
+        _save_atomic(folds_path, lambda tmp_path: np.save(tmp_path, folds))
+    return data_dir, folds_path
+
+
+def _open_arrays(data_dir, folds_path):
+    # Read-only maps: every worker shares the same page cache copy of the arrays
+    global _arrays
+    with open(os.path.join(data_dir, 'columns.json')) as f:
+        columns = json.load(f)
+    _arrays = (np.load(os.path.join(data_dir, 'features.npy'), mmap_mode='r'),
+               np.load(os.path.join(data_dir, 'target.npy'), mmap_mode='r'),
+               np.load(folds_path, mmap_mode='r'), columns)
+
+
+def _close_arrays():
+    global _arrays
+    _arrays = None
+
+
+def _run_fold(fold, params, quantile_matrix, results_dir):
+    # Train on every other fold, score this one and cache the model and metrics
+    X, y, folds, columns = _arrays
+    test = folds == fold
+    params = dict(params)
+    num_boost_round = params.pop('n_estimators', 100)
+    matrix = xgb.QuantileDMatrix if quantile_matrix else xgb.DMatrix
+    booster = xgb.train(params, matrix(X[~test], label=y[~test], feature_names=columns), num_boost_round=num_boost_round)
+    y_test = np.asarray(y[test], dtype=np.float64)
+    y_pred = booster.predict(xgb.DMatrix(X[test], feature_names=columns))
+    metrics = {
+        'rmse': float(np.sqrt(mean_squared_error(y_test, y_pred))),
+        'mae': float(mean_absolute_error(y_test, y_pred)),
+        'r2_score': float(r2_score(y_test, y_pred)),
+        'rows': int(test.sum()),
+    }
+    _save_atomic(os.path.join(results_dir, f'fold-{fold}.ubj'), booster.save_model)
+    # Metrics are written last: a fold counts as finished once its metrics file exists
+    _save_atomic(os.path.join(results_dir, f'fold-{fold}.json'), _json_writer(metrics))
+    return metrics
+
+
+def cross_validate(X, y, params, n_folds=5, workers=None, cache_dir=None, quantile_matrix=True, seed=42):
+    """K-fold cross-validation of XGBoost `params` with cached folds.
+
+    Features and target are stored once as memory-mapped .npy files
+    (`prepare_arrays`), and folds run on a pool of `workers` processes
+    (default: one per CPU; 1 runs in this process) that all map the same
+    read-only arrays. Fold models and metrics are cached under
+    `cache_dir/<data fingerprint>/<params fingerprint>/`, so a rerun on the
+    same data and parameters only trains the folds that did not finish.
+    Without `cache_dir` a temporary directory is used and nothing is reused.
+
+    Returns (fold_metrics, summary): a list of per-fold dicts (rmse, mae,
+    r2_score, rows, cached) and the mean and standard deviation of each
+    metric across folds.
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        data_dir, folds_path = prepare_arrays(cache_dir or tmp_dir, X, y, n_folds, seed)
+        results_dir = os.path.join(data_dir, params_fingerprint(params, quantile_matrix) + f'-{n_folds}-{seed}')
+        os.makedirs(results_dir, exist_ok=True)
+
+        fold_metrics = [None] * n_folds
+        for fold in range(n_folds):
+            path = os.path.join(results_dir, f'fold-{fold}.json')
+            if os.path.exists(path) and os.path.exists(os.path.join(results_dir, f'fold-{fold}.ubj')):
+                with open(path) as f:
+                    fold_metrics[fold] = dict(json.load(f), cached=True)
+        pending = [fold for fold in range(n_folds) if fold_metrics[fold] is None]
+
+        workers = min(workers or os.cpu_count(), max(len(pending), 1))
+        # Folds share the CPUs rather than each starting one thread per CPU
+        params = dict(params, nthread=max(1, (os.cpu_count() or 1) // workers))
+        args = ([params] * len(pending), [quantile_matrix] * len(pending), [results_dir] * len(pending))
+        if workers > 1:
+            # spawn: OpenMP in XGBoost is not safe to use in a forked child
+            with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('spawn'),
+                                     initializer=_open_arrays, initargs=(data_dir, folds_path)) as pool:
+                results = list(pool.map(_run_fold, pending, *args))
+        else:
+            _open_arrays(data_dir, folds_path)
+            try:
+                results = list(map(_run_fold, pending, *args))
+            finally:
+                _close_arrays()
+        for fold, metrics in zip(pending, results):
+            fold_metrics[fold] = dict(metrics, cached=False)
+
+    summary = {}
+    for name in ('rmse', 'mae', 'r2_score'):
+        values = [metrics[name] for metrics in fold_metrics]
+        summary[f'cv_{name}_mean'] = float(np.mean(values))
+        summary[f'cv_{name}_std'] = float(np.std(values))
+    return fold_metrics, summary
@@ -0,0 +1,132 @@
+import os
+import json
+import shutil
+import numpy as np
+import pandas as pd
+
+TARGET_COLUMN = 'price'
+
+
+def parquet_path(path):
+    # cleaned_car_data.csv and cleaned_car_data.parquet name the same dataset
+    return os.path.splitext(path)[0] + '.parquet'
+
+
+def csv_path(path):
+    return os.path.splitext(path)[0] + '.csv'
+
+
+def _sidecar_paths(path):
+    stem = os.path.splitext(path)[0]
+    return stem + '.features.npy', stem + '.target.npy', stem + '.features.json'
+
+
+def write_dataset(df, path, compression='snappy', feature_matrix=True):
+    """Write a dataset to Parquet, plus a memory-mappable feature matrix.
+
+    The matrix is float64 in the frame's column order without the target,
+    stored as .npy next to the Parquet file together with the target vector
+    and a JSON file holding the column names and pandas dtypes.
+    """
+    path = parquet_path(path)
+    _remove(path)
+    df.to_parquet(path, compression=compression, index=False)
+    if feature_matrix:
+        features_path, target_path, schema_path = _sidecar_paths(path)
+        features = df.drop(columns=[TARGET_COLUMN])
+        np.save(features_path, features.to_numpy(dtype=np.float64))
+        np.save(target_path, df[TARGET_COLUMN].to_numpy(dtype=np.float64))
+        with open(schema_path, 'w') as f:
+            json.dump({
+                'columns': list(features.columns),
+                'dtypes': {column: str(dtype) for column, dtype in features.dtypes.items()},
+            }, f, indent=2)
+    return path
+
+
+def _remove(path):
+    # A dataset is a single Parquet file or, when written in chunks, a directory of parts;
+    # a stale feature matrix from an earlier write is removed with it
+    if os.path.isdir(path):
+        shutil.rmtree(path)
+    for file_path in (path, *_sidecar_paths(path)):
+        if os.path.isfile(file_path):
+            os.remove(file_path)
+
+
+class DatasetWriter:
+    """Write a dataset chunk by chunk, without holding it in memory.
+
+    Chunks go to numbered Parquet part files in a directory at the dataset's
+    .parquet path, which `read_dataset` reads like a single file, and are
+    optionally appended to the CSV export. No feature matrix is written.
+    """
+
+    def __init__(self, path, compression='snappy', export_csv=False):
+        self.path = parquet_path(path)
+        self.csv_path = csv_path(path) if export_csv else None
+        self.compression = compression
+        self.parts = 0
+        self.rows = 0
+        _remove(self.path)
+        os.makedirs(self.path)
+        if self.csv_path and os.path.exists(self.csv_path):
+            os.remove(self.csv_path)
+
+    def write(self, df):
+        if len(df) == 0:
+            return
+        df.to_parquet(os.path.join(self.path, f'part-{self.parts:05d}.parquet'), compression=self.compression, index=False)
+        if self.csv_path:
+            df.to_csv(self.csv_path, mode='a', header=self.parts == 0, index=False)
+        self.parts += 1
+        self.rows += len(df)
+
+
+def read_dataset(path, columns=None, filters=None):
+    """Read a dataset written by `write_dataset`, or a CSV export of it.
+
+    Only `columns` are read when given; with Parquet the other columns are
+    never decoded. Parquet reads also take row `filters` in the
+    `pd.read_parquet` form, e.g. [('timestamp', '>=', start)], which skip
+    the row groups and part files that cannot match.
+    """
+    if path.endswith('.csv'):
+        if filters:
+            raise ValueError("Row filters need a Parquet dataset")
+        return pd.read_csv(path, usecols=columns)[columns] if columns else pd.read_csv(path)
+    return pd.read_parquet(path, columns=columns, filters=filters)
+
+
+def iter_dataset(path, columns=None, batch_size=100000):
+    """Read a dataset like `read_dataset`, in frames of at most `batch_size` rows.
+
+    Only one batch is held in memory at a time. Parquet batches need
+    pyarrow, which is imported here so the other readers work without it.
+    """
+    if path.endswith('.csv'):
+        for chunk in pd.read_csv(path, usecols=columns, chunksize=batch_size):
+            yield chunk[columns] if columns else chunk
+        return
+    import pyarrow.dataset
+    for batch in pyarrow.dataset.dataset(path, format='parquet').to_batches(columns=columns, batch_size=batch_size):
+        yield batch.to_pandas()
+
+
+def open_feature_matrix(path):
+    """Memory-map the feature matrix and target of a dataset.
+
+    Returns (X, y, columns, dtypes); X and y are read-only np.memmap arrays,
+    so rows are only paged in when they are used.
+    """
+    features_path, target_path, schema_path = _sidecar_paths(parquet_path(path))
+    with open(schema_path) as f:
+        schema = json.load(f)
+    X = np.load(features_path, mmap_mode='r')
+    y = np.load(target_path, mmap_mode='r')
+    return X, y, schema['columns'], schema['dtypes']
+
+
+def feature_frame(X, columns, dtypes):
+    # Rows of the feature matrix as a DataFrame with the dataset's original dtypes
+    return pd.DataFrame(X, columns=columns).astype(dtypes)
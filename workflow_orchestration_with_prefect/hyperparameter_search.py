@@ -0,0 +1,110 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import numpy as np
+import xgboost as xgb
+from sklearn.model_selection import train_test_split
+
+# Held-out share of the training rows that trials are scored on
+VALIDATION_SIZE = 0.2
+
+# Fixed parameters of every trial; boosting rounds are the successive halving budget
+BASE_PARAMS = {'objective': 'reg:squarederror', 'eval_metric': 'rmse', 'tree_method': 'hist', 'seed': 42}
+
+# The worker's training and validation matrices, built once by _init_worker
+_matrices = None
+
+
+def sample_params(rng):
+    # The search space of xgboost_hyperparameter_tuning.ipynb, without n_estimators
+    return {
+        'max_depth': int(rng.integers(3, 11)),
+        'learning_rate': float(rng.uniform(0.01, 0.3)),
+        'subsample': float(rng.uniform(0.5, 1.0)),
+        'min_child_weight': float(np.exp(rng.uniform(-1, 3))),
+    }
+
+
+def _init_worker(X_fit, y_fit, X_valid, y_valid):
+    global _matrices
+    dtrain = xgb.QuantileDMatrix(X_fit, label=y_fit)
+    _matrices = dtrain, xgb.QuantileDMatrix(X_valid, label=y_valid, ref=dtrain)
+
+
+def _release_matrices():
+    # Free the matrices built for an in-process search
+    global _matrices
+    _matrices = None
+
+
+def _train_trial(params, rounds, model):
+    # Continue a trial's booster (raw bytes, None for a new trial) up to `rounds` rounds;
+    # returns the validation RMSE after each added round and the booster's raw bytes
+    dtrain, dvalid = _matrices
+    booster = xgb.Booster(model_file=bytearray(model)) if model is not None else None
+    done = booster.num_boosted_rounds() if booster is not None else 0
+    evals_result = {}
+    booster = xgb.train(params, dtrain, num_boost_round=rounds - done, evals=[(dvalid, 'validation')],
+                        evals_result=evals_result, xgb_model=booster, verbose_eval=False)
+    return evals_result['validation']['rmse'], bytes(booster.save_raw())
+
+
+def successive_halving(X_train, y_train, n_trials=27, min_rounds=50, max_rounds=1000, eta=3, workers=None, seed=42):
+    """Search XGBoost parameters with successive halving on boosting rounds.
+
+    `n_trials` parameter sets are sampled from the notebook's search space.
+    All of them are trained for `min_rounds` rounds and scored on a held-out
+    VALIDATION_SIZE of the training rows; the best 1 / `eta` carry on for
+    `eta` times as many rounds, continuing from their boosters, until one is
+    left or `max_rounds` is reached. Trials run on a pool of `workers`
+    processes (default: one per CPU; 1 runs in this process). Each worker
+    builds the QuantileDMatrix once and reuses it for all of its trials.
+
+    Returns (best_params, trials). best_params includes BASE_PARAMS and
+    n_estimators, the winner's best round. Each trial is a dict with its
+    params, its validation RMSE per round and the rounds it was trained for.
+    """
+    workers = workers or os.cpu_count()
+    rng = np.random.default_rng(seed)
+    # Trials share the CPUs rather than each starting one thread per CPU
+    nthread = max(1, (os.cpu_count() or 1) // workers)
+    trials = [
+        {'params': dict(BASE_PARAMS, nthread=nthread, **sample_params(rng)), 'rmse': [], 'rounds': 0, 'model': None}
+        for _ in range(n_trials)
+    ]
+    fit_idx, valid_idx = train_test_split(np.arange(len(y_train)), test_size=VALIDATION_SIZE, random_state=seed)
+    data = (X_train.iloc[fit_idx], y_train.iloc[fit_idx], X_train.iloc[valid_idx], y_train.iloc[valid_idx])
+
+    if workers > 1:
+        # spawn: OpenMP in XGBoost is not safe to use in a forked child
+        pool = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('spawn'),
+                                   initializer=_init_worker, initargs=data)
+        run = pool.map
+    else:
+        pool = None
+        _init_worker(*data)
+        run = map
+
+    try:
+        alive, rounds = trials, min_rounds
+        while True:
+            results = run(_train_trial, [t['params'] for t in alive], [rounds] * len(alive), [t['model'] for t in alive])
+            for trial, (rmse, model) in zip(alive, results):
+                trial['rmse'] += rmse
+                trial['rounds'], trial['model'] = rounds, model
+            if len(alive) == 1 or rounds >= max_rounds:
+                break
+            alive = sorted(alive, key=lambda t: t['rmse'][-1])[:max(1, len(alive) // eta)]
+            rounds = min(rounds * eta, max_rounds)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        else:
+            _release_matrices()
+
+    best = min(alive, key=lambda t: min(t['rmse']))
+    best_params = dict(best['params'], n_estimators=int(np.argmin(best['rmse'])) + 1)
+    best_params.pop('nthread')
+    for trial in trials:
+        del trial['model']
+    return best_params, trials
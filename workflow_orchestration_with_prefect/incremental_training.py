@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+
+WARM_START_METHODS = ('continue', 'refresh')
+
+
+def row_fingerprints(X, y):
+    # 64-bit hashes of the (features, target) rows; a row hashes the same in any dataset with these columns
+    return pd.util.hash_pandas_object(X.assign(**{y.name: y}), index=False).to_numpy()
+
+
+def holdout_rmse(booster, X, y):
+    return float(np.sqrt(np.mean((booster.predict(xgb.DMatrix(X)) - y.to_numpy(dtype=np.float64)) ** 2)))
+
+
+def warm_start_booster(booster, X_new, y_new, params, method='continue', rounds=50):
+    """Update a trained booster with new rows only; `booster` itself is left as it is.
+
+    'continue' boosts `rounds` more trees on the new rows. 'refresh' keeps
+    the tree structure and refits every leaf value on the new rows.
+    """
+    params = {key: value for key, value in params.items() if key != 'n_estimators'}
+    dnew = xgb.DMatrix(X_new, label=y_new)
+    if method == 'continue':
+        return xgb.train(params, dnew, num_boost_round=rounds, xgb_model=booster)
+    if method == 'refresh':
+        params.pop('tree_method', None)
+        params.update(process_type='update', updater='refresh', refresh_leaf=True)
+        return xgb.train(params, dnew, num_boost_round=booster.num_boosted_rounds(), xgb_model=booster)
+    raise ValueError(f"Unknown warm start method '{method}'")
+
+
+def incremental_retrain(booster, seen_rows, X_train, y_train, X_test, y_test, params, full_retrain,
+                        method='continue', rounds=50, max_rmse_increase=0.02):
+    """Warm-start the prior booster on the training rows it has not seen.
+
+    `seen_rows` are the row fingerprints of the prior model's training data.
+    The candidate and the prior model are scored on a shared holdout: the
+    test rows neither of them was trained on. The candidate is kept unless
+    its holdout RMSE is more than `max_rmse_increase` (relative) above the
+    prior model's; otherwise, or when the feature columns changed, the
+    prior run has no fingerprints or the holdout is empty, `full_retrain()`
+    is called instead.
+
+    Returns (booster, training_path, report). training_path is
+    'incremental-<method>', 'unchanged' (no new rows) or 'full-fallback';
+    report holds the row counts, RMSEs and the fallback reason, if any.
+    """
+    report = {}
+    if seen_rows is None:
+        report['fallback_reason'] = 'no-row-fingerprints'
+    elif booster.feature_names != list(X_train.columns):
+        report['fallback_reason'] = 'feature-columns-changed'
+    else:
+        new = ~np.isin(row_fingerprints(X_train, y_train), seen_rows)
+        holdout = ~np.isin(row_fingerprints(X_test, y_test), seen_rows)
+        report.update(new_rows=int(new.sum()), holdout_rows=int(holdout.sum()))
+        if not new.any():
+            return booster, 'unchanged', report
+        if not holdout.any():
+            report['fallback_reason'] = 'empty-holdout'
+        else:
+            X_holdout, y_holdout = X_test[holdout], y_test[holdout]
+            candidate = warm_start_booster(booster, X_train[new], y_train[new], params, method, rounds)
+            report['prior_holdout_rmse'] = holdout_rmse(booster, X_holdout, y_holdout)
+            report['incremental_holdout_rmse'] = holdout_rmse(candidate, X_holdout, y_holdout)
+            if report['incremental_holdout_rmse'] <= report['prior_holdout_rmse'] * (1 + max_rmse_increase):
+                return candidate, f'incremental-{method}', report
+            report['fallback_reason'] = 'accuracy-degraded'
+    return full_retrain(), 'full-fallback', report
@@ -0,0 +1,126 @@
+import os
+import json
+import hashlib
+import tempfile
+import threading
+import numpy as np
+import pandas as pd
+
+# Bump when load_source changes what a partition holds, so stale partitions are rebuilt
+PARTITION_FORMAT = 1
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class PartitionCache:
+    """Cache of the typed per-file partitions built by `load_source`.
+
+    Each source file is fingerprinted by size, mtime and SHA-256. When size
+    and mtime are unchanged the cached partition is used without reading the
+    file; otherwise the file is hashed, and only a changed hash rebuilds the
+    partition. Partitions are stored as Parquet under `partitions/`, and
+    `index.json` maps each source file name to its fingerprint.
+    """
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        self.partitions_dir = os.path.join(cache_dir, 'partitions')
+        self.index_path = os.path.join(cache_dir, 'index.json')
+        os.makedirs(self.partitions_dir, exist_ok=True)
+        self.index = self._read_index()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def load(self, path, loader):
+        # Returns loader(path), from the cache when the file is unchanged
+        name = os.path.basename(path)
+        stat = os.stat(path)
+        with self._lock:
+            entry = self.index.get(name)
+        partition_path = self._partition_path(name)
+
+        if entry is not None and os.path.exists(partition_path):
+            unchanged = entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns
+            if not unchanged and file_sha256(path) == entry['sha256']:
+                # Touched or copied, but the content is the same
+                unchanged = True
+                with self._lock:
+                    entry.update(size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+            if unchanged:
+                with self._lock:
+                    self.hits += 1
+                return entry['columns'], entry['read_rows'], *self._read_partition(partition_path)
+
+        sha256 = file_sha256(path)
+        columns, read_rows, numeric, categorical = loader(path)
+        self._write_partition(partition_path, numeric, categorical)
+        with self._lock:
+            self.misses += 1
+            self.index[name] = {
+                'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': sha256,
+                'columns': columns, 'read_rows': read_rows,
+            }
+        return columns, read_rows, numeric, categorical
+
+    def commit(self, names):
+        # Forget files that are no longer among `names` and persist the index
+        with self._lock:
+            for name in set(self.index) - set(names):
+                del self.index[name]
+                try:
+                    os.remove(self._partition_path(name))
+                except FileNotFoundError:
+                    pass
+            self._write_index({'format': PARTITION_FORMAT, 'files': self.index})
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'files': len(self.index)}
+
+    def _partition_path(self, name):
+        return os.path.join(self.partitions_dir, os.path.splitext(name)[0] + '.parquet')
+
+    @staticmethod
+    def _read_partition(partition_path):
+        numeric, categorical = {}, {}
+        df = pd.read_parquet(partition_path)
+        for column in df.columns:
+            kind, name = column.split('.', 1)
+            if kind == 'numeric':
+                numeric[name] = df[column].to_numpy(dtype=np.float64)
+            else:
+                values = pd.Categorical(df[column])
+                categorical[name] = values.set_categories(values.categories.astype(object))
+        return numeric, categorical
+
+    def _write_partition(self, partition_path, numeric, categorical):
+        df = pd.DataFrame({
+            **{f'numeric.{column}': values for column, values in numeric.items()},
+            **{f'categorical.{column}': values for column, values in categorical.items()},
+        })
+        # Write to a temporary file and rename so a crash never leaves a partial partition
+        fd, tmp_path = tempfile.mkstemp(dir=self.partitions_dir, prefix='partition-', suffix='.parquet')
+        os.close(fd)
+        df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, partition_path)
+
+    def _read_index(self):
+        try:
+            with open(self.index_path) as f:
+                index = json.load(f)
+        except FileNotFoundError:
+            return {}
+        return index['files'] if index.get('format') == PARTITION_FORMAT else {}
+
+    def _write_index(self, index):
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, prefix='index-', suffix='.json')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(index, f)
+        os.replace(tmp_path, self.index_path)
@@ -0,0 +1,192 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals, is_numeric_dtype
+from scipy import stats
+from feature_transformer import FeatureTransformer, CATEGORICAL_COLUMNS, MAKE_MAPPING, standardize_key
+
+NUMERIC_COLUMNS = ['year', 'price', 'mileage', 'tax', 'mpg', 'enginesize']
+REDUNDANT_COLUMNS = ['tax()', 'fuel_type', 'engine_size', 'mileage2', 'fuel_type2', 'engine_size2', 'reference']
+LOW_FREQUENCY_COLUMNS = ['transmission_Other', 'fueltype_Electric', 'fueltype_Other']
+KNOWN_COLUMNS = set(NUMERIC_COLUMNS + CATEGORICAL_COLUMNS + REDUNDANT_COLUMNS + ['model'])
+
+
+def source_dtypes(file, raw_columns):
+    """Explicit read_csv dtypes for one source file, keyed by its raw column names."""
+    columns = [standardize_key(col) for col in raw_columns]
+    unexpected = set(columns) - KNOWN_COLUMNS
+    if unexpected:
+        raise ValueError(f"Unexpected columns in {file}: {sorted(unexpected)}")
+
+    # The unclean exports hold formatted strings such as "£7,500" and "42,112"
+    unclean = 'reference' in columns
+    dtypes = {}
+    for raw_column, column in zip(raw_columns, columns):
+        if column in NUMERIC_COLUMNS + ['tax()'] and not (unclean and column in ('price', 'mileage')):
+            dtypes[raw_column] = np.float64
+        else:
+            # Strings are read as categories, so each distinct value is stored and parsed once
+            dtypes[raw_column] = 'category'
+    return dtypes
+
+
+def _to_float(values, pattern):
+    if is_numeric_dtype(values):
+        return values.to_numpy(dtype=np.float64)
+    # Strip `pattern` from each distinct string, as the task chain's replace/astype pairs do,
+    # then expand through the category codes
+    values = values.cat.remove_unused_categories()
+    parsed = pd.Series(values.cat.categories.astype(object)).str.replace(pattern, '', regex=True).astype(float)
+    return np.append(parsed.to_numpy(), np.nan)[values.cat.codes.to_numpy()]
+
+
+def _categorical(values):
+    # Only categories that survive the missing-value filter, stored as objects so
+    # that the per-file parts can be unioned
+    values = pd.Categorical(values).remove_unused_categories()
+    return values.set_categories(values.categories.astype(object))
+
+
+def read_source(path, chunksize=None):
+    # read_csv with the dtypes from source_dtypes; an iterator of frames when chunksize is set
+    raw_columns = list(pd.read_csv(path, nrows=0).columns)
+    return pd.read_csv(path, dtype=source_dtypes(os.path.basename(path), raw_columns), chunksize=chunksize)
+
+
+def load_source(path):
+    """Read one per-make CSV into typed columns.
+
+    Rows with a missing value in any of the file's columns are dropped, as in
+    clean_data. Returns (columns, read_rows, numeric, categorical) where
+    numeric maps NUMERIC_COLUMNS to float64 arrays and categorical maps
+    make/model/transmission/fueltype to Categoricals.
+    """
+    return typed_columns(read_source(path), os.path.basename(path))
+
+
+def typed_columns(df, file):
+    # The typed columns of a frame, or a chunk of one, returned by read_source for `file`
+    df.columns = [standardize_key(col) for col in df.columns]
+    read_rows = len(df)
+    df = df[df.notna().all(axis=1).to_numpy()]
+    n_rows = len(df)
+    missing = np.full(n_rows, np.nan)
+    numeric = {
+        'year': df['year'].to_numpy(dtype=np.float64),
+        'price': _to_float(df['price'], '[£,]'),
+        'mileage': _to_float(df['mileage'], r'\D'),
+        'tax': _to_float(df['tax'], '[£,]') if 'tax' in df.columns else missing,
+        'mpg': df['mpg'].to_numpy(dtype=np.float64) if 'mpg' in df.columns else missing,
+        'enginesize': df['enginesize'].to_numpy(dtype=np.float64) if 'enginesize' in df.columns else missing,
+    }
+
+    make = file.split('.')[0]
+    no_values = pd.Categorical.from_codes(np.full(n_rows, -1, dtype=np.int8), pd.Index([], dtype=object))
+    categorical = {
+        'make': pd.Categorical.from_codes(np.zeros(n_rows, dtype=np.int8), pd.Index([MAKE_MAPPING.get(make, make)], dtype=object)),
+        'model': _categorical(df['model'].array),
+        'transmission': _categorical(df['transmission'].array),
+        'fueltype': _categorical(df['fueltype'].array) if 'fueltype' in df.columns else no_values,
+    }
+    return ['make'] + list(df.columns), read_rows, numeric, categorical
+
+
+def load_sources(data_dir, workers=None, cache=None):
+    """Load every CSV in `data_dir` concurrently and concatenate the typed columns.
+
+    Files are read on a thread pool of `workers` threads (default: one per
+    CPU); the pandas CSV parser releases the GIL while tokenizing. With a
+    PartitionCache only new or changed files are parsed. Returns
+    (column_order, read_rows, numeric, categorical) for the combined data,
+    in the same file order as the task chain.
+    """
+    csv_files = [f for f in os.listdir(data_dir) if f.endswith('.csv')]
+
+    def load(path):
+        return load_source(path) if cache is None else cache.load(path, load_source)
+
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        parts = list(pool.map(load, [os.path.join(data_dir, f) for f in csv_files]))
+    if cache is not None:
+        cache.commit(csv_files)
+
+    column_order, read_rows = {}, 0
+    for columns, rows, _, _ in parts:
+        column_order.update(dict.fromkeys(columns))
+        read_rows += rows
+    numeric = {column: np.concatenate([part[2][column] for part in parts]) for column in NUMERIC_COLUMNS}
+    categorical = {
+        column: union_categoricals([part[3][column] for part in parts], sort_categories=True)
+        for column in CATEGORICAL_COLUMNS + ['model']
+    }
+    return list(column_order), read_rows, numeric, categorical
+
+
+def preprocess(data_dir, workers=None, cache=None):
+    """Clean the per-make CSVs in `data_dir` in a single pass.
+
+    Produces the same cleaned frame and fitted FeatureTransformer as the
+    task chain in `data_preprocessing_flow`, but each file is parsed straight
+    into typed columns (float64 numerics, categorical codes) and every
+    cleaning stage only narrows one boolean row mask. The output frame is
+    built once at the end; there is no combined CSV round-trip. Files are
+    loaded by `load_sources` on `workers` threads, through `cache` if given.
+    Fill values, z-score bounds and duplicates are always computed over the
+    full combined data, so a cached run gives exactly the full rebuild's
+    output.
+
+    Returns (cleaned_df, transformer, stage_rows) where stage_rows is a list
+    of (stage, rows remaining) pairs.
+    """
+    column_order, read_rows, numeric, categorical = load_sources(data_dir, workers, cache)
+    n_rows = len(numeric['price'])
+    stage_rows = [('read', read_rows), ('drop_missing', n_rows)]
+
+    # Fill values and vocabularies are learnt before any rows are filtered
+    transformer = FeatureTransformer.fit(pd.DataFrame({
+        'fueltype': categorical['fueltype'],
+        'transmission': categorical['transmission'],
+        'make': categorical['make'],
+        **{column: numeric[column] for column in ['enginesize', 'tax', 'mpg']},
+    }))
+    for column in ['enginesize', 'tax', 'mpg']:
+        values = numeric[column]
+        values[np.isnan(values)] = transformer.fill_values[column]
+    fueltype = categorical['fueltype']
+    codes = fueltype.codes.copy()
+    codes[codes == -1] = fueltype.categories.get_loc(transformer.fill_values['fueltype'])
+    categorical['fueltype'] = pd.Categorical.from_codes(codes, fueltype.categories)
+
+    year, price = numeric['year'], numeric['price']
+    keep = (year >= 1980) & (year <= 2024)
+    stage_rows.append(('unusual_year', int(keep.sum())))
+
+    keep[keep] = np.abs(stats.zscore(price[keep])) < 3
+    keep &= (numeric['mileage'] <= 200000) & (numeric['mpg'] <= 100)
+    stage_rows.append(('outliers', int(keep.sum())))
+
+    # Category codes stand in for the one-hot columns when comparing rows
+    rows = np.flatnonzero(keep)
+    key = pd.DataFrame({column: values[rows] for column, values in numeric.items()})
+    for column, values in categorical.items():
+        key[column] = values.codes[rows]
+    rows = rows[~key.duplicated().to_numpy()]
+    stage_rows.append(('duplicates', len(rows)))
+
+    return encode(column_order, numeric, categorical, rows), transformer, stage_rows
+
+
+def encode(column_order, numeric, categorical, rows):
+    """The cleaned frame for `rows`, as feature_engineering and handle_low_frequency_categories leave it."""
+    # Numeric columns keep the order in which they first appear in the source files
+    cleaned = {column: numeric[column][rows] for column in column_order if column in NUMERIC_COLUMNS}
+    for column in CATEGORICAL_COLUMNS:
+        values = categorical[column]
+        codes = values.codes[rows]
+        # drop_first: the first category has no indicator column
+        for code, category in enumerate(values.categories[1:], start=1):
+            name = f'{column}_{category}'
+            if name not in LOW_FREQUENCY_COLUMNS:
+                cleaned[name] = codes == code
+    return pd.DataFrame(cleaned)
@@ -0,0 +1,235 @@
+import os
+from collections import Counter
+import numpy as np
+import pandas as pd
+from data_store import DatasetWriter
+from feature_transformer import FeatureTransformer, CATEGORICAL_COLUMNS, FILL_COLUMNS
+from preprocessing_engine import encode, read_source, typed_columns
+
+
+class QuantileSketch:
+    """Streaming quantiles of one column in bounded memory.
+
+    Values are kept as sorted, disjoint bins [lo, hi] with counts. While the
+    column has at most `max_bins` distinct values every bin holds a single
+    value and quantiles are exact. Past that, neighbouring bins are merged
+    into max_bins / 2 bins of roughly equal count at the time of the merge;
+    a quantile is then interpolated within its bin, and the true value is
+    guaranteed to lie in the bin's [lo, hi]. Later values that fall inside a
+    merged bin are counted there without splitting it, so a bin's share of
+    the values is not bounded and only the reported [lo, hi] is guaranteed.
+    """
+
+    def __init__(self, max_bins=65536):
+        self.max_bins = max_bins
+        self.lo = np.empty(0)
+        self.hi = np.empty(0)
+        self.counts = np.empty(0, dtype=np.int64)
+
+    @property
+    def n(self):
+        return int(self.counts.sum())
+
+    @property
+    def exact(self):
+        return bool((self.lo == self.hi).all())
+
+    def update(self, values):
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return
+        unique, counts = np.unique(values, return_counts=True)
+        if len(self.lo):
+            # Values that fall inside an existing bin are counted there, keeping bins disjoint
+            bins = np.searchsorted(self.lo, unique, side='right') - 1
+            inside = (bins >= 0) & (unique <= self.hi[np.maximum(bins, 0)])
+            np.add.at(self.counts, bins[inside], counts[inside])
+            unique, counts = unique[~inside], counts[~inside]
+        lo = np.concatenate([self.lo, unique])
+        order = np.argsort(lo, kind='stable')
+        self.lo = lo[order]
+        self.hi = np.concatenate([self.hi, unique])[order]
+        self.counts = np.concatenate([self.counts, counts])[order]
+        if len(self.lo) > self.max_bins:
+            self._compress()
+
+    def _compress(self):
+        before = np.cumsum(self.counts) - self.counts
+        groups = before * (self.max_bins // 2) // self.n
+        starts = np.flatnonzero(np.r_[True, groups[1:] != groups[:-1]])
+        ends = np.r_[starts[1:], len(groups)] - 1
+        self.lo, self.hi = self.lo[starts], self.hi[ends]
+        self.counts = np.add.reduceat(self.counts, starts)
+
+    def _at_rank(self, rank):
+        # (estimate, lo, hi) of the value with 0-based `rank` in sorted order
+        cumulative = np.cumsum(self.counts)
+        i = int(np.searchsorted(cumulative, rank, side='right'))
+        lo, hi = self.lo[i], self.hi[i]
+        offset = (rank - (cumulative[i] - self.counts[i]) + 0.5) / self.counts[i]
+        return lo + (hi - lo) * offset, lo, hi
+
+    def median(self):
+        """Return (estimate, low, high); all three are equal while the sketch is exact."""
+        n = self.n
+        if n == 0:
+            return np.nan, np.nan, np.nan
+        a, b = self._at_rank((n - 1) // 2), self._at_rank(n // 2)
+        return tuple((x + y) / 2 for x, y in zip(a, b))
+
+
+class RunningMoments:
+    # Count, mean and sum of squared deviations, merged chunk by chunk (Chan et al.)
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def update(self, values):
+        n = len(values)
+        if n == 0:
+            return
+        mean = values.mean()
+        m2 = ((values - mean) ** 2).sum()
+        delta = mean - self.mean
+        total = self.count + n
+        self.mean += delta * n / total
+        self.m2 += m2 + delta ** 2 * self.count * n / total
+        self.count = total
+
+    @property
+    def std(self):
+        # Population standard deviation, as used by scipy.stats.zscore
+        return np.sqrt(self.m2 / self.count)
+
+
+class RowHashSet:
+    # 64-bit row hashes in a few sorted runs, merged like a binary counter
+    def __init__(self):
+        self.runs = []
+
+    def __len__(self):
+        return sum(len(run) for run in self.runs)
+
+    def add(self, hashes):
+        # Returns a mask of hashes not seen before (first occurrence only) and remembers them
+        new = np.zeros(len(hashes), dtype=bool)
+        new[np.unique(hashes, return_index=True)[1]] = True
+        for run in self.runs:
+            positions = np.minimum(np.searchsorted(run, hashes), len(run) - 1)
+            new &= run[positions] != hashes
+        run = np.sort(hashes[new])
+        if not len(run):
+            return new
+        while self.runs and len(self.runs[-1]) <= len(run):
+            run = np.sort(np.concatenate([self.runs.pop(), run]))
+        self.runs.append(run)
+        return new
+
+
+def _chunks(data_dir, chunk_size):
+    for file in [f for f in os.listdir(data_dir) if f.endswith('.csv')]:
+        for chunk in read_source(os.path.join(data_dir, file), chunksize=chunk_size):
+            yield typed_columns(chunk, file)
+
+
+def collect_statistics(data_dir, chunk_size=100000, max_bins=65536):
+    """First pass: the global statistics the cleaning stages need.
+
+    Returns (column_order, stage_rows, transformer, sketches, price_moments).
+    """
+    column_order, read_rows, rows = {}, 0, 0
+    vocabularies = {column: set() for column in CATEGORICAL_COLUMNS}
+    fueltype_counts = Counter()
+    sketches = {column: QuantileSketch(max_bins) for column in FILL_COLUMNS}
+    price_moments = RunningMoments()
+
+    for columns, chunk_read_rows, numeric, categorical in _chunks(data_dir, chunk_size):
+        column_order.update(dict.fromkeys(columns))
+        read_rows += chunk_read_rows
+        rows += len(numeric['price'])
+        for column in FILL_COLUMNS:
+            sketches[column].update(numeric[column])
+        for column in CATEGORICAL_COLUMNS:
+            vocabularies[column].update(categorical[column].categories)
+        fueltype_counts.update(pd.Series(categorical['fueltype']).value_counts().to_dict())
+        # The price z-score is taken over rows that pass the year filter
+        year = numeric['year']
+        price_moments.update(numeric['price'][(year >= 1980) & (year <= 2024)])
+
+    # Ties for the mode go to the first value in sorted order, as with Series.mode
+    top = max(fueltype_counts.values())
+    fill_values = {'fueltype': min(value for value, count in fueltype_counts.items() if count == top)}
+    for column in FILL_COLUMNS:
+        fill_values[column] = float(sketches[column].median()[0])
+    vocabularies['fueltype'].add(fill_values['fueltype'])
+    transformer = FeatureTransformer([], fill_values, {column: sorted(values) for column, values in vocabularies.items()})
+    return list(column_order), [('read', read_rows), ('drop_missing', rows)], transformer, sketches, price_moments
+
+
+def stream_preprocess(data_dir, output_path, chunk_size=100000, export_csv=False, max_bins=65536):
+    """Clean the per-make CSVs in `data_dir` out of core, in two passes.
+
+    The first pass (`collect_statistics`) streams every file once for the
+    fueltype mode, the enginesize/tax/mpg medians, the category vocabularies
+    and the mean and standard deviation of price. The second pass streams
+    the files again, cleans and encodes each chunk like `preprocess`, drops
+    rows already seen and writes the chunk with a DatasetWriter. Memory is
+    bounded by the chunk size plus the sketches (at most `max_bins` bins per
+    column) and 8 bytes per cleaned row for the duplicate check.
+
+    Accuracy against the in-memory `preprocess`:
+    - the mode, the vocabularies and the row filters are exact;
+    - medians are exact while a column has at most `max_bins` distinct
+      values (enginesize, tax and mpg have a few hundred); past that they
+      are approximate, within the bounds the sketch reports;
+    - price mean and standard deviation are merged per chunk in float64 and
+      differ from the two-pass scipy.stats.zscore by rounding only (about
+      1e-12 relative), so only a price within that distance of the
+      |z| = 3 cut could be classified differently;
+    - duplicates are found by 64-bit row hashes; a false duplicate needs a
+      hash collision, with probability about n^2 / 2^65 for n cleaned rows.
+
+    Returns (transformer, stage_rows, medians) where medians maps each fill
+    column to its (estimate, low, high) median.
+    """
+    column_order, stage_rows, transformer, sketches, price_moments = collect_statistics(data_dir, chunk_size, max_bins)
+    fill_values, vocabularies = transformer.fill_values, transformer.vocabularies
+    price_mean, price_std = price_moments.mean, price_moments.std
+
+    writer = DatasetWriter(output_path, export_csv=export_csv)
+    seen = RowHashSet()
+    counts = {'unusual_year': 0, 'outliers': 0, 'duplicates': 0}
+    feature_columns = None
+    for _, _, numeric, categorical in _chunks(data_dir, chunk_size):
+        for column in FILL_COLUMNS:
+            # Chunk columns can be read-only views of the parsed frame, so fill into a new array
+            numeric[column] = np.where(np.isnan(numeric[column]), fill_values[column], numeric[column])
+        # Fixed categories, so the one-hot columns and row hashes agree across chunks
+        for column in CATEGORICAL_COLUMNS:
+            categorical[column] = pd.Categorical(categorical[column], categories=vocabularies[column])
+        codes = categorical['fueltype'].codes.copy()
+        codes[codes == -1] = vocabularies['fueltype'].index(fill_values['fueltype'])
+        categorical['fueltype'] = pd.Categorical.from_codes(codes, vocabularies['fueltype'])
+
+        year, price = numeric['year'], numeric['price']
+        keep = (year >= 1980) & (year <= 2024)
+        counts['unusual_year'] += int(keep.sum())
+        keep &= np.abs((price - price_mean) / price_std) < 3
+        keep &= (numeric['mileage'] <= 200000) & (numeric['mpg'] <= 100)
+        counts['outliers'] += int(keep.sum())
+
+        rows = np.flatnonzero(keep)
+        key = pd.DataFrame({column: values[rows] for column, values in numeric.items()})
+        for column, values in categorical.items():
+            key[column] = values[rows]
+        rows = rows[seen.add(pd.util.hash_pandas_object(key, index=False).to_numpy())]
+        counts['duplicates'] += len(rows)
+
+        cleaned = encode(column_order, numeric, categorical, rows)
+        feature_columns = [column for column in cleaned.columns if column != 'price']
+        writer.write(cleaned)
+
+    stage_rows += list(counts.items())
+    medians = {column: sketch.median() for column, sketch in sketches.items()}
+    return transformer.with_feature_columns(feature_columns or []), stage_rows, medians
@@ -0,0 +1,255 @@
+import os
+import sys
+import time
+import functools
+import threading
+import contextlib
+from collections import Counter
+import numpy as np
+import pandas as pd
+import mlflow
+
+# Per-task measurements in the report; each is logged to MLflow as <task>.<measurement>
+MEASUREMENTS = ['wall_seconds', 'cpu_seconds', 'peak_rss_delta_bytes', 'input_rows', 'input_columns',
+                'output_rows', 'output_columns']
+
+# The TaskProfiler collecting task runs, set while one is active
+_active = None
+
+
+def _shape(value):
+    if isinstance(value, pd.DataFrame):
+        return value.shape
+    if isinstance(value, pd.Series):
+        return len(value), 1
+    if isinstance(value, np.ndarray) and value.ndim:
+        return value.shape[0], value.shape[1] if value.ndim > 1 else 1
+    return None
+
+
+def frame_shape(values):
+    # (rows, columns) of the largest DataFrame, Series or array among values, looking one level into
+    # tuples, lists and dicts; (None, None) when there is none
+    shapes = []
+    for value in values:
+        items = value.values() if isinstance(value, dict) else value if isinstance(value, (tuple, list)) else [value]
+        shapes.extend(shape for shape in map(_shape, items) if shape is not None)
+    if not shapes:
+        return None, None
+    return max(shapes, key=lambda shape: shape[0] * max(shape[1], 1))
+
+
+def _reset_peak_rss():
+    # Linux: writing 5 to clear_refs resets the process's peak RSS (VmHWM) to its current RSS
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def _rss_bytes(field='VmRSS'):
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith(field + ':'):
+                return int(line.split()[1]) * 1024
+    return None
+
+
+def _collapse(frame):
+    # One stack in the folded format, outermost frame first
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+        frame = frame.f_back
+    return ';'.join(reversed(names))
+
+
+class TaskProfiler:
+    """Measure every `profiled` task that runs while the profiler is active.
+
+    Each run records its wall time, the process CPU time, the peak RSS
+    above the RSS at the start (Linux only, None elsewhere) and the rows
+    and columns of the largest DataFrame or array among its arguments and
+    its return value. CPU time and memory are process-wide, which matches
+    the flows here, where tasks run one at a time. With `sample_slowest`,
+    a background thread samples the stack of each running task every
+    `sample_interval` seconds, and the samples of the slowest task are kept
+    for `folded_stacks`.
+    """
+
+    def __init__(self, sample_slowest=True, sample_interval=0.01):
+        self.sample_slowest = sample_slowest
+        self.sample_interval = sample_interval
+        self.records = []
+        self.wall_seconds = None
+        self._lock = threading.Lock()
+        self._running = {}
+        # Per thread: the highest peak RSS reached by tasks nested in the innermost running task
+        self._nested = threading.local()
+        self._slowest = None
+        self._stop = threading.Event()
+        self._sampler = None
+        self._start = None
+
+    def __enter__(self):
+        global _active  # pylint: disable=global-statement
+        if _active is not None:
+            raise RuntimeError("Another TaskProfiler is already active")
+        _active = self
+        if self.sample_slowest:
+            self._sampler = threading.Thread(target=self._sample, daemon=True)
+            self._sampler.start()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        global _active  # pylint: disable=global-statement
+        self.wall_seconds = time.perf_counter() - self._start
+        _active = None
+        if self._sampler is not None:
+            self._stop.set()
+            self._sampler.join()
+
+    def run(self, name, fn, args, kwargs):
+        thread_id = threading.get_ident()
+        input_rows, input_columns = frame_shape([*args, *kwargs.values()])
+        # Resetting the peak wipes the one of a task this run is nested in, so it is saved first
+        # and handed back to that task on return
+        outer_nested_peak = getattr(self._nested, 'peak', None)
+        peak_before = _rss_bytes('VmHWM') if outer_nested_peak is not None else None
+        peak_tracked = _reset_peak_rss()
+        rss_before = _rss_bytes() if peak_tracked else None
+        self._nested.peak = 0 if peak_tracked else None
+        samples = Counter()
+        with self._lock:
+            outer_samples = self._running.get(thread_id)
+            self._running[thread_id] = samples
+        cpu_start = time.process_time()
+        start = time.perf_counter()
+        try:
+            result = fn(*args, **kwargs)
+        finally:
+            wall_seconds = time.perf_counter() - start
+            cpu_seconds = time.process_time() - cpu_start
+            peak = max(_rss_bytes('VmHWM'), self._nested.peak) if peak_tracked else None
+            if outer_nested_peak is not None:
+                outer_nested_peak = max(outer_nested_peak, peak_before, peak)
+            self._nested.peak = outer_nested_peak
+            with self._lock:
+                # A task called from another task hands the thread back to the outer one
+                if outer_samples is None:
+                    del self._running[thread_id]
+                else:
+                    self._running[thread_id] = outer_samples
+        output_rows, output_columns = frame_shape([result])
+        record = {
+            'task': name,
+            'wall_seconds': wall_seconds,
+            'cpu_seconds': cpu_seconds,
+            'peak_rss_delta_bytes': max(peak - rss_before, 0) if peak_tracked else None,
+            'input_rows': input_rows,
+            'input_columns': input_columns,
+            'output_rows': output_rows,
+            'output_columns': output_columns,
+        }
+        with self._lock:
+            self.records.append(record)
+            if self.sample_slowest and (self._slowest is None or wall_seconds > self._slowest[0]):
+                self._slowest = (wall_seconds, name, samples)
+        return result
+
+    def _sample(self):
+        while not self._stop.wait(self.sample_interval):
+            frames = sys._current_frames()  # pylint: disable=protected-access
+            with self._lock:
+                running = list(self._running.items())
+            for thread_id, samples in running:
+                frame = frames.get(thread_id)
+                if frame is not None:
+                    samples[_collapse(frame)] += 1
+
+    def report(self):
+        # Call after the profiler has exited
+        slowest = max(self.records, key=lambda record: record['wall_seconds'], default=None)
+        sampled = None
+        if self._slowest is not None:
+            sampled = {'task': self._slowest[1], 'interval_seconds': self.sample_interval,
+                       'samples': sum(self._slowest[2].values())}
+        return {
+            'wall_seconds': self.wall_seconds,
+            'tasks': list(self.records),
+            'slowest_task': slowest['task'] if slowest else None,
+            'sampled_profile': sampled,
+        }
+
+    def folded_stacks(self):
+        # Samples of the slowest task as 'frame;frame;... count' lines, the input of flamegraph.pl and speedscope
+        if self._slowest is None:
+            return ''
+        return ''.join(f"{stack} {count}\n" for stack, count in self._slowest[2].most_common())
+
+
+def profiled(fn):
+    # Record fn's runs in the active TaskProfiler; with none active fn is called directly
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        profiler = _active
+        if profiler is None:
+            return fn(*args, **kwargs)
+        return profiler.run(fn.__name__, fn, args, kwargs)
+
+    return wrapper
+
+
+def format_report(report):
+    # The tasks as a text table, slowest first
+    lines = [f"{'task':32s} {'wall s':>8s} {'cpu s':>8s} {'peak RSS MB':>12s} {'rows in':>9s} {'rows out':>9s}"]
+    for record in sorted(report['tasks'], key=lambda record: -record['wall_seconds']):
+        rss = record['peak_rss_delta_bytes']
+        lines.append(f"{record['task']:32s} {record['wall_seconds']:8.2f} {record['cpu_seconds']:8.2f} "
+                     f"{'-' if rss is None else f'{rss / 2 ** 20:.1f}':>12s} "
+                     f"{'-' if record['input_rows'] is None else record['input_rows']:>9} "
+                     f"{'-' if record['output_rows'] is None else record['output_rows']:>9}")
+    lines.append(f"total wall time {report['wall_seconds']:.2f}s")
+    return '\n'.join(lines)
+
+
+def log_report(profiler, run_name='task_profile'):
+    # One MLflow run with a <task>.<measurement> metric per task, the JSON report and the slowest task's stacks
+    report = profiler.report()
+    metrics = {'wall_seconds': report['wall_seconds']}
+    runs = Counter()
+    for record in report['tasks']:
+        runs[record['task']] += 1
+        key = record['task'] if runs[record['task']] == 1 else f"{record['task']}_{runs[record['task']]}"
+        metrics.update({f"{key}.{measurement}": record[measurement] for measurement in MEASUREMENTS
+                        if record[measurement] is not None})
+    with mlflow.start_run(run_name=run_name, nested=mlflow.active_run() is not None) as run:
+        mlflow.log_metrics(metrics)
+        mlflow.log_dict(report, 'task_profile/report.json')
+        if report['sampled_profile'] is not None:
+            mlflow.set_tag('slowest_task', report['sampled_profile']['task'])
+            mlflow.log_text(profiler.folded_stacks(), 'task_profile/slowest_task.folded')
+    return run.info.run_id
+
+
+@contextlib.contextmanager
+def profiling(enabled, run_name, setup=None, sample_slowest=True):
+    """Profile the tasks run in the block, then print the report and log it to MLflow.
+
+    Does nothing unless `enabled`, or when an enclosing block is already
+    profiling (main_flow around its subflows). `setup` is called before
+    logging, to point MLflow at the tracking server.
+    """
+    if not enabled or _active is not None:
+        yield None
+        return
+    with TaskProfiler(sample_slowest=sample_slowest) as profiler:
+        yield profiler
+    print(format_report(profiler.report()))
+    if setup is not None:
+        setup()
+    log_report(profiler, run_name)
@@ -0,0 +1,128 @@
+import json
+import numpy as np
+
+# Objectives whose prediction is the raw sum of leaf values plus base_score
+IDENTITY_OBJECTIVES = ('reg:squarederror', 'reg:linear', 'reg:absoluteerror', 'reg:pseudohubererror')
+
+
+def export_booster(booster, path):
+    """Flatten a trained XGBoost booster into array-backed node tables.
+
+    All trees are concatenated into one set of arrays (feature index,
+    threshold, left/right child, default direction, leaf value) and saved
+    with `np.savez_compressed`. Leaves point to themselves so traversal can
+    run a fixed number of steps without branching.
+    """
+    learner = json.loads(booster.save_raw('json'))['learner']
+    objective = learner['objective']['name']
+    if objective not in IDENTITY_OBJECTIVES:
+        raise ValueError(f"Unsupported objective for NumPy export: {objective}")
+
+    trees = learner['gradient_booster']['model']['trees']
+    feature, threshold, left, right, default_left, value, roots = [], [], [], [], [], [], []
+    max_depth = 0
+    offset = 0
+    for tree in trees:
+        if any(tree['split_type']):
+            raise ValueError("Categorical splits are not supported by the NumPy evaluator")
+        tree_left = np.asarray(tree['left_children'], dtype=np.int64)
+        tree_right = np.asarray(tree['right_children'], dtype=np.int64)
+        split_conditions = np.asarray(tree['split_conditions'], dtype=np.float32)
+        nodes = np.arange(len(tree_left))
+        is_leaf = tree_left == -1
+
+        feature.append(np.where(is_leaf, 0, tree['split_indices']))
+        threshold.append(np.where(is_leaf, 0, split_conditions))
+        left.append(np.where(is_leaf, nodes, tree_left) + offset)
+        right.append(np.where(is_leaf, nodes, tree_right) + offset)
+        default_left.append(np.asarray(tree['default_left'], dtype=bool))
+        value.append(np.where(is_leaf, split_conditions, 0))
+        roots.append(offset)
+        max_depth = max(max_depth, _tree_depth(tree_left, tree_right))
+        offset += len(tree_left)
+
+    base_score = float(learner['learner_model_param']['base_score'].strip('[]'))
+    np.savez_compressed(
+        path,
+        feature=np.concatenate(feature).astype(np.int32),
+        threshold=np.concatenate(threshold).astype(np.float32),
+        left=np.concatenate(left).astype(np.int32),
+        right=np.concatenate(right).astype(np.int32),
+        default_left=np.concatenate(default_left),
+        value=np.concatenate(value).astype(np.float32),
+        roots=np.asarray(roots, dtype=np.int32),
+        max_depth=np.int32(max_depth),
+        base_score=np.float64(base_score),
+        feature_names=np.asarray(learner.get('feature_names') or [], dtype=str),
+    )
+
+
+def _tree_depth(left, right):
+    depth = {0: 0}
+    for node in range(len(left)):
+        if left[node] != -1:
+            depth[left[node]] = depth[right[node]] = depth[node] + 1
+    return max(depth.values())
+
+
+class TreeEnsemble:
+    """Score batches with a tree ensemble exported by `export_booster`.
+
+    Needs only NumPy: every row walks every tree in lock-step, one level per
+    iteration, so a batch is scored with `max_depth` vectorized steps.
+    """
+
+    def __init__(self, feature, threshold, left, right, default_left, value, roots,
+                 max_depth, base_score, feature_names=(), chunk_size=256):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.default_left = default_left
+        self.value = value
+        self.roots = roots
+        self.max_depth = int(max_depth)
+        self.base_score = float(base_score)
+        self.feature_names = list(feature_names)
+        self.chunk_size = chunk_size
+        # Interleave children so the next node is children[2 * node + go_right]
+        self.children = np.stack([left, right], axis=1).ravel()
+
+    @classmethod
+    def load(cls, path, chunk_size=256):
+        with np.load(path) as tables:
+            return cls(**{name: tables[name] for name in tables.files}, chunk_size=chunk_size)
+
+    def _predict_chunk(self, X):
+        offsets = (np.arange(len(X)) * X.shape[1])[:, None]
+        flat = X.ravel()
+        node = np.broadcast_to(self.roots, (len(X), len(self.roots)))
+        for _ in range(self.max_depth):
+            x = flat[offsets + self.feature[node]]
+            go_right = x >= self.threshold[node]
+            missing = np.isnan(x)
+            if missing.any():
+                # Missing values follow the default direction of the split
+                go_right |= missing & ~self.default_left[node]
+            node = self.children[2 * node + go_right]
+        return self.value[node].sum(axis=1, dtype=np.float64) + self.base_score
+
+    def predict(self, X):
+        if hasattr(X, 'to_numpy'):
+            X = X[self.feature_names] if self.feature_names else X
+            X = X.to_numpy(dtype=np.float32)
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        predictions = np.empty(len(X))
+        for start in range(0, len(X), self.chunk_size):
+            predictions[start:start + self.chunk_size] = self._predict_chunk(X[start:start + self.chunk_size])
+        return predictions
+
+    def predict_records(self, records):
+        try:
+            matrix = [[car_data[name] for name in self.feature_names] for car_data in records]
+        except KeyError as e:
+            raise ValueError(f"Missing feature: {e.args[0]}") from e
+        return self.predict(np.array(matrix, dtype=np.float32).reshape(len(records), len(self.feature_names)))
+
+    def predict_record(self, car_data):
+        return float(self.predict_records([car_data])[0])
@@ -5,6 +5,7 @@ import pandas as pd
 import os
 import numpy as np
 from prefect import flow, task
+from prefect.artifacts import create_table_artifact
 from scipy import stats
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
@@ -12,6 +13,22 @@ import xgboost as xgb
 from sklearn.metrics import mean_absolute_error, r2_score, mean_squared_error
 import mlflow
 import mlflow.xgboost
+from mlflow.entities import Metric, Param
+from mlflow.exceptions import MlflowException
+from mlflow.tracking import MlflowClient
+import tempfile
+import time
+from tree_ensemble import export_booster
+from feature_transformer import FeatureTransformer
+from preprocessing_engine import preprocess
+from partition_cache import PartitionCache
+from streaming_preprocessing import stream_preprocess
+from hyperparameter_search import successive_halving
+from incremental_training import incremental_retrain, row_fingerprints
+from cross_validation import cross_validate
+from drift_statistics import ReferenceStatistics
+from task_profiling import profiled, profiling
+from data_store import TARGET_COLUMN, csv_path, feature_frame, open_feature_matrix, parquet_path, read_dataset, write_dataset
 
 # --- Data Preprocessing and Cleaning Tasks ---
 
@@ -29,11 +46,16 @@ def clean_data(df):
         df['tax_'] = df['tax_'].replace('[£,]', '', regex=True).astype(float)
     return df
 
+def feature_transformer_path(cleaned_output_file):
+    # The fitted transformer is stored next to the cleaned dataset
+    return os.path.join(os.path.dirname(cleaned_output_file), 'feature_transformer.json')
+
 # Define a function to extract make from filename
 def extract_make(filename):
     return filename.split('.')[0]
 
 @task
+@profiled
 def load_and_process_datasets(data_dir):
     csv_files = [f for f in os.listdir(data_dir) if f.endswith('.csv')]
     dataframes = {}
@@ -52,28 +74,39 @@ def load_and_process_datasets(data_dir):
     return dataframes
 
 @task
+@profiled
 def combine_datasets(dataframes):
     combined_df = pd.concat(dataframes.values(), ignore_index=True)
     return combined_df
 
 @task
+@profiled
 def drop_redundant_columns(df):
     columns_to_drop = ['tax()', 'fuel_type', 'engine_size', 'mileage2', 'fuel_type2', 'engine_size2', 'reference']
     df = df.drop(columns=columns_to_drop, errors='ignore')
     return df
 
 @task
+@profiled
 def handle_unclean_categories(df):
     make_mapping = {'unclean focus': 'focus', 'unclean cclass': 'cclass'}
     df['make'] = df['make'].replace(make_mapping)
     return df
 
 @task
+@profiled
 def convert_mileage(df):
     df['mileage'] = df['mileage'].replace('[\D]', '', regex=True).astype(float)
     return df
 
 @task
+@profiled
+def fit_feature_transformer(df):
+    # Learn the fill values and category vocabularies used for serving raw listings
+    return FeatureTransformer.fit(df)
+
+@task
+@profiled
 def handle_missing_values(df):
     df['fueltype'] = df['fueltype'].fillna(df['fueltype'].mode()[0])
     df['enginesize'] = df['enginesize'].fillna(df['enginesize'].median())
@@ -82,16 +115,19 @@ def handle_missing_values(df):
     return df
 
 @task
+@profiled
 def feature_engineering(df):
     df = pd.get_dummies(df, columns=['make', 'transmission', 'fueltype'], drop_first=True)
     return df
 
 @task
+@profiled
 def handle_unusual_year_values(df):
     df = df[df['year'].between(1980, 2024)]
     return df
 
 @task
+@profiled
 def handle_outliers(df):
     z_scores = np.abs(stats.zscore(df['price'].dropna()))
     df = df[(z_scores < 3)]
@@ -100,42 +136,103 @@ def handle_outliers(df):
     return df
 
 @task
+@profiled
 def drop_duplicates(df):
     df = df.drop_duplicates()
     return df
 
 @task
+@profiled
 def handle_low_frequency_categories(df):
     df_cleaned = df.drop(columns=['transmission_Other', 'fueltype_Electric', 'fueltype_Other', 'model'], errors='ignore')
     return df_cleaned
 
+@task(log_prints=True)
+@profiled
+def fused_preprocessing(data_dir, workers=None, partition_cache_dir=None):
+    # All of the cleaning tasks above in one pass over typed columns; source files load on `workers` threads
+    cache = PartitionCache(partition_cache_dir) if partition_cache_dir else None
+    df, transformer, stage_rows = preprocess(data_dir, workers, cache)
+    if cache is not None:
+        stats = cache.stats()
+        print(f"Partition cache: {stats['hits']} unchanged, {stats['misses']} rebuilt")
+    for stage, rows in stage_rows:
+        print(f"{stage}: {rows} rows")
+    create_table_artifact(
+        key='preprocessing-row-counts',
+        table=[{'stage': stage, 'rows': rows} for stage, rows in stage_rows],
+        description='Rows remaining after each preprocessing stage',
+    )
+    return df, transformer
+
+@task(log_prints=True)
+@profiled
+def streaming_preprocessing(data_dir, cleaned_output_file, chunk_size=100000, export_csv=True):
+    # Two passes over the source files in chunks of `chunk_size` rows; the cleaned data never sits in memory
+    transformer, stage_rows, medians = stream_preprocess(data_dir, cleaned_output_file, chunk_size, export_csv)
+    for column, (median, low, high) in medians.items():
+        print(f"{column} median: {median}" + ('' if low == high else f" (true median within [{low}, {high}])"))
+    for stage, rows in stage_rows:
+        print(f"{stage}: {rows} rows")
+    create_table_artifact(
+        key='preprocessing-row-counts',
+        table=[{'stage': stage, 'rows': rows} for stage, rows in stage_rows],
+        description='Rows remaining after each preprocessing stage',
+    )
+    return transformer
+
 @flow
-def data_preprocessing_flow(data_dir, combined_output_file, cleaned_output_file):
-    # Load, standardize, and clean datasets
-    dataframes = load_and_process_datasets(data_dir)
-    combined_df = combine_datasets(dataframes)
-    combined_df.to_csv(combined_output_file, index=False)
-    print(f"Combined dataset saved to '{combined_output_file}'.")
-
-    # Further clean and process the combined dataset
-    df = pd.read_csv(combined_output_file)
-    df = drop_redundant_columns(df)
-    df = handle_unclean_categories(df)
-    df = convert_mileage(df)
-    df = handle_missing_values(df)
-    df = feature_engineering(df)
-    df = handle_unusual_year_values(df)
-    df = handle_outliers(df)
-    df = drop_duplicates(df)
-    df = handle_low_frequency_categories(df)
-
-    # Save the cleaned DataFrame to a CSV file
-    df.to_csv(cleaned_output_file, index=False)
-    print(f"Cleaned dataset saved to '{cleaned_output_file}'.")
+def data_preprocessing_flow(data_dir, combined_output_file, cleaned_output_file, engine='fused', export_csv=True,
+                            partition_cache_dir=None, chunk_size=100000, profile=False):
+    # profile: time every task and log the report to MLflow (see task_profiling.py)
+    with profiling(profile, 'data_preprocessing_profile', setup=setup_mlflow.fn):
+        if engine == 'streaming':
+            # For data larger than memory: the cleaned dataset is written as a directory of Parquet parts,
+            # without the memory-mappable feature matrix
+            transformer = streaming_preprocessing(data_dir, cleaned_output_file, chunk_size, export_csv)
+            print(f"Cleaned dataset saved to '{parquet_path(cleaned_output_file)}'.")
+            transformer.save(feature_transformer_path(cleaned_output_file))
+            return
+        if engine == 'fused':
+            # The combined CSV is only written by the task chain; with a partition cache only changed files are reparsed
+            df, transformer = fused_preprocessing(data_dir, partition_cache_dir=partition_cache_dir)
+        elif engine == 'tasks':
+            # Load, standardize, and clean datasets
+            dataframes = load_and_process_datasets(data_dir)
+            combined_df = combine_datasets(dataframes)
+            combined_df.to_csv(combined_output_file, index=False)
+            print(f"Combined dataset saved to '{combined_output_file}'.")
+
+            # Further clean and process the combined dataset
+            df = pd.read_csv(combined_output_file)
+            df = drop_redundant_columns(df)
+            df = handle_unclean_categories(df)
+            df = convert_mileage(df)
+            transformer = fit_feature_transformer(df)
+            df = handle_missing_values(df)
+            df = feature_engineering(df)
+            df = handle_unusual_year_values(df)
+            df = handle_outliers(df)
+            df = drop_duplicates(df)
+            df = handle_low_frequency_categories(df)
+        else:
+            raise ValueError(f"Unknown preprocessing engine '{engine}'")
+
+        # Save the cleaned DataFrame as Parquet with a memory-mappable feature matrix
+        dataset_path = write_dataset(df, cleaned_output_file)
+        print(f"Cleaned dataset saved to '{dataset_path}'.")
+        if export_csv:
+            df.to_csv(csv_path(cleaned_output_file), index=False)
+            print(f"Cleaned dataset exported to '{csv_path(cleaned_output_file)}'.")
+
+        # Save the fitted feature transformer with the final feature column order
+        transformer = transformer.with_feature_columns([col for col in df.columns if col != 'price'])
+        transformer.save(feature_transformer_path(cleaned_output_file))
 
 # --- Model Training Tasks ---
 
 @task
+@profiled
 def setup_mlflow():
     # Set AWS credentials as environment variables
     from dotenv import load_dotenv
@@ -146,15 +243,30 @@ def setup_mlflow():
     mlflow.set_tracking_uri(f"http://{EC2_PUBLIC_DNS}:5000")
     mlflow.set_experiment("xgboost_optimized_model")
 
+def compact_features(df):
+    # XGBoost trains on float32 values, so float64 columns are halved with no change to the model;
+    # one-hot indicators stay bool (one byte each)
+    return df.astype({column: np.float32 for column, dtype in df.dtypes.items() if dtype == np.float64})
+
 @task
-def load_and_prepare_data(data_path):
-    cleaned_df = pd.read_csv(data_path)
-    X = cleaned_df.drop(columns=['price'])
-    y = cleaned_df['price']
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-    return X_train, X_test, y_train, y_test
+@profiled
+def load_and_prepare_data(data_path, memory_map=False):
+    # Features and target come back in the compact training layout (see compact_features)
+    if memory_map:
+        # Split row indices, so only the selected rows are copied out of the mapped matrix
+        X, y, columns, dtypes = open_feature_matrix(data_path)
+        train_idx, test_idx = train_test_split(np.arange(len(y)), test_size=0.2, random_state=42)
+        X_train, X_test = (compact_features(feature_frame(X[idx], columns, dtypes)) for idx in (train_idx, test_idx))
+        y_train, y_test = (pd.Series(y[idx], name=TARGET_COLUMN, dtype=np.float32) for idx in (train_idx, test_idx))
+        return X_train, X_test, y_train, y_test
+    cleaned_df = compact_features(read_dataset(data_path))
+    y = cleaned_df.pop(TARGET_COLUMN)
+    # Split positions rather than frames, so the full frame is not copied before it is released
+    train_idx, test_idx = train_test_split(np.arange(len(y)), test_size=0.2, random_state=42)
+    return cleaned_df.iloc[train_idx], cleaned_df.iloc[test_idx], y.iloc[train_idx], y.iloc[test_idx]
 
 @task
+@profiled
 def get_optimized_params():
     params = {
         'learning_rate': 0.09455111298980684,
@@ -168,44 +280,221 @@ def get_optimized_params():
     return params
 
 @task(log_prints=True)
-def train_and_log_model(X_train, X_test, y_train, y_test, params):
+@profiled
+def tune_hyperparameters(X_train, y_train, n_trials=27, workers=None, min_rounds=50, max_rounds=1000):
+    # Successive halving search on a process pool; every trial is logged as a nested run of one search run
+    start = time.perf_counter()
+    best_params, trials = successive_halving(X_train, y_train, n_trials, min_rounds, max_rounds, workers=workers)
+    search_seconds = time.perf_counter() - start
+    client = MlflowClient()
+    with mlflow.start_run(run_name='hyperparameter_search'):
+        mlflow.log_params({'n_trials': n_trials, 'workers': workers or os.cpu_count(),
+                           'min_rounds': min_rounds, 'max_rounds': max_rounds})
+        mlflow.log_metrics({'search_seconds': search_seconds,
+                            'best_validation_rmse': min(min(trial['rmse']) for trial in trials)})
+        for i, trial in enumerate(trials):
+            with mlflow.start_run(run_name=f'trial-{i}', nested=True) as run:
+                # One log_batch request per trial for its parameters and per-round validation RMSE,
+                # rather than a round trip to the tracking server per round
+                timestamp = int(time.time() * 1000)
+                client.log_batch(
+                    run.info.run_id,
+                    metrics=[Metric('validation_rmse', rmse, timestamp, step)
+                             for step, rmse in enumerate(trial['rmse'], start=1)],
+                    params=[Param(key, str(value)) for key, value in dict(trial['params'], rounds=trial['rounds']).items()])
+    print(f"Searched {n_trials} trials in {search_seconds:.1f}s; best parameters: {best_params}")
+    return best_params
+
+# Held-out share of the training rows that early stopping is scored on
+VALIDATION_SIZE = 0.1
+EARLY_STOPPING_ROUNDS = 20
+
+def hist_params(params, nthread=None):
+    # The same parameters on the histogram tree method; n_estimators becomes the cap for early stopping
+    return dict(params, tree_method='hist', nthread=nthread or os.cpu_count())
+
+def uses_hist(params):
+    # XGBoost 2.0 made hist the default tree method
+    tree_method = params.get('tree_method')
+    return tree_method == 'hist' or (tree_method in (None, 'auto') and int(xgb.__version__.split('.')[0]) >= 2)
+
+def fit_booster(X_train, y_train, params, early_stopping_rounds=None):
+    """Train a booster from the compact frames, as XGBRegressor(**params).fit would.
+
+    The frames go straight into a QuantileDMatrix (about one byte per value
+    for the hist tree method) or, for other tree methods, a DMatrix; XGBoost
+    reads the pandas columns in place. With `early_stopping_rounds`,
+    VALIDATION_SIZE of the training rows are held out, training stops once
+    their eval metric has not improved for that many rounds, and the booster
+    is cut back to the best round.
+    """
+    params = dict(params)
+    num_boost_round = params.pop('n_estimators', 100)
+    matrix = xgb.QuantileDMatrix if uses_hist(params) else xgb.DMatrix
+    if not early_stopping_rounds:
+        return xgb.train(params, matrix(X_train, label=y_train), num_boost_round=num_boost_round)
+
+    fit_idx, valid_idx = train_test_split(np.arange(len(y_train)), test_size=VALIDATION_SIZE, random_state=42)
+    dtrain = matrix(X_train.iloc[fit_idx], label=y_train.iloc[fit_idx])
+    # A QuantileDMatrix validation set must share the training set's bins
+    dvalid = (xgb.QuantileDMatrix(X_train.iloc[valid_idx], label=y_train.iloc[valid_idx], ref=dtrain)
+              if matrix is xgb.QuantileDMatrix else xgb.DMatrix(X_train.iloc[valid_idx], label=y_train.iloc[valid_idx]))
+    booster = xgb.train(params, dtrain, num_boost_round=num_boost_round, evals=[(dvalid, 'validation')],
+                        early_stopping_rounds=early_stopping_rounds, verbose_eval=False)
+    return booster[:booster.best_iteration + 1]
+
+def serving_example(X):
+    # The first row with float64 numerics, as the web service and monitoring send them
+    return X[:1].astype({column: np.float64 for column, dtype in X.dtypes.items() if dtype == np.float32})
+
+@task(log_prints=True)
+@profiled
+def train_and_log_model(X_train, X_test, y_train, y_test, params, transformer_path=None, early_stopping_rounds=None,
+                        warm_start=None):
+    # warm_start: (prior run id, its booster, its training row fingerprints, incremental_retrain keyword arguments)
     with mlflow.start_run():
-        model = xgb.XGBRegressor(**params)
-        model.fit(X_train, y_train)
-        y_pred = model.predict(X_test)
-        rmse = mean_squared_error(y_test, y_pred, squared=False)
+        start = time.perf_counter()
+        if warm_start is None:
+            model, training_path = fit_booster(X_train, y_train, params, early_stopping_rounds), 'full'
+        else:
+            prior_run_id, prior_booster, seen_rows, options = warm_start
+            model, training_path, report = incremental_retrain(
+                prior_booster, seen_rows, X_train, y_train, X_test, y_test, params,
+                lambda: fit_booster(X_train, y_train, params, early_stopping_rounds), **options)
+            mlflow.log_params({'warm_start_run_id': prior_run_id, **{f'warm_start_{key}': value for key, value in options.items()},
+                               **{key: value for key, value in report.items() if isinstance(value, str)}})
+            mlflow.log_metrics({key: value for key, value in report.items() if not isinstance(value, str)})
+            print(f"Incremental retraining: {report}")
+        train_seconds = time.perf_counter() - start
+        y_pred = model.predict(xgb.DMatrix(X_test))
+        rmse = np.sqrt(mean_squared_error(y_test, y_pred))
         mae = mean_absolute_error(y_test, y_pred)
         r2 = r2_score(y_test, y_pred)
         mlflow.log_params(params)
+        if early_stopping_rounds:
+            mlflow.log_param("early_stopping_rounds", early_stopping_rounds)
+        mlflow.log_param("training_path", training_path)
+        mlflow.log_metric("boosting_rounds", model.num_boosted_rounds())
+        mlflow.log_metric("train_seconds", train_seconds)
         mlflow.log_metric("rmse", rmse)
         mlflow.log_metric("mae", mae)
         mlflow.log_metric("r2_score", r2)
-        signature = mlflow.models.signature.infer_signature(X_train, y_train)
-        input_example = X_train[:1]
+        input_example = serving_example(X_train)
+        signature = mlflow.models.signature.infer_signature(input_example, y_train[:1].astype(np.float64))
         mlflow.xgboost.log_model(model, artifact_path="xgboost_model", signature=signature, input_example=input_example)
+        # Export the trees as NumPy node tables for lightweight scoring
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            tables_path = os.path.join(tmp_dir, "tree_ensemble.npz")
+            export_booster(model, tables_path)
+            mlflow.log_artifact(tables_path, artifact_path="xgboost_model")
+        # Fingerprints of the training rows, so a later incremental run can tell which rows are new
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            rows_path = os.path.join(tmp_dir, "training_rows.npy")
+            np.save(rows_path, np.unique(row_fingerprints(X_train, y_train)))
+            mlflow.log_artifact(rows_path, artifact_path="training_data")
+        # Reference distributions of the features and the predicted price, for drift monitoring of this model
+        reference = X_train.assign(**{TARGET_COLUMN: model.predict(xgb.DMatrix(X_train))})
+        try:
+            statistics = ReferenceStatistics.build(
+                reference, [column for column, dtype in reference.dtypes.items() if dtype != bool],
+                [column for column, dtype in reference.dtypes.items() if dtype == bool])
+        except ValueError as e:
+            print(f"No drift reference statistics: {e}")
+        else:
+            mlflow.log_dict(statistics.to_dict(), "drift_reference/reference_statistics.json")
+        # Log the fitted feature transformer with the model for the raw-listing endpoint
+        if transformer_path is not None and os.path.exists(transformer_path):
+            mlflow.log_artifact(transformer_path, artifact_path="xgboost_model")
+        print(f"Trained {model.num_boosted_rounds()} rounds in {train_seconds:.1f}s ({training_path})")
         print(f"RMSE: {rmse}, MAE: {mae}, R2 Score: {r2}")
 
+@task(log_prints=True)
+@profiled
+def cross_validate_model(cleaned_data_path, params, n_folds=5, workers=None, cache_dir=None):
+    # K-fold metrics over the whole cleaned dataset, for n_estimators rounds of `params` (no early stopping)
+    cleaned_df = compact_features(read_dataset(cleaned_data_path))
+    y = cleaned_df.pop(TARGET_COLUMN)
+    fold_metrics, summary = cross_validate(cleaned_df, y, params, n_folds, workers, cache_dir, uses_hist(params))
+    with mlflow.start_run(run_name='cross_validation'):
+        mlflow.log_params(params)
+        mlflow.log_params({'n_folds': n_folds, 'workers': workers or os.cpu_count()})
+        for fold, metrics in enumerate(fold_metrics):
+            for name in ('rmse', 'mae', 'r2_score'):
+                mlflow.log_metric(f"fold_{name}", metrics[name], step=fold)
+        mlflow.log_metrics(summary)
+        mlflow.log_metric("cached_folds", sum(metrics['cached'] for metrics in fold_metrics))
+    print(f"{n_folds}-fold CV RMSE: {summary['cv_rmse_mean']:.2f} ± {summary['cv_rmse_std']:.2f} "
+          f"({sum(metrics['cached'] for metrics in fold_metrics)} folds from cache)")
+    return summary
+
+@task
+@profiled
+def load_warm_start(run_id):
+    # The booster of an earlier training run and the fingerprints of its training rows (None for older runs)
+    model = mlflow.xgboost.load_model(f"runs:/{run_id}/xgboost_model")
+    booster = model.get_booster() if isinstance(model, xgb.XGBModel) else model
+    try:
+        seen_rows = np.load(mlflow.artifacts.download_artifacts(run_id=run_id, artifact_path="training_data/training_rows.npy"))
+    except (MlflowException, OSError):
+        seen_rows = None
+    return booster, seen_rows
+
 @flow
-def model_training_flow(cleaned_data_path):
-    setup_mlflow()
-    X_train, X_test, y_train, y_test = load_and_prepare_data(cleaned_data_path)
-    params = get_optimized_params()
-    train_and_log_model(X_train, X_test, y_train, y_test, params)
+def model_training_flow(cleaned_data_path, memory_map=False, training_mode='fixed', nthread=None, tune=False,
+                        search_trials=27, search_workers=None, warm_start_run_id=None, warm_start_method='continue',
+                        warm_start_rounds=50, max_rmse_increase=0.02, cv_folds=0, cv_workers=None, cv_cache_dir=None,
+                        profile=False):
+    with profiling(profile, 'model_training_profile'):
+        setup_mlflow()
+        X_train, X_test, y_train, y_test = load_and_prepare_data(cleaned_data_path, memory_map)
+        if tune:
+            # Search on the training rows only; the test split stays unseen until train_and_log_model
+            params = tune_hyperparameters(X_train, y_train, search_trials, search_workers)
+        else:
+            params = get_optimized_params()
+        if training_mode == 'fixed':
+            # All n_estimators rounds with XGBoost's default tree method and threads
+            early_stopping_rounds = None
+        elif training_mode == 'hist':
+            # Histogram tree method on `nthread` threads (default: one per CPU), stopped early on a held-out split
+            params = hist_params(params, nthread)
+            early_stopping_rounds = EARLY_STOPPING_ROUNDS
+        else:
+            raise ValueError(f"Unknown training mode '{training_mode}'")
+        if cv_folds:
+            # Folds are cached next to the dataset by default, so reruns on unchanged data skip them
+            cv_cache_dir = cv_cache_dir or os.path.join(os.path.dirname(os.path.abspath(cleaned_data_path)), 'cv_cache')
+            cross_validate_model(cleaned_data_path, params, cv_folds, cv_workers, cv_cache_dir)
+        warm_start = None
+        if warm_start_run_id is not None:
+            # Continue from an earlier run's booster on the new rows only, falling back to a full retrain
+            booster, seen_rows = load_warm_start(warm_start_run_id)
+            options = {'method': warm_start_method, 'rounds': warm_start_rounds, 'max_rmse_increase': max_rmse_increase}
+            warm_start = (warm_start_run_id, booster, seen_rows, options)
+        train_and_log_model(X_train, X_test, y_train, y_test, params, feature_transformer_path(cleaned_data_path),
+                            early_stopping_rounds, warm_start)
 
 
 # --- Main Flow ---
 
 @flow
-def main_flow(data_dir, combined_output_file, cleaned_output_file):
-    # Run data preprocessing flow
-    data_preprocessing_flow(data_dir, combined_output_file, cleaned_output_file)
+def main_flow(data_dir, combined_output_file, cleaned_output_file, preprocessing_engine='fused', partition_cache_dir=None,
+              chunk_size=100000, training_mode='fixed', nthread=None, tune=False, warm_start_run_id=None,
+              cv_folds=0, profile=False):
+    # One report covering the tasks of both subflows
+    with profiling(profile, 'main_flow_profile', setup=setup_mlflow.fn):
+        # Run data preprocessing flow
+        data_preprocessing_flow(data_dir, combined_output_file, cleaned_output_file, engine=preprocessing_engine,
+                                partition_cache_dir=partition_cache_dir, chunk_size=chunk_size)
 
-    # Run model training flow
-    model_training_flow(cleaned_output_file)
+        # Run model training flow on the Parquet copy of the cleaned dataset
+        model_training_flow(parquet_path(cleaned_output_file), training_mode=training_mode, nthread=nthread,
+                            tune=tune, warm_start_run_id=warm_start_run_id, cv_folds=cv_folds)
 
 # Execute the main flow
 if __name__ == "__main__":
     data_dir = '../data/original/'
     combined_output_file = '../data/combined_car_data.csv'
     cleaned_output_file = '../data/cleaned_car_data.csv'
-    main_flow(data_dir, combined_output_file, cleaned_output_file)
+    partition_cache_dir = '../data/partition_cache'
+    main_flow(data_dir, combined_output_file, cleaned_output_file, partition_cache_dir=partition_cache_dir)